@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+==================
+Times the register-shimmer analysis stage by stage on synthetic corpora
+(see eidolon/synthetic_corpus.py), so runs can be compared across commits.
+
+For each corpus size the analysis runs twice in a fresh interpreter:
+
+  cold   --rebuild-snapshot --rescore (everything parsed and scored)
+  warm   snapshot and score store reused (the usual re-run)
+
+Stages (seconds): load (metrics, lexicons, parsing), score, join (metrics
+lookup, tags, result rows), statistics (percentiles, correlations with
+resampling, summary), quadrant_topk (sections 4-7), output (JSON write),
+plus total (which also covers interpreter start-up imports) and peak RSS.
+With --keep, corpora stay in --workdir and are reused per (size, seed).
+
+  python benchmark.py --sizes 1000,10000 --out bench.json
+  python benchmark.py --sizes 1000,10000 --out new.json --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+from eidolon.synthetic_corpus import generate_corpus
+
+BENCHMARK_VERSION = 1
+DEFAULT_SIZES = "1000,10000,100000"
+STAGES = ("load", "score", "join", "statistics", "quadrant_topk", "output")
+
+_PROBE = """
+import contextlib, io, json, time
+import register_shimmer_analysis
+from eidolon.stage_clock import peak_rss_mb
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    timings = register_shimmer_analysis.main({argv!r})
+timings["total"] = time.perf_counter() - t0
+print(json.dumps({{"timings": timings, "peak_rss_mb": peak_rss_mb()}}))
+"""
+
+
+def git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=here, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def run_analysis(argv):
+    """Run main(argv) in a fresh interpreter; returns {timings, peak_rss_mb}."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(argv=argv)],
+                         cwd=here, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"analysis failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_size(n, args):
+    corpus_dir = os.path.join(args.workdir, f"corpus-{n}-seed{args.seed}")
+    proteins_dir = os.path.join(corpus_dir, "proteins")
+    metrics_path = os.path.join(corpus_dir, "spore-metrics.json")
+    result = {"n": n, "generate_seconds": None}
+    if not os.path.exists(metrics_path):
+        t0 = time.perf_counter()
+        generate_corpus(corpus_dir, n, seed=args.seed, workers=args.workers)
+        result["generate_seconds"] = round(time.perf_counter() - t0, 3)
+
+    base = [
+        "--proteins-dir", proteins_dir,
+        "--metrics", metrics_path,
+        "--output", os.path.join(corpus_dir, "results.json"),
+        "--score-store-dir", os.path.join(corpus_dir, ".score-cache"),
+        "--workers", str(args.workers),
+        "--resamples", str(args.resamples),
+        "--seed", str(args.seed),
+    ]
+    for run, extra in (("cold", ["--rebuild-snapshot", "--rescore"]), ("warm", [])):
+        measured = run_analysis(base + extra)
+        result[run] = {
+            "stages": {k: round(v, 4) for k, v in measured["timings"].items()},
+            "peak_rss_mb": round(measured["peak_rss_mb"], 1),
+        }
+    with open(os.path.join(corpus_dir, "results.json")) as f:
+        result["n_proteins"] = json.load(f)["n_proteins"]
+    if not args.keep:
+        shutil.rmtree(corpus_dir)
+    return result
+
+
+def environment():
+    import numpy
+    import scipy
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_result(r):
+    print(f"\n  n = {r['n']} ({r['n_proteins']} analysed)"
+          + (f", generated in {r['generate_seconds']:.1f}s" if r["generate_seconds"] else ""))
+    print(f"    {'run':<6}" + "".join(f"{s:>14}" for s in STAGES + ("total",)) + f"{'RSS MB':>9}")
+    for run in ("cold", "warm"):
+        st = r[run]["stages"]
+        print(f"    {run:<6}" + "".join(f"{st.get(s, 0.0):>14.3f}" for s in STAGES + ("total",))
+              + f"{r[run]['peak_rss_mb']:>9.0f}")
+
+
+def print_comparison(old, new):
+    """Per-stage new/old time ratios for the sizes both runs share (< 1 is faster)."""
+    old_by_n = {r["n"]: r for r in old["results"]}
+    print(f"\n  vs {old['environment'].get('commit')} (new/old time; < 1.00 is faster)")
+    for r in new["results"]:
+        o = old_by_n.get(r["n"])
+        if o is None:
+            continue
+        for run in ("cold", "warm"):
+            cells = []
+            for s in STAGES + ("total",):
+                before, after = o[run]["stages"].get(s), r[run]["stages"].get(s)
+                cells.append(f"{after / before:>14.2f}" if before and after is not None
+                             else f"{'-':>14}")
+            print(f"    n={r['n']:<8} {run:<5}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated corpus sizes (up to 1000000)")
+    parser.add_argument("--out", metavar="JSON", help="write results here")
+    parser.add_argument("--compare", metavar="JSON", help="print ratios against an earlier --out")
+    parser.add_argument("--workdir", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), ".bench"),
+                        help="where synthetic corpora are generated")
+    parser.add_argument("--keep", action="store_true",
+                        help="keep generated corpora for the next run")
+    parser.add_argument("--workers", type=int, default=1, help="0 = one per CPU")
+    parser.add_argument("--resamples", type=int, default=1000,
+                        help="bootstrap/permutation resamples passed to the analysis")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    os.makedirs(args.workdir, exist_ok=True)
+    report = {
+        "version": BENCHMARK_VERSION,
+        "environment": environment(),
+        "config": {"sizes": sizes, "workers": args.workers,
+                   "resamples": args.resamples, "seed": args.seed},
+        "results": [],
+    }
+    print("=" * 70)
+    print(f"PIPELINE BENCHMARK ({report['environment']['commit']})")
+    print("=" * 70)
+    for n in sizes:
+        result = bench_size(n, args)
+        report["results"].append(result)
+        print_result(result)
+
+    if args.out:
+        tmp_path = args.out + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, args.out)
+        print(f"\nResults saved to {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Eidolon Proteins Analysis Library
+=================================
+The modules behind register_shimmer_analysis.py, register_service.py and
+benchmark.py: corpus ingestion and caches, register scoring, S5, tag
+sets, significance, sharded/streaming analysis, the inverted index,
+near-duplicates, temporal drift and the results export.
+
+Importing the package only loads the scoring API below (standard library
+only); NumPy, SciPy and YAML are imported by the submodules that use them.
+
+  from eidolon import compute_register_scores, tokenize
+  from eidolon.metrics_store import open_metrics
+"""
+
+from .register_scoring import (  # noqa: F401
+    ABSTRACT_SUFFIXES, ANALYTICAL_TERMS, DEFAULT_LEXICONS, METAPHOR_TERMS,
+    compute_register_scores, default_matcher, extract_p_number, extract_text, tokenize,
+)
@@ -0,0 +1,158 @@
+"""
+Compiled Lexicon Matcher
+========================
+Matches single words and multi-word phrases from any number of lexicons
+in one pass over a token stream.
+
+Lexicon entries are normalized with the same rule as tokenize(), so
+"as if" becomes the token sequence ("as", "if") and "self-aware" becomes
+("self", "aware"). All entries are compiled into one trie over tokens;
+each node records which lexicons end there. Scanning a text walks the trie
+from every position, which is linear in the number of tokens (times the
+longest phrase length).
+
+Counting rule: every occurrence of every entry counts once per lexicon.
+A phrase does not suppress its own words if they are entries too.
+
+Lexicon files are plain text, one entry per line; blank lines and lines
+starting with '#' are ignored. Given a cache directory (the CLIs pass
+DEFAULT_CACHE_DIR), compiled matchers are pickled there keyed by a digest
+of the lexicon contents, so repeated runs with the same vocabularies skip
+the build. Library calls build in memory and write nothing to disk.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+
+from .paths import SCRIPTS_DIR
+
+# Bump whenever the compiled layout or normalization changes.
+MATCHER_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(SCRIPTS_DIR, ".lexicon-cache")
+
+_TOKEN_RE = re.compile(r'[a-z]+')
+
+
+def normalize_entry(entry):
+    """Lexicon entry -> tuple of tokens (same rule as tokenize())."""
+    return tuple(_TOKEN_RE.findall(entry.lower()))
+
+
+def read_lexicon_file(path):
+    """Read raw entries from a lexicon text file."""
+    entries = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                entries.append(line)
+    return entries
+
+
+def lexicon_digest(lexicons):
+    """Stable digest of an ordered {name: entries} mapping (the lexicon version)."""
+    h = hashlib.sha256(f"matcher-v{MATCHER_VERSION}".encode())
+    for name, entries in lexicons.items():
+        h.update(b"\x00" + name.encode() + b"\x00")
+        h.update("\n".join(sorted(set(entries))).encode())
+    return h.hexdigest()[:16]
+
+
+# ─── Matcher ──────────────────────────────────────────────────────────────────
+
+class LexiconMatcher:
+    """Token-sequence trie over several named lexicons."""
+
+    def __init__(self, lexicons):
+        self.names = list(lexicons)
+        self.digest = lexicon_digest(lexicons)
+        self.entries = {}        # name -> set of token tuples
+        self._trie = {}          # token -> [children dict, lexicon indices ending here]
+        for idx, name in enumerate(self.names):
+            normalized = {normalize_entry(e) for e in lexicons[name]}
+            normalized.discard(())
+            self.entries[name] = normalized
+            for seq in normalized:
+                level = self._trie
+                for i, tok in enumerate(seq):
+                    node = level.setdefault(tok, [{}, []])
+                    if i == len(seq) - 1:
+                        node[1].append(idx)
+                    level = node[0]
+
+    def words(self, name):
+        """Single-token entries of one lexicon."""
+        return {seq[0] for seq in self.entries[name] if len(seq) == 1}
+
+    def phrases(self):
+        """All multi-token entries as [(token tuple, [lexicon names])], sorted."""
+        owners = {}
+        for name in self.names:
+            for seq in self.entries[name]:
+                if len(seq) > 1:
+                    owners.setdefault(seq, []).append(name)
+        return sorted(owners.items())
+
+    def count(self, tokens):
+        """Hits per lexicon for a token list, as {name: count}."""
+        counts = [0] * len(self.names)
+        trie = self._trie
+        n = len(tokens)
+        for i in range(n):
+            node = trie.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                for idx in node[1]:
+                    counts[idx] += 1
+                if j >= n:
+                    break
+                node = node[0].get(tokens[j])
+                j += 1
+        return dict(zip(self.names, counts))
+
+
+# ─── Loading & Caching ────────────────────────────────────────────────────────
+
+def load_matcher(lexicons, cache_dir=None):
+    """
+    Compile a matcher for {name: entries}, or load it from cache_dir (and
+    save it there) when one is given.
+    """
+    if cache_dir is None:
+        return LexiconMatcher(lexicons)
+
+    cache_path = os.path.join(cache_dir, f"lexicons-{lexicon_digest(lexicons)}.pkl")
+    try:
+        with open(cache_path, "rb") as f:
+            matcher = pickle.load(f)
+        if isinstance(matcher, LexiconMatcher):
+            return matcher
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        pass
+
+    matcher = LexiconMatcher(lexicons)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return matcher
+
+
+def parse_lexicon_specs(specs):
+    """
+    Turn NAME=PATH (or bare PATH, named after the file stem) strings into
+    an ordered {name: entries} mapping read from disk.
+    """
+    lexicons = {}
+    for spec in specs:
+        if "=" in spec:
+            name, path = spec.split("=", 1)
+        else:
+            path = spec
+            name = os.path.splitext(os.path.basename(path))[0]
+        lexicons[name] = read_lexicon_file(path)
+    return lexicons
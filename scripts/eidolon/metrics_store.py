@@ -0,0 +1,211 @@
+"""
+Columnar Spore Metrics Store
+============================
+Fixed-width, memory-mapped columns for spore-metrics-for-proteins.json.
+
+The JSON is a dict of dicts keyed by protein id. The store keeps it as a
+directory of .npy files:
+
+  ids.npy          sorted ids (fixed-width bytes), the lookup index
+  s5/coh/energy/pc1.npy   float64 columns, row-aligned with ids
+  tier.npy         uint8 categorical codes (names in meta.json)
+  tag_offsets.npy  int64 CSR offsets into tag_ids, one row per id
+  tag_ids.npy      int32 interned tags_sem ids (names in meta.json)
+  meta.json        format version, categories, tag names, source stamp
+
+Opening memory-maps every column, so a join is np.searchsorted over the id
+index followed by array indexing; nothing is parsed per protein.
+
+Usage: python -m eidolon.metrics_store <metrics.json> [<store dir>]
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+STORE_VERSION = 1
+FLOAT_COLUMNS = ("s5", "coh", "energy", "pc1")
+
+
+def default_store_path(json_path):
+    """Store lives next to the JSON: <name>.columns/"""
+    return os.path.splitext(json_path)[0] + ".columns"
+
+
+def _source_stamp(json_path):
+    st = os.stat(json_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+# ─── Columns ──────────────────────────────────────────────────────────────────
+
+def _columns_from_dict(metrics):
+    """dict-of-dicts -> (arrays, meta) with rows sorted by id."""
+    ids = sorted(metrics)
+    arrays = {"ids": np.array([pid.encode() for pid in ids], dtype=bytes)}
+    for col in FLOAT_COLUMNS:
+        arrays[col] = np.array([metrics[pid].get(col, np.nan) for pid in ids], dtype=np.float64)
+
+    tiers = sorted({metrics[pid].get("tier") or "" for pid in ids})
+    tier_code = {t: i for i, t in enumerate(tiers)}
+    arrays["tier"] = np.array([tier_code[metrics[pid].get("tier") or ""] for pid in ids],
+                              dtype=np.uint8)
+
+    tag_names = {}
+    offsets = [0]
+    flat = []
+    for pid in ids:
+        for tag in metrics[pid].get("tags_sem", []):
+            flat.append(tag_names.setdefault(tag, len(tag_names)))
+        offsets.append(len(flat))
+    arrays["tag_offsets"] = np.array(offsets, dtype=np.int64)
+    arrays["tag_ids"] = np.array(flat, dtype=np.int32)
+
+    meta = {"version": STORE_VERSION, "tiers": tiers, "tags": list(tag_names)}
+    return arrays, meta
+
+
+def convert_metrics(json_path, store_path=None):
+    """Convert the metrics JSON into a columnar store (atomic directory swap)."""
+    store_path = store_path or default_store_path(json_path)
+    with open(json_path) as f:
+        metrics = json.load(f)
+    arrays, meta = _columns_from_dict(metrics)
+    meta["source"] = _source_stamp(json_path)
+
+    tmp_path = f"{store_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_path, name + ".npy"), arr)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    old_path = None
+    if os.path.exists(store_path):
+        old_path = f"{store_path}.old-{os.getpid()}"
+        os.replace(store_path, old_path)
+    os.replace(tmp_path, store_path)
+    if old_path:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return store_path
+
+
+# ─── Reader ───────────────────────────────────────────────────────────────────
+
+class SporeMetrics:
+    """Read-only columnar view of the spore metrics."""
+
+    def __init__(self, arrays, meta):
+        self.ids = arrays["ids"]
+        self.columns = {col: arrays[col] for col in FLOAT_COLUMNS}
+        self.tier_codes = arrays["tier"]
+        self.tiers = meta["tiers"]
+        self.tag_offsets = arrays["tag_offsets"]
+        self.tag_ids = arrays["tag_ids"]
+        self.tag_names = meta["tags"]
+        self.meta = meta
+
+    @classmethod
+    def open(cls, store_path):
+        """Memory-map an existing store."""
+        with open(os.path.join(store_path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"unsupported metrics store version: {meta.get('version')}")
+        names = ("ids", "tier", "tag_offsets", "tag_ids") + FLOAT_COLUMNS
+        arrays = {name: np.load(os.path.join(store_path, name + ".npy"), mmap_mode="r")
+                  for name in names}
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_json(cls, json_path):
+        """Build the same view in memory straight from the JSON (no store)."""
+        with open(json_path) as f:
+            metrics = json.load(f)
+        return cls.from_dict(metrics)
+
+    @classmethod
+    def from_dict(cls, metrics):
+        """Build an in-memory view from a JSON-shaped dict of dicts."""
+        return cls(*_columns_from_dict(metrics))
+
+    def to_dict(self):
+        """Expand back into the JSON-shaped dict of dicts."""
+        floats = {col: self.columns[col].tolist() for col in FLOAT_COLUMNS}
+        tiers = [self.tiers[c] for c in self.tier_codes.tolist()]
+        out = {}
+        for row, pid in enumerate(self.ids.tolist()):
+            record = {col: floats[col][row] for col in FLOAT_COLUMNS}
+            record["tier"] = tiers[row]
+            record["tags_sem"] = self.tags(row)
+            out[pid.decode()] = record
+        return out
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, ids):
+        """Row index for each id, -1 where the id has no metrics."""
+        keys = np.array([pid.encode() for pid in ids], dtype=self.ids.dtype)
+        if not len(self.ids) or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        rows = np.searchsorted(self.ids, keys)
+        rows = np.minimum(rows, len(self.ids) - 1)
+        found = self.ids[rows] == keys
+        # A key longer than the id width is truncated by the cast; never a match
+        found &= np.array([len(pid.encode()) <= self.ids.dtype.itemsize for pid in ids])
+        return np.where(found, rows, -1).astype(np.int64)
+
+    def column(self, name, rows=None):
+        """A float column, optionally gathered at rows."""
+        col = self.columns[name]
+        return col if rows is None else col[rows]
+
+    def tier(self, rows):
+        """Tier names for rows."""
+        return [self.tiers[c] for c in self.tier_codes[rows].tolist()]
+
+    def tags(self, row):
+        """tags_sem for one row."""
+        start, end = self.tag_offsets[row], self.tag_offsets[row + 1]
+        return [self.tag_names[t] for t in self.tag_ids[start:end].tolist()]
+
+    def get(self, pid):
+        """One protein's metrics as the original dict (None if absent)."""
+        row = int(self.lookup([pid])[0])
+        if row < 0:
+            return None
+        record = {col: float(self.columns[col][row]) for col in FLOAT_COLUMNS}
+        record["tier"] = self.tiers[self.tier_codes[row]]
+        record["tags_sem"] = self.tags(row)
+        return record
+
+
+def open_metrics(json_path, store_path=None, use_store=True):
+    """
+    Open the metrics for json_path as SporeMetrics. The columnar store is
+    (re)built when missing or older than the JSON; use_store=False reads
+    the JSON directly into memory instead.
+    """
+    if not use_store:
+        return SporeMetrics.from_json(json_path)
+    store_path = store_path or default_store_path(json_path)
+    try:
+        store = SporeMetrics.open(store_path)
+        if store.meta.get("source") == _source_stamp(json_path):
+            return store
+    except (OSError, ValueError):
+        pass
+    convert_metrics(json_path, store_path)
+    return SporeMetrics.open(store_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__.strip().splitlines()[-1])
+    out = convert_metrics(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    print(f"Wrote {len(SporeMetrics.open(out))} rows to {out}")
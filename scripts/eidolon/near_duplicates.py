@@ -0,0 +1,314 @@
+"""
+Near-Duplicate Proteins
+=======================
+MinHash / LSH detection of proteins that say the same thing, within one
+corpus or across corpus generations (re-synthesized copies get new ids,
+so exact-id merging does not catch them).
+
+  shingles    word 3-grams of tokenize(extract_text(p)), each hashed to 31
+              bits from stable per-token CRC32s (no per-shingle Python work)
+  signature   128 MinHash values, min over shingles of (a*x + b) mod 2^31-1
+  LSH         32 bands of 4 rows; proteins sharing any band bucket are
+              candidates, kept when their estimated Jaccard (fraction of
+              equal signature values) reaches the threshold
+  clusters    connected components of the kept pairs (union-find)
+
+Hashing and bucketing are linear in corpus size; only proteins in a shared
+bucket are compared. Signatures are cached per protein, keyed by id and
+text hash like the score store, so a new or edited file is hashed once.
+
+The deduplicated view keeps one protein per cluster: the first in corpus
+order (so the earliest directory on the command line wins).
+
+Usage: python -m eidolon.near_duplicates [DIR ...] [--root DIR] [--all-corpora] [--threshold 0.5]
+                                         [--out clusters.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from .paths import SCRIPTS_DIR
+from .register_scoring import extract_text, tokenize
+from .score_store import text_hash
+
+SIGNATURE_VERSION = 1
+NUM_PERM = 128
+BANDS = 32
+SHINGLE = 3
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_SEED = 1
+MAX_BUCKET_PAIRS = 64      # larger buckets are compared against their first member only
+
+_PRIME = (1 << 31) - 1
+_BATCH_SHINGLES = 1 << 16
+
+DEFAULT_CACHE_DIR = os.path.join(SCRIPTS_DIR, ".minhash-cache")
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+# ─── Signatures ───────────────────────────────────────────────────────────────
+
+def shingle_hashes(tokens, token_hash):
+    """31-bit hashes of the word SHINGLE-grams of tokens (the whole text if shorter)."""
+    ids = np.array([token_hash.get(t) or token_hash.setdefault(t, zlib.crc32(t.encode()))
+                    for t in tokens], dtype=np.uint64)
+    if len(ids) == 0:
+        return ids
+    if len(ids) < SHINGLE:
+        ids = np.concatenate([ids, np.zeros(SHINGLE - len(ids), dtype=np.uint64)])
+    n = len(ids) - SHINGLE + 1
+    h = np.zeros(n, dtype=np.uint64)
+    for k in range(SHINGLE):
+        h = (h * np.uint64(1000003) + ids[k:k + n] % np.uint64(_PRIME)) % np.uint64(_PRIME)
+    return h
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=DEFAULT_SEED):
+    """(len(texts) x num_perm) uint32 MinHash signatures; empty texts get all-max rows."""
+    a, b = _permutations(num_perm, seed)
+    token_hash = {}
+    shingles = [shingle_hashes(tokenize(t), token_hash) for t in texts]
+    sigs = np.full((len(texts), num_perm), _PRIME, dtype=np.uint32)
+
+    start = 0
+    while start < len(texts):
+        # Batch whole documents up to ~_BATCH_SHINGLES shingles
+        end, total = start, 0
+        while end < len(texts) and (end == start or total + len(shingles[end]) <= _BATCH_SHINGLES):
+            total += len(shingles[end])
+            end += 1
+        lengths = np.array([len(s) for s in shingles[start:end]])
+        nonempty = np.flatnonzero(lengths > 0)
+        if len(nonempty):
+            flat = np.concatenate([shingles[start + i] for i in nonempty])
+            # (num_perm x shingles), so each reduceat runs along contiguous memory
+            hashed = ((a[:, None] * flat[None, :] + b[:, None]) % np.uint64(_PRIME)).astype(np.uint32)
+            offsets = np.concatenate([[0], np.cumsum(lengths[nonempty])[:-1]])
+            sigs[start + nonempty] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        start = end
+    return sigs
+
+
+class SignatureStore:
+    """Cached signatures keyed by protein id + text hash."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}   # id -> (text hash, signature row)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                for pid, digest, sig in zip(data["ids"].tolist(), data["hashes"].tolist(),
+                                            data["signatures"]):
+                    self.entries[pid] = (digest, sig)
+        except (OSError, ValueError, KeyError, EOFError):
+            pass
+
+    def save(self):
+        ids = list(self.entries)
+        sigs = (np.stack([self.entries[pid][1] for pid in ids]) if ids
+                else np.zeros((0, NUM_PERM), dtype=np.uint32))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.array(ids, dtype=str),
+                     hashes=np.array([self.entries[pid][0] for pid in ids], dtype=str),
+                     signatures=sigs.astype(np.uint32))
+        os.replace(tmp_path, self.path)
+
+
+def signature_path(cache_dir=DEFAULT_CACHE_DIR, num_perm=NUM_PERM, seed=DEFAULT_SEED):
+    return os.path.join(cache_dir, f"minhash-v{SIGNATURE_VERSION}-k{SHINGLE}-p{num_perm}-s{seed}.npz")
+
+
+def protein_signatures(proteins, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """
+    Signatures for proteins (id -> record) in iteration order, hashing only
+    proteins missing from (or changed since) the cache. Returns (ids, sigs, n_hashed).
+    """
+    ids = list(proteins)
+    texts = [extract_text(proteins[pid]) for pid in ids]
+    digests = [text_hash(t) for t in texts]
+    store = SignatureStore(signature_path(cache_dir)) if use_cache else None
+
+    sigs = np.empty((len(ids), NUM_PERM), dtype=np.uint32)
+    todo = []
+    for i, (pid, digest) in enumerate(zip(ids, digests)):
+        entry = store.entries.get(pid) if store is not None else None
+        if entry is not None and entry[0] == digest:
+            sigs[i] = entry[1]
+        else:
+            todo.append(i)
+    if todo:
+        sigs[todo] = minhash_signatures([texts[i] for i in todo])
+        if store is not None:
+            for i in todo:
+                store.entries[ids[i]] = (digests[i], sigs[i])
+            store.save()
+    return ids, sigs, len(todo)
+
+
+# ─── LSH + Clusters ───────────────────────────────────────────────────────────
+
+def candidate_pairs(sigs, bands=BANDS):
+    """Row pairs (i < j) sharing at least one LSH band bucket."""
+    n, num_perm = sigs.shape
+    rows = num_perm // bands
+    empty = np.all(sigs == _PRIME, axis=1)
+    pairs = []
+    for band in range(bands):
+        block = np.ascontiguousarray(sigs[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        shared = (counts[inverse] > 1) & ~empty
+        if not shared.any():
+            continue
+        members = np.flatnonzero(shared)
+        order = members[np.argsort(inverse[members], kind="stable")]
+        bucket_ids = inverse[order]
+        splits = np.flatnonzero(np.diff(bucket_ids)) + 1
+        for bucket in np.split(order, splits):
+            if len(bucket) <= MAX_BUCKET_PAIRS:
+                i, j = np.triu_indices(len(bucket), k=1)
+                pairs.append(np.stack([bucket[i], bucket[j]], axis=1))
+            else:
+                pairs.append(np.stack([np.full(len(bucket) - 1, bucket[0]), bucket[1:]], axis=1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs).astype(np.int64), axis=0)
+
+
+def estimated_jaccard(sigs, pairs):
+    """Fraction of equal MinHash values for each pair."""
+    if not len(pairs):
+        return np.zeros(0)
+    return np.mean(sigs[pairs[:, 0]] == sigs[pairs[:, 1]], axis=1)
+
+
+def _components(n, pairs):
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs.tolist():
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(n)])
+
+
+def find_duplicates(proteins, threshold=DEFAULT_THRESHOLD, cache_dir=DEFAULT_CACHE_DIR,
+                    use_cache=True):
+    """
+    Near-duplicate clusters among proteins (id -> record, in corpus order).
+
+    Returns (clusters, stats): clusters is a list of
+    {"keep": id, "drop": [ids], "similarity": [estimated Jaccard to a linked member]},
+    ordered by the kept protein's position.
+    """
+    t0 = time.perf_counter()
+    ids, sigs, n_hashed = protein_signatures(proteins, cache_dir, use_cache)
+    pairs = candidate_pairs(sigs)
+    similarity = estimated_jaccard(sigs, pairs)
+    kept_pairs = pairs[similarity >= threshold]
+    root = _components(len(ids), kept_pairs)
+
+    best = {}
+    for (i, j), s in zip(kept_pairs.tolist(), similarity[similarity >= threshold].tolist()):
+        best[j] = max(best.get(j, 0.0), s)
+        best[i] = max(best.get(i, 0.0), s)
+    groups = {}
+    for i in np.flatnonzero(root != np.arange(len(ids))).tolist():
+        groups.setdefault(int(root[i]), []).append(i)
+    clusters = [
+        {"keep": ids[r], "drop": [ids[i] for i in members],
+         "similarity": [round(best[i], 3) for i in members]}
+        for r, members in sorted(groups.items())
+    ]
+    stats = {
+        "proteins": len(ids),
+        "hashed": n_hashed,
+        "candidates": len(pairs),
+        "pairs": len(kept_pairs),
+        "clusters": len(clusters),
+        "dropped": sum(len(c["drop"]) for c in clusters),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+    return clusters, stats
+
+
+def dedup_view(proteins, clusters):
+    """proteins without the dropped members of each cluster (same order)."""
+    dropped = {pid for c in clusters for pid in c["drop"]}
+    return {pid: p for pid, p in proteins.items() if pid not in dropped}
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def _corpus_name(proteins_dir):
+    """connectomes-v1/meshseed-primary/proteins/ -> meshseed-primary"""
+    return os.path.basename(os.path.dirname(os.path.normpath(proteins_dir)))
+
+
+def main(argv=None):
+    from .paths import add_path_arguments, resolve_paths
+    from .protein_snapshot import load_proteins
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("proteins_dirs", nargs="*",
+                        help="directories to compare (default: --proteins-dir / --all-corpora)")
+    add_path_arguments(parser, metrics=False)
+    parser.add_argument("--all-corpora", action="store_true", help="every corpus directory")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum estimated Jaccard of 3-gram shingles")
+    parser.add_argument("--out", metavar="JSON", help="write the clusters here")
+    parser.add_argument("--no-cache", action="store_true", help="rehash every protein")
+    args = parser.parse_args(argv)
+
+    dirs = args.proteins_dirs or resolve_paths(args)[0]
+    proteins, directory = {}, {}
+    for d in dirs:
+        if not os.path.isdir(d):
+            print(f"  skipping missing {d}")
+            continue
+        dir_proteins, _ = load_proteins(d)
+        proteins.update(dir_proteins)
+        directory.update(dict.fromkeys(dir_proteins, d))
+
+    clusters, stats = find_duplicates(proteins, args.threshold, use_cache=not args.no_cache)
+    print(f"{stats['proteins']} proteins ({stats['hashed']} hashed), "
+          f"{stats['candidates']} candidate pairs, {stats['pairs']} at >= {args.threshold}: "
+          f"{stats['clusters']} clusters, {stats['dropped']} duplicates "
+          f"in {stats['seconds']:.2f}s")
+    for c in clusters[:20]:
+        print(f"\n  keep {str(proteins[c['keep']].get('title', ''))[:64]}  "
+              f"[{_corpus_name(directory[c['keep']])}]")
+        for pid, s in zip(c["drop"], c["similarity"]):
+            print(f"    {s:.2f} {str(proteins[pid].get('title', ''))[:64]}  "
+                  f"[{_corpus_name(directory[pid])}]")
+    if args.out:
+        for c in clusters:
+            c["directories"] = [directory[c["keep"]]] + [directory[pid] for pid in c["drop"]]
+        with open(args.out, "w") as f:
+            json.dump({"threshold": args.threshold, "stats": stats, "clusters": clusters}, f, indent=2)
+        print(f"\nClusters saved to {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Paths
+=====
+Deployment layout shared by the analysis script, the service and the
+standalone eidolon CLIs, so they all find the corpus the same way.
+
+The root is $EIDOLON_PROTEINS_ROOT, or else the checkout this package
+lives in. Every CLI accepts --root (a different deployment) and
+--proteins-dir / --metrics (override one path); resolve_paths() turns
+those flags into concrete paths.
+"""
+
+import os
+
+# scripts/, where the analysis scripts live; caches are kept next to them
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Deployment root; set EIDOLON_PROTEINS_ROOT or pass --root/--proteins-dir/--metrics/--output
+CORPUS_ROOT = os.environ.get("EIDOLON_PROTEINS_ROOT", os.path.dirname(SCRIPTS_DIR))
+
+PRIMARY_SUBDIR = "connectomes-v1/meshseed-primary/proteins"
+METRICS_SUBPATH = "Docs/data/spore-metrics-for-proteins.json"
+RESULTS_SUBPATH = "scripts/register_shimmer_results.json"
+
+# Every protein corpus in the deployment (used with --all-corpora)
+CORPUS_SUBDIRS = (
+    "connectomes/conversations",
+    "connectomes/eidolon-private",
+    "connectomes/research-papers",
+    "connectomes/seeds",
+    "connectomes-v1/meshseed-primary",
+    "connectomes-v1/test-for-claude",
+)
+
+PROTEINS_DIR = os.path.join(CORPUS_ROOT, PRIMARY_SUBDIR)
+METRICS_PATH = os.path.join(CORPUS_ROOT, METRICS_SUBPATH)
+RESULTS_PATH = os.path.join(CORPUS_ROOT, RESULTS_SUBPATH)
+CORPUS_DIRS = [os.path.join(CORPUS_ROOT, d, "proteins") for d in CORPUS_SUBDIRS]
+
+
+def add_path_arguments(parser, metrics=True, output=False):
+    """--root, --proteins-dir (and --metrics, --output) as the analysis script has them."""
+    parser.add_argument("--root", metavar="DIR",
+                        help=f"deployment root (default: $EIDOLON_PROTEINS_ROOT or {CORPUS_ROOT})")
+    parser.add_argument("--proteins-dir", metavar="DIR",
+                        help=f"proteins directory to analyse (default: <root>/{PRIMARY_SUBDIR})")
+    if metrics:
+        parser.add_argument("--metrics", metavar="PATH",
+                            help=f"spore metrics JSON (default: <root>/{METRICS_SUBPATH})")
+    if output:
+        parser.add_argument("--output", metavar="PATH",
+                            help=f"results JSON (default: <root>/{RESULTS_SUBPATH})")
+
+
+def resolve_paths(args):
+    """
+    (proteins dirs, metrics path, results path) from the add_path_arguments()
+    flags, plus --all-corpora where the parser has it.
+    """
+    root = getattr(args, "root", None) or CORPUS_ROOT
+    if getattr(args, "all_corpora", False):
+        proteins_dirs = [os.path.join(root, d, "proteins") for d in CORPUS_SUBDIRS]
+    else:
+        proteins_dirs = [getattr(args, "proteins_dir", None) or os.path.join(root, PRIMARY_SUBDIR)]
+    metrics_path = getattr(args, "metrics", None) or os.path.join(root, METRICS_SUBPATH)
+    results_path = getattr(args, "output", None) or os.path.join(root, RESULTS_SUBPATH)
+    return proteins_dirs, metrics_path, results_path
@@ -0,0 +1,286 @@
+"""
+Persistent Inverted Index
+=========================
+Posting lists from protein attributes to index rows, plus the cached
+columns the report needs, so a subset can be analysed without re-reading
+or rescoring the corpus.
+
+Keys are "field:value":
+
+  tag:#mesh            every YAML tag (#dna:..., #synthesis:v4.5, ...)
+  tier:core            the protein's YAML tier
+  source:synthesis     the protein's source
+  month:2026-02        created_at month
+  lexicon:metaphor     at least one hit in that lexicon
+
+Each posting list is the sorted row ids holding the key. On disk they are
+delta-encoded in one compressed .npz, together with ids, titles, P-numbers,
+created_at timestamps and the score columns, so loading needs no YAML, snapshot or score store.
+The index is tied to the lexicon version and to a fingerprint of the
+directories (file names, mtimes, sizes); if either changes it is rebuilt.
+
+Queries combine terms with AND, OR, NOT and parentheses. Adjacent terms
+are ANDed, a bare "#tag" means tag:#tag, a trailing * matches a prefix
+and field:a..b an inclusive range:
+
+  "#mesh AND tier:core"
+  "tag:#dna:* AND NOT source:synthesis"
+  "month:2025-10..2026-01 (lexicon:metaphor OR #poetry)"
+"""
+
+import hashlib
+import os
+import re
+
+import numpy as np
+
+from .paths import SCRIPTS_DIR
+
+INDEX_VERSION = 2
+FIELDS = ("tag", "tier", "source", "month", "lexicon")
+
+DEFAULT_INDEX_DIR = os.path.join(SCRIPTS_DIR, ".index-cache")
+
+_TOKEN_RE = re.compile(r'\(|\)|[^\s()]+')
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+def directory_fingerprint(proteins_dirs):
+    """Hash of every YAML file's name, mtime and size in proteins_dirs."""
+    h = hashlib.blake2b(digest_size=16)
+    for d in proteins_dirs:
+        h.update(os.path.abspath(d).encode() + b"\0")
+        with os.scandir(d) as it:
+            entries = sorted((e for e in it if e.name.endswith(".yaml")), key=lambda e: e.name)
+        for entry in entries:
+            st = entry.stat()
+            h.update(f"{entry.name}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def default_index_path(proteins_dirs, lexicon_version, index_dir=DEFAULT_INDEX_DIR):
+    dirs = "\0".join(os.path.abspath(d) for d in proteins_dirs)
+    key = hashlib.blake2b(dirs.encode(), digest_size=8).hexdigest()
+    return os.path.join(index_dir, f"index-v{INDEX_VERSION}-{key}-{lexicon_version}.npz")
+
+
+def _month(created_at):
+    """'YYYY-MM' from an ISO string or a YAML-parsed datetime (None if missing)."""
+    if not created_at:
+        return None
+    text = str(created_at)
+    return text[:7] if re.match(r'\d{4}-\d{2}', text) else None
+
+
+# ─── Index ────────────────────────────────────────────────────────────────────
+
+class ProteinIndex:
+    """Posting lists over rows 0..n-1 plus the per-row columns of the report."""
+
+    def __init__(self, ids, titles, p_numbers, scores, postings, meta=None, created_ts=None):
+        self.ids = list(ids)
+        self.titles = list(titles)
+        self.p_numbers = np.asarray(p_numbers, dtype=np.int64)
+        self.created_ts = (np.full(len(self.ids), np.nan) if created_ts is None
+                           else np.asarray(created_ts, dtype=np.float64))
+        self.scores = scores            # name -> array, plus the "valid" mask
+        self.postings = postings        # key -> sorted int64 row ids
+        self.meta = meta or {}
+        self._keys = sorted(postings)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, proteins, scores, meta=None):
+        """Index proteins (id -> record) with their scores (id -> dict or None)."""
+        from .tag_bitset import TagTable
+        from .temporal_drift import parse_timestamps
+
+        ids = list(proteins)
+        records = [proteins[pid] for pid in ids]
+        titles = [r.get("title", "") or "" for r in records]
+        tag_lists = [r.get("tags") or [] for r in records]
+        p_numbers = TagTable.from_lists(tag_lists).p_numbers(titles)
+        created_ts = parse_timestamps([r.get("created_at") for r in records])
+
+        rows = {}
+        for i, (record, tags) in enumerate(zip(records, tag_lists)):
+            keys = {f"tag:{t}" for t in tags if isinstance(t, str)}
+            for field in ("tier", "source"):
+                if record.get(field):
+                    keys.add(f"{field}:{record[field]}")
+            month = _month(record.get("created_at"))
+            if month:
+                keys.add(f"month:{month}")
+            for key in keys:
+                rows.setdefault(key, []).append(i)
+
+        score_rows = [scores.get(pid) for pid in ids]
+        valid = np.array([s is not None for s in score_rows], dtype=bool)
+        first = next((s for s in score_rows if s is not None), {})
+        columns = {"valid": valid}
+        for key, value in first.items():
+            dtype = np.int64 if isinstance(value, int) else np.float64
+            columns[key] = np.fromiter((s[key] if s is not None else 0 for s in score_rows),
+                                       dtype=dtype, count=len(ids))
+        for key in columns:
+            if key.endswith("_hits"):
+                hit = np.flatnonzero(valid & (columns[key] > 0))
+                if len(hit):
+                    rows[f"lexicon:{key[:-len('_hits')]}"] = hit.tolist()
+
+        postings = {key: np.asarray(r, dtype=np.int64) for key, r in rows.items()}
+        return cls(ids, titles, p_numbers, columns, postings, meta, created_ts)
+
+    # ─── Persistence ──────────────────────────────────────────────────────
+
+    def save(self, path):
+        """Delta-encoded postings + columns in one compressed .npz (atomic replace)."""
+        keys = self._keys
+        lengths = np.array([len(self.postings[k]) for k in keys], dtype=np.int64)
+        flat = (np.concatenate([self.postings[k] for k in keys]) if keys
+                else np.zeros(0, dtype=np.int64))
+        deltas = np.diff(flat, prepend=0)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        deltas[starts[lengths > 0]] = flat[starts[lengths > 0]]   # each list starts absolute
+        arrays = {
+            "version": np.int64(INDEX_VERSION),
+            "meta_keys": np.array(list(self.meta), dtype=str),
+            "meta_values": np.array([str(v) for v in self.meta.values()], dtype=str),
+            "ids": np.array(self.ids, dtype=str),
+            "titles": np.array(self.titles, dtype=str),
+            "p_numbers": self.p_numbers,
+            "created_ts": self.created_ts,
+            "keys": np.array(keys, dtype=str),
+            "lengths": lengths,
+            "deltas": deltas.astype(np.uint32),
+        }
+        arrays.update({f"score:{name}": col for name, col in self.scores.items()})
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                raise ValueError(f"unsupported index version: {int(data['version'])}")
+            meta = dict(zip(data["meta_keys"].tolist(), data["meta_values"].tolist()))
+            keys = data["keys"].tolist()
+            lengths = data["lengths"]
+            deltas = data["deltas"].astype(np.int64)
+            scores = {name[len("score:"):]: data[name] for name in data.files
+                      if name.startswith("score:")}
+            ids, titles = data["ids"].tolist(), data["titles"].tolist()
+            p_numbers = data["p_numbers"]
+            created_ts = data["created_ts"]
+
+        # Undo the per-list delta encoding with one cumulative sum
+        total = np.cumsum(deltas)
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        base = np.where(starts > 0, total[np.maximum(starts - 1, 0)], 0)
+        flat = total - np.repeat(base, lengths)
+        postings = {key: flat[s:e] for key, s, e in zip(keys, starts.tolist(), ends.tolist())}
+        return cls(ids, titles, p_numbers, scores, postings, meta, created_ts)
+
+    # ─── Queries ──────────────────────────────────────────────────────────
+
+    def keys(self, field=None):
+        """Index keys, optionally only one field's."""
+        if field is None:
+            return list(self._keys)
+        return [k for k in self._keys if k.startswith(field + ":")]
+
+    def rows_of(self, term):
+        """Boolean row mask for one term (key, prefix* or field:a..b)."""
+        if term.startswith("#"):
+            term = "tag:" + term
+        field, _, value = term.partition(":")
+        if field not in FIELDS:
+            raise ValueError(f"unknown field in {term!r} (expected one of {', '.join(FIELDS)})")
+        if value.endswith("*"):
+            keys = [k for k in self.keys(field) if k.startswith(term[:-1])]
+        elif ".." in value:
+            lo, hi = value.split("..", 1)
+            keys = [k for k in self.keys(field) if lo <= k[len(field) + 1:] <= hi]
+        else:
+            keys = [term] if term in self.postings else []
+        mask = np.zeros(len(self), dtype=bool)
+        for key in keys:
+            mask[self.postings[key]] = True
+        return mask
+
+    def query(self, expr):
+        """Boolean row mask for a query expression (see the module docstring)."""
+        tokens = _TOKEN_RE.findall(expr)
+        if not tokens:
+            return np.ones(len(self), dtype=bool)
+        mask, pos = self._parse_or(tokens, 0)
+        if pos != len(tokens):
+            raise ValueError(f"unexpected {tokens[pos]!r} in query {expr!r}")
+        return mask
+
+    def _parse_or(self, tokens, pos):
+        mask, pos = self._parse_and(tokens, pos)
+        while pos < len(tokens) and tokens[pos].upper() == "OR":
+            rhs, pos = self._parse_and(tokens, pos + 1)
+            mask = mask | rhs
+        return mask, pos
+
+    def _parse_and(self, tokens, pos):
+        mask, pos = self._parse_not(tokens, pos)
+        while pos < len(tokens) and tokens[pos] != ")" and tokens[pos].upper() != "OR":
+            if tokens[pos].upper() == "AND":
+                pos += 1
+            rhs, pos = self._parse_not(tokens, pos)
+            mask = mask & rhs
+        return mask, pos
+
+    def _parse_not(self, tokens, pos):
+        if pos < len(tokens) and tokens[pos].upper() == "NOT":
+            mask, pos = self._parse_not(tokens, pos + 1)
+            return ~mask, pos
+        return self._parse_atom(tokens, pos)
+
+    def _parse_atom(self, tokens, pos):
+        if pos >= len(tokens):
+            raise ValueError("query ends where a term was expected")
+        token = tokens[pos]
+        if token == "(":
+            mask, pos = self._parse_or(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos] != ")":
+                raise ValueError("missing ) in query")
+            return mask, pos + 1
+        if token == ")" or token.upper() in _OPERATORS:
+            raise ValueError(f"unexpected {token!r} in query")
+        return self.rows_of(token), pos + 1
+
+
+def open_index(proteins_dirs, matcher, path=None, rebuild_index=False, **ingest_kwargs):
+    """
+    The index for proteins_dirs under matcher's lexicons: loaded from path
+    when its fingerprint and lexicon version still match, otherwise built
+    from ingest_corpora() (snapshot + score store, so only changes are
+    parsed or scored) and saved. Returns (index, rebuilt).
+    """
+    from .parallel_ingest import ingest_corpora
+
+    path = path or default_index_path(proteins_dirs, matcher.digest)
+    fingerprint = directory_fingerprint(proteins_dirs)
+    if not rebuild_index:
+        try:
+            index = ProteinIndex.load(path)
+            if (index.meta.get("fingerprint") == fingerprint
+                    and index.meta.get("lexicon_version") == matcher.digest):
+                return index, False
+        except (OSError, ValueError, KeyError):
+            pass
+    proteins, scores, _ = ingest_corpora(proteins_dirs, matcher=matcher, **ingest_kwargs)
+    index = ProteinIndex.build(proteins, scores, meta={
+        "fingerprint": fingerprint, "lexicon_version": matcher.digest})
+    index.save(path)
+    return index, True
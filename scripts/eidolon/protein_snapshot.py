@@ -0,0 +1,144 @@
+"""
+Protein Corpus Snapshot
+=======================
+Compiled binary snapshot of a proteins directory.
+
+Parsing ~2,800 YAML files with the pure-Python loader dominates the
+wall-clock time of every analysis run. The snapshot keeps the fields the
+analysis actually reads in one pickle file, keyed by filename and
+validated against each file's mtime and size, so later runs only reparse
+files that were added or changed since the snapshot was written.
+"""
+
+import os
+import pickle
+
+# Bump whenever the record layout changes; older snapshots are discarded.
+SNAPSHOT_VERSION = 2
+
+SNAPSHOT_FIELDS = (
+    "id", "title", "summary", "insights", "tags",
+    "tier", "coherence_score", "created_at", "source",
+)
+
+
+def default_snapshot_path(proteins_dir):
+    """Snapshot lives next to the proteins directory: <dir>.snapshot"""
+    return os.path.normpath(proteins_dir) + ".snapshot"
+
+
+def parse_protein_file(path):
+    """Parse one protein YAML file into a compact record (None if unusable)."""
+    import yaml   # only when something is actually parsed; snapshot hits never need it
+
+    with open(path) as f:
+        p = yaml.safe_load(f)
+    if not p or not isinstance(p, dict) or not p.get("id"):
+        return None
+    return {k: p[k] for k in SNAPSHOT_FIELDS if k in p}
+
+
+def load_proteins_direct(proteins_dir):
+    """Original per-file path: parse every YAML file, no snapshot involved."""
+    proteins = {}
+    for fname in sorted(os.listdir(proteins_dir)):
+        if not fname.endswith(".yaml"):
+            continue
+        p = parse_protein_file(os.path.join(proteins_dir, fname))
+        if p:
+            proteins[p["id"]] = p
+    return proteins
+
+
+def read_snapshot(snapshot_path):
+    """Return the snapshot's {fname: (mtime_ns, size, record)} map, or {}."""
+    try:
+        with open(snapshot_path, "rb") as f:
+            snap = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return {}
+    if not isinstance(snap, dict) or snap.get("version") != SNAPSHOT_VERSION:
+        return {}
+    return snap.get("entries", {})
+
+
+def write_snapshot(snapshot_path, entries):
+    """Atomically write the snapshot (temp file + rename)."""
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "entries": entries},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+
+def plan_snapshot(proteins_dir, snapshot_path=None, rebuild=False):
+    """
+    Compare a proteins directory against its snapshot.
+
+    Returns a plan dict holding the still-valid cached entries and the
+    (name, path, mtime_ns, size) of every file that must be reparsed.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(proteins_dir)
+    old_entries = {} if rebuild else read_snapshot(snapshot_path)
+
+    entries = {}
+    stale = []
+    with os.scandir(proteins_dir) as it:
+        dir_entries = sorted((e for e in it if e.name.endswith(".yaml")),
+                             key=lambda e: e.name)
+    for entry in dir_entries:
+        st = entry.stat()
+        cached = old_entries.get(entry.name)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            entries[entry.name] = cached
+        else:
+            entries[entry.name] = None
+            stale.append((entry.name, entry.path, st.st_mtime_ns, st.st_size))
+
+    return {
+        "snapshot_path": snapshot_path,
+        "entries": entries,
+        "stale": stale,
+        "removed": len(set(old_entries) - set(entries)),
+        "rebuild": rebuild,
+    }
+
+
+def finish_snapshot(plan, records):
+    """
+    Fill a plan's stale entries with freshly parsed records (same order as
+    plan["stale"]), rewrite the snapshot if anything changed and return
+    (proteins, stats).
+    """
+    entries = plan["entries"]
+    for (name, _, mtime_ns, size), record in zip(plan["stale"], records):
+        entries[name] = (mtime_ns, size, record)
+
+    parsed = len(plan["stale"])
+    if parsed or plan["removed"] or plan["rebuild"]:
+        write_snapshot(plan["snapshot_path"], entries)
+
+    proteins = {}
+    for _, _, record in entries.values():
+        if record:
+            proteins[record["id"]] = record
+    stats = {"reused": len(entries) - parsed, "parsed": parsed, "removed": plan["removed"]}
+    return proteins, stats
+
+
+def load_proteins(proteins_dir, snapshot_path=None, rebuild=False, use_snapshot=True):
+    """
+    Load all proteins in a directory, keyed by id.
+
+    With use_snapshot=False this is exactly the per-file path. Otherwise
+    unchanged files are served from the snapshot and only new or modified
+    files are parsed; rebuild=True ignores any existing snapshot.
+    Returns (proteins, stats) where stats counts reused/parsed/removed files.
+    """
+    if not use_snapshot:
+        proteins = load_proteins_direct(proteins_dir)
+        return proteins, {"reused": 0, "parsed": len(proteins), "removed": 0}
+
+    plan = plan_snapshot(proteins_dir, snapshot_path, rebuild)
+    records = [parse_protein_file(path) for _, path, _, _ in plan["stale"]]
+    return finish_snapshot(plan, records)
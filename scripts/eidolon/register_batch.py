@@ -0,0 +1,213 @@
+"""
+Batch Register Scoring
+======================
+Vectorized equivalent of compute_register_scores() for a whole corpus.
+
+All texts are tokenized once into a sparse document x term count matrix
+over a shared vocabulary. Single-word lexicon entries and the abstract-noun
+suffix test are evaluated once per vocabulary type, not once per token;
+multi-word entries are counted with shifted comparisons over the flat
+token-id array. Every metric is then a NumPy column operation. Values are
+identical to the per-protein function, including its rounding.
+"""
+
+import re
+from itertools import chain
+
+import numpy as np
+
+# Same patterns as tokenize() and the sentence split in compute_register_scores()
+_TOKEN_RE = re.compile(r'[a-z]+')
+# One match per non-empty piece of re.split(r'[.!?]+', text) after strip()
+_SENTENCE_RE = re.compile(r'[^.!?\s][^.!?]*')
+
+MIN_TOKENS = 5
+DEFAULT_BATCH_SIZE = 50_000
+
+
+# ─── Term-Document Matrix ─────────────────────────────────────────────────────
+
+def _count_phrase(indices, doc_of, n_docs, ids):
+    """Occurrences per document of the token-id sequence ids in a flat id array."""
+    span = len(ids)
+    n_starts = len(indices) - span + 1
+    if n_starts <= 0:
+        return np.zeros(n_docs, dtype=np.int64)
+    hit = indices[:n_starts] == ids[0]
+    for k in range(1, span):
+        hit &= indices[k:k + n_starts] == ids[k]
+    hit &= doc_of[:n_starts] == doc_of[span - 1:]
+    return np.bincount(doc_of[:n_starts][hit], minlength=n_docs)
+
+
+def build_term_matrix(texts, vocab=None, phrases=(), batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Tokenize texts into a CSR count matrix (documents x vocabulary), plus a
+    dense documents x phrases count array for the given token tuples.
+
+    Texts are processed in batches. New types are added to the shared
+    vocabulary once per batch, and token -> column lookup runs as a C-level
+    map over the batch, so no Python code executes per token.
+    Pass an existing vocab dict (term -> column) to extend it in place.
+    Returns (matrix, vocab, n_sentences, phrase_counts).
+    """
+    from scipy import sparse   # deferred: importing this module should not pay for SciPy
+
+    vocab = {} if vocab is None else vocab
+    blocks = []
+    n_sentences = np.zeros(len(texts), dtype=np.int64)
+    phrase_counts = np.zeros((len(texts), len(phrases)), dtype=np.int64)
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        token_lists = [_TOKEN_RE.findall(t.lower()) for t in batch]
+        n_sentences[start:start + len(batch)] = [len(_SENTENCE_RE.findall(t)) for t in batch]
+
+        lengths = np.fromiter((len(tl) for tl in token_lists), dtype=np.int64, count=len(batch))
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        flat = list(chain.from_iterable(token_lists))
+        for term in set(flat).difference(vocab):
+            vocab[term] = len(vocab)
+        indices = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+        if phrases:
+            doc_of = np.repeat(np.arange(len(batch)), lengths)
+            for j, phrase in enumerate(phrases):
+                if all(t in vocab for t in phrase):
+                    phrase_counts[start:start + len(batch), j] = _count_phrase(
+                        indices, doc_of, len(batch), [vocab[t] for t in phrase])
+        data = np.ones(len(indices), dtype=np.int64)
+        block = sparse.csr_matrix((data, indices, indptr), shape=(len(batch), max(len(vocab), 1)))
+        block.sum_duplicates()
+        blocks.append(block)
+
+    n_cols = max(len(vocab), 1)
+    for block in blocks:
+        block.resize((block.shape[0], n_cols))
+    if blocks:
+        matrix = sparse.vstack(blocks, format="csr")
+    else:
+        matrix = sparse.csr_matrix((0, n_cols), dtype=np.int64)
+    return matrix, vocab, n_sentences, phrase_counts
+
+
+def vocab_mask(vocab, predicate):
+    """Boolean vector over vocabulary columns where predicate(term) holds."""
+    mask = np.zeros(max(len(vocab), 1), dtype=bool)
+    for term, col in vocab.items():
+        if predicate(term):
+            mask[col] = True
+    return mask
+
+
+# ─── Rounding ─────────────────────────────────────────────────────────────────
+
+def round_like_python(values, ndigits):
+    """
+    Vectorized round() with Python float semantics.
+
+    np.round goes through x * 10**n and can disagree with Python's
+    correctly-rounded round() when x * 10**n sits on a half; those few
+    elements are recomputed with the builtin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        out[i] = round(float(values[i]), ndigits)
+    return out
+
+
+# ─── Scoring ──────────────────────────────────────────────────────────────────
+
+def lexicon_hits(matrix, vocab, phrase_counts, phrases, matcher):
+    """Per-document hit counts for every lexicon of matcher, as {name: array}."""
+    hits = {}
+    for name in matcher.names:
+        words = matcher.words(name)
+        count = matrix @ vocab_mask(vocab, words.__contains__).astype(np.int64)
+        owned = np.array([name in owners for _, owners in phrases], dtype=np.int64)
+        if owned.any():
+            count = count + phrase_counts @ owned
+        hits[name] = np.asarray(count, dtype=np.int64)
+    return hits
+
+
+def score_matrix(matrix, vocab, n_sentences, phrase_counts, phrases, matcher,
+                 abstract_suffixes):
+    """
+    Compute every register metric as a column over the documents of matrix.
+
+    phrases is matcher.phrases(), aligned with the columns of phrase_counts.
+    Returns a dict of arrays keyed like compute_register_scores() plus
+    "valid", the mask of documents with at least MIN_TOKENS tokens (the
+    per-protein function returns None for the rest).
+    """
+    abstract_mask = vocab_mask(vocab, lambda t: t.endswith(abstract_suffixes))
+
+    n_tokens = np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64)
+    n_types = np.diff(matrix.indptr)
+    hits = lexicon_hits(matrix, vocab, phrase_counts, phrases, matcher)
+    zeros = np.zeros(len(n_tokens), dtype=np.int64)
+    metaphor_hits = hits.get("metaphor", zeros)
+    analytical_hits = hits.get("analytical", zeros)
+    abstract_count = matrix @ abstract_mask.astype(np.int64)
+
+    valid = n_tokens >= MIN_TOKENS
+    denom = np.where(valid, n_tokens, 1)
+
+    metaphor_density = metaphor_hits / denom
+    analytical_density = analytical_hits / denom
+    total_register = metaphor_hits + analytical_hits
+    register_ratio = np.full(len(n_tokens), 0.5)
+    has_register = total_register > 0
+    register_ratio[has_register] = metaphor_hits[has_register] / total_register[has_register]
+    ttr = n_types / denom
+    mean_sent_len = np.where(n_sentences > 0, n_tokens / np.maximum(n_sentences, 1), n_tokens)
+    abstract_density = abstract_count / denom
+
+    composite = (
+        0.50 * register_ratio +
+        0.25 * (metaphor_density * 10) +
+        0.15 * ttr +
+        0.10 * (abstract_density * 10)
+    )
+
+    columns = {
+        "metaphor_density": round_like_python(metaphor_density, 4),
+        "analytical_density": round_like_python(analytical_density, 4),
+        "register_ratio": round_like_python(register_ratio, 4),
+        "ttr": round_like_python(ttr, 4),
+        # Same scale-rint-unscale (np.round semantics) as compute_register_scores()
+        "mean_sent_len": np.round(mean_sent_len.astype(np.float64), 2),
+        "abstract_density": round_like_python(abstract_density, 4),
+        "composite": round_like_python(composite, 4),
+        "n_tokens": n_tokens,
+        "metaphor_hits": metaphor_hits.astype(np.int64),
+        "analytical_hits": analytical_hits.astype(np.int64),
+    }
+    for name in matcher.names:
+        if name not in ("metaphor", "analytical"):
+            columns[f"{name}_hits"] = hits[name]
+            columns[f"{name}_density"] = round_like_python(hits[name] / denom, 4)
+    columns["valid"] = valid
+    return columns
+
+
+def score_texts(texts, matcher, abstract_suffixes, batch_size=DEFAULT_BATCH_SIZE):
+    """Build the term matrix for texts and score it. Returns score columns."""
+    phrases = matcher.phrases()
+    matrix, vocab, n_sentences, phrase_counts = build_term_matrix(
+        list(texts), phrases=[seq for seq, _ in phrases], batch_size=batch_size)
+    return score_matrix(matrix, vocab, n_sentences, phrase_counts, phrases,
+                        matcher, abstract_suffixes)
+
+
+def columns_to_rows(columns):
+    """Expand score columns into compute_register_scores()-style dicts (None if too short)."""
+    keys = [k for k in columns if k != "valid"]
+    lists = {k: columns[k].tolist() for k in keys}
+    rows = []
+    for i, ok in enumerate(columns["valid"].tolist()):
+        rows.append({k: lists[k][i] for k in keys} if ok else None)
+    return rows
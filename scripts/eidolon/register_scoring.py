@@ -0,0 +1,208 @@
+"""
+Register Scoring
+================
+The register-scoring library behind register_shimmer_analysis.py:
+built-in lexicons, text extraction, tokenization, per-protein register
+scores and P-series detection.
+
+This module imports only the standard library and lexicon_matcher, so
+tools that just need tokenize(), extract_text() or
+compute_register_scores() start in milliseconds; NumPy, SciPy and YAML
+are loaded by the analysis modules that use them.
+"""
+
+import re
+
+from .lexicon_matcher import load_matcher
+
+# ─── Lexicons ─────────────────────────────────────────────────────────────────
+
+# Metaphorical / bridging / poetic vocabulary
+METAPHOR_TERMS = {
+    # Nature / organic
+    "wave", "ocean", "river", "flow", "stream", "tide", "current", "ripple",
+    "garden", "seed", "root", "bloom", "blossom", "flower", "grow", "growth",
+    "soil", "compost", "fertile", "harvest", "prune", "branch", "leaf", "tree",
+    "forest", "ecosystem", "ecology", "organic", "organism", "living", "alive",
+    "breathe", "breath", "inhale", "exhale",
+    # Fabric / weaving
+    "weave", "thread", "fabric", "tapestry", "knit", "loom", "strand",
+    "braid", "interweave", "interwoven",
+    # Light / perception
+    "shimmer", "glow", "radiance", "luminous", "illuminate", "light", "shadow",
+    "mirror", "reflection", "lens", "prism", "spectrum",
+    # Movement / dance
+    "dance", "spiral", "orbit", "pulse", "rhythm", "vibration", "oscillation",
+    "resonate", "resonance", "resonant", "harmonize", "harmony", "harmonic",
+    "attune", "attunement", "attuned",
+    # Spatial / landscape
+    "landscape", "terrain", "horizon", "bridge", "threshold", "boundary",
+    "edge", "frontier", "shore", "depth", "deep", "abyss",
+    # Figurative connectors
+    "like", "as if", "metaphor", "analogy", "echo", "whisper", "murmur",
+    # Consciousness / experiential
+    "feel", "felt", "sense", "intuition", "awareness", "awaken", "dream",
+    "vision", "imagine", "wonder", "mystery", "sacred", "soul", "spirit",
+    # Transformation
+    "emerge", "emergence", "emergent", "unfold", "unfolding", "evolve",
+    "transform", "metamorphosis", "chrysalis", "cocoon", "gestate",
+    "birth", "midwife", "genesis",
+    # Unity / wholeness
+    "unity", "oneness", "wholeness", "holistic", "integrate", "communion",
+    "symbiosis", "entangle", "entanglement",
+}
+
+# Analytical / technical / domain-specific vocabulary
+ANALYTICAL_TERMS = {
+    # Computing / engineering
+    "system", "process", "function", "parameter", "variable", "compute",
+    "algorithm", "protocol", "implement", "implementation", "architecture",
+    "framework", "module", "component", "interface", "pipeline", "stack",
+    "configure", "configuration", "optimize", "optimization", "efficiency",
+    "debug", "deploy", "execute", "runtime", "instance",
+    # Data / math
+    "data", "dataset", "metric", "measure", "quantify", "calculate",
+    "equation", "formula", "coefficient", "vector", "matrix", "dimension",
+    "linear", "nonlinear", "gradient", "derivative", "integral",
+    "statistic", "statistical", "correlation", "distribution", "variance",
+    "probability", "deterministic", "stochastic",
+    # Structure / formal
+    "structure", "structural", "schema", "taxonomy", "hierarchy",
+    "classify", "classification", "categorize", "enumerate",
+    "specification", "constraint", "requirement", "validate", "validation",
+    "mechanism", "methodology", "procedure", "criterion",
+    # Technical nouns
+    "network", "node", "graph", "edge", "vertex", "cluster",
+    "embedding", "encode", "decode", "compress", "decompress",
+    "index", "query", "retrieve", "store", "database",
+    "api", "endpoint", "server", "client", "request", "response",
+}
+
+# Built-in lexicons; --lexicon NAME=PATH replaces or adds vocabularies
+DEFAULT_LEXICONS = {"metaphor": METAPHOR_TERMS, "analytical": ANALYTICAL_TERMS}
+
+# Abstract noun suffixes (-ness, -ity, -tion, -sion, -ment, -ance, -ence)
+ABSTRACT_SUFFIXES = ('ness', 'ity', 'tion', 'sion', 'ment', 'ance', 'ence')
+
+# ─── Text Processing ──────────────────────────────────────────────────────────
+
+def extract_text(protein):
+    """Combine title + summary + insights into one text block."""
+    parts = []
+    if protein.get("title"):
+        parts.append(str(protein["title"]))
+    if protein.get("summary"):
+        parts.append(str(protein["summary"]))
+    for insight in protein.get("insights", []):
+        if insight:
+            parts.append(str(insight))
+    return " ".join(parts)
+
+
+def tokenize(text):
+    """Simple whitespace + punctuation tokenizer, lowercase."""
+    return re.findall(r'[a-z]+', text.lower())
+
+
+_default_matcher = None
+
+
+def default_matcher():
+    """Compiled matcher for DEFAULT_LEXICONS (built once per process)."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = load_matcher(DEFAULT_LEXICONS)
+    return _default_matcher
+
+
+def compute_register_scores(text, matcher=None):
+    """
+    Compute multiple register metrics for a protein's text.
+    Returns dict of individual scores and a composite score.
+    Lexicons other than metaphor/analytical add <name>_hits/<name>_density.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < 5:
+        return None  # Too short to score
+
+    token_set = set(tokens)
+    n_tokens = len(tokens)
+    n_types = len(token_set)
+
+    # One pass over the tokens matches words and phrases for every lexicon
+    hits = (matcher or default_matcher()).count(tokens)
+
+    # 1. Metaphor density: metaphorical words/phrases per token
+    metaphor_hits = hits.get("metaphor", 0)
+    metaphor_density = metaphor_hits / n_tokens
+
+    # 2. Analytical density: analytical words/phrases per token
+    analytical_hits = hits.get("analytical", 0)
+    analytical_density = analytical_hits / n_tokens
+
+    # 3. Register ratio: metaphor / (metaphor + analytical), centered at 0.5
+    total_register = metaphor_hits + analytical_hits
+    if total_register > 0:
+        register_ratio = metaphor_hits / total_register
+    else:
+        register_ratio = 0.5  # neutral
+
+    # 4. Type-token ratio (lexical diversity)
+    ttr = n_types / n_tokens if n_tokens > 0 else 0
+
+    # 5. Mean sentence length
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+    if sentences:
+        mean_sent_len = sum(len(tokenize(s)) for s in sentences) / len(sentences)
+    else:
+        mean_sent_len = n_tokens
+
+    # 6. Abstract noun density (words ending in -ness, -ity, -tion, -ment, -ance, -ence)
+    abstract_count = sum(1 for t in tokens if t.endswith(ABSTRACT_SUFFIXES))
+    abstract_density = abstract_count / n_tokens
+
+    # Composite register score: higher = more poetic/metaphorical
+    # Weighted blend: register_ratio (primary), metaphor_density, -analytical_density
+    composite = (
+        0.50 * register_ratio +
+        0.25 * (metaphor_density * 10) +  # scale up (typical range 0-0.1)
+        0.15 * ttr +
+        0.10 * (abstract_density * 10)     # scale up
+    )
+
+    scores = {
+        "metaphor_density": round(metaphor_density, 4),
+        "analytical_density": round(analytical_density, 4),
+        "register_ratio": round(register_ratio, 4),
+        "ttr": round(ttr, 4),
+        # Scale-rint-unscale, i.e. the np.round semantics of the original NumPy mean
+        "mean_sent_len": round(mean_sent_len * 100) / 100,
+        "abstract_density": round(abstract_density, 4),
+        "composite": round(composite, 4),
+        "n_tokens": n_tokens,
+        "metaphor_hits": metaphor_hits,
+        "analytical_hits": analytical_hits,
+    }
+    for name, count in hits.items():
+        if name not in ("metaphor", "analytical"):
+            scores[f"{name}_hits"] = count
+            scores[f"{name}_density"] = round(count / n_tokens, 4)
+    return scores
+
+
+# ─── P-series Detection ───────────────────────────────────────────────────────
+
+def extract_p_number(protein):
+    """Extract P-series number from tags or title if present."""
+    tags = protein.get("tags", [])
+    for tag in tags:
+        m = re.match(r'#P(\d+)', tag)
+        if m:
+            return int(m.group(1))
+    # Check title
+    title = protein.get("title", "")
+    m = re.match(r'P(\d+)', title)
+    if m:
+        return int(m.group(1))
+    return None
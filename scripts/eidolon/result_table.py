@@ -0,0 +1,164 @@
+"""
+Columnar Result Table
+=====================
+Per-protein analysis results as one typed NumPy array per metric.
+
+The table replaces a list of ~17-key dicts. Each protein costs one slot per
+column (8 bytes for most) plus references to its interned id and title
+strings, instead of a dict with boxed floats. Analysis sections read whole
+columns (table["s5"]) and take masks or index arrays.
+
+Tiers are stored as small integer codes plus a name list, as in the
+metrics store. Where code wants a row, table.row(i) returns a ResultRow,
+a __slots__ view that reads from the columns on access (r["s5"],
+r["title"]) and is never copied.
+"""
+
+import sys
+
+import numpy as np
+
+TITLE_LENGTH = 80
+
+# Column dtypes for compute_register_scores() keys that are counts; all others float64
+INT_COLUMNS = ("n_tokens", "metaphor_hits", "analytical_hits")
+
+
+class ResultRow:
+    """Read-only view of one table row, indexable like the old result dict."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.table.value(key, self.index)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {key: self[key] for key in self.table.keys()}
+
+
+class ResultTable:
+    """Typed columns + interned ids/titles/tiers for the analysed proteins."""
+
+    def __init__(self, ids, titles, columns, tier_codes=None, tiers=()):
+        self.ids = [sys.intern(pid) for pid in ids]
+        self.titles = [sys.intern(t) for t in titles]
+        self.columns = dict(columns)
+        self.tier_codes = (np.zeros(len(self.ids), dtype=np.int8) if tier_codes is None
+                           else np.asarray(tier_codes))
+        self.tiers = list(tiers)
+
+    @classmethod
+    def from_scores(cls, ids, titles, scores, columns, tier_codes=None, tiers=()):
+        """
+        Table of the proteins whose score is not None.
+
+        ids/titles/scores are aligned lists (scores from compute_register_scores()
+        or the ingest stage); columns are name -> array aligned with them, e.g.
+        metrics gathered at the proteins' rows. Titles are cut to TITLE_LENGTH.
+        """
+        keep = np.array([s is not None for s in scores], dtype=bool)
+        kept = [s for s in scores if s is not None]
+        out = {name: np.asarray(col)[keep] for name, col in columns.items()}
+        for key in (kept[0] if kept else ()):
+            dtype = np.int64 if key in INT_COLUMNS or key.endswith("_hits") else np.float64
+            out[key] = np.fromiter((s[key] for s in kept), dtype=dtype, count=len(kept))
+        idx = np.flatnonzero(keep).tolist()
+        return cls(
+            [ids[i] for i in idx],
+            [(titles[i] or "")[:TITLE_LENGTH] for i in idx],
+            out,
+            None if tier_codes is None else np.asarray(tier_codes)[keep],
+            tiers,
+        )
+
+    @classmethod
+    def from_score_columns(cls, ids, titles, score_columns, columns, tier_codes=None, tiers=()):
+        """
+        Like from_scores(), for scores that are already columns (with the
+        "valid" mask of the score store / inverted index).
+        """
+        keep = np.asarray(score_columns["valid"], dtype=bool)
+        out = {name: np.asarray(col)[keep] for name, col in columns.items()}
+        out.update({name: np.asarray(col)[keep] for name, col in score_columns.items()
+                    if name != "valid"})
+        idx = np.flatnonzero(keep).tolist()
+        return cls(
+            [ids[i] for i in idx],
+            [(titles[i] or "")[:TITLE_LENGTH] for i in idx],
+            out,
+            None if tier_codes is None else np.asarray(tier_codes)[keep],
+            tiers,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def keys(self):
+        return ["id", "title", "tier", *self.columns]
+
+    def add_column(self, name, values):
+        values = np.asarray(values)
+        if len(values) != len(self):
+            raise ValueError(f"column {name!r} has {len(values)} values for {len(self)} rows")
+        self.columns[name] = values
+
+    def value(self, key, i):
+        """One cell as a Python value."""
+        if key == "id":
+            return self.ids[i]
+        if key == "title":
+            return self.titles[i]
+        if key == "tier":
+            return self.tiers[self.tier_codes[i]]
+        return self.columns[key][i].item()
+
+    def row(self, i):
+        return ResultRow(self, int(i))
+
+    def rows(self, indices=None):
+        """Row views for indices (default: every row, in order)."""
+        if indices is None:
+            indices = range(len(self))
+        return [ResultRow(self, int(i)) for i in indices]
+
+    def order(self, key, indices=None, reverse=False):
+        """
+        indices (default: all rows) sorted by column key, stable in both
+        directions like list.sort(key=..., reverse=...).
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        values = self.columns[key][indices]
+        if reverse:
+            # Stable descending: ascending sort of the reversed order, reversed back
+            flipped = np.argsort(values[::-1], kind="stable")[::-1]
+            return indices[::-1][flipped]
+        return indices[np.argsort(values, kind="stable")]
+
+    def take(self, selector):
+        """New table with the rows of a boolean mask or an index array."""
+        idx = np.flatnonzero(selector) if np.asarray(selector).dtype == bool else selector
+        idx = np.asarray(idx, dtype=np.int64)
+        return ResultTable([self.ids[i] for i in idx.tolist()],
+                           [self.titles[i] for i in idx.tolist()],
+                           {name: col[idx] for name, col in self.columns.items()},
+                           self.tier_codes[idx], self.tiers)
+
+    def nbytes(self):
+        """Bytes held by the typed columns (excluding the shared id/title strings)."""
+        return sum(col.nbytes for col in self.columns.values()) + self.tier_codes.nbytes
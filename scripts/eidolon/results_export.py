@@ -0,0 +1,197 @@
+"""
+Columnar Results Export
+=======================
+The full per-protein results table (scores, metrics, PC1 percentile,
+quadrant, ...) in one file that other tools memory-map instead of
+rerunning the analysis.
+
+Layout:
+
+  magic      8 bytes, b"EIDRES" + format version (uint16, little-endian)
+  length     uint64, little-endian: bytes of the schema that follows
+  schema     UTF-8 JSON: rows, columns (dtype, offset, nbytes),
+             categories (code -> name lists, e.g. tier, quadrant), meta
+  columns    raw little-endian arrays, each on a 64-byte boundary;
+             offsets are relative to the first column
+
+Numeric columns are row-aligned arrays. ids and titles are UTF-8 blobs
+with int64 offsets (n + 1). Tiers are stored as codes, with the names
+kept in the schema under categories.
+
+ResultsExport maps the file once, and column() returns read-only views
+into that mapping, so nothing is copied or parsed until a value is read.
+to_table() rebuilds the ResultTable the report runs on, which lets
+register_shimmer_analysis.py --from-export regenerate the report without
+YAML, lexicons or the metrics JSON. The file is written to a temporary
+path and renamed, so readers never see a partial export.
+
+Usage: python -m eidolon.results_export <export> [--head N]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+EXPORT_VERSION = 1
+MAGIC = b"EIDRES"
+ALIGN = 64
+STRING_COLUMNS = ("id", "title")
+
+_HEADER = struct.Struct("<6sHQ")
+
+
+def default_export_path(results_path):
+    """Export lives next to the results JSON: <name>.table"""
+    return os.path.splitext(results_path)[0] + ".table"
+
+
+def _padding(n):
+    return -n % ALIGN
+
+
+def _encode_strings(values):
+    """UTF-8 blob + int64 offsets for a list of strings."""
+    encoded = [v.encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+# ─── Writer ───────────────────────────────────────────────────────────────────
+
+def write_export(path, table, categories=None, meta=None):
+    """
+    Write a ResultTable to path (atomic replace). categories maps integer
+    code columns to their names (tier is added from the table); meta is
+    any JSON-serialisable run information.
+    """
+    arrays = {}
+    for name in STRING_COLUMNS:
+        blob, offsets = _encode_strings(table.ids if name == "id" else table.titles)
+        arrays[f"{name}.offsets"] = offsets
+        arrays[f"{name}.utf8"] = blob
+    arrays["tier"] = table.tier_codes
+    arrays.update(table.columns)
+
+    columns, offset = {}, 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr, dtype=np.asarray(arr).dtype.newbyteorder("<"))
+        arrays[name] = arr
+        columns[name] = {"dtype": arr.dtype.str, "offset": offset, "nbytes": arr.nbytes}
+        offset += arr.nbytes + _padding(arr.nbytes)
+
+    schema = json.dumps({
+        "rows": len(table),
+        "columns": columns,
+        "categories": {"tier": list(table.tiers), **(categories or {})},
+        "meta": meta or {},
+    }).encode()
+    header = _HEADER.pack(MAGIC, EXPORT_VERSION, len(schema)) + schema
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + b"\0" * _padding(len(header)))
+        for arr in arrays.values():
+            f.write(arr.tobytes())
+            f.write(b"\0" * _padding(arr.nbytes))
+    os.replace(tmp_path, path)
+    return path
+
+
+# ─── Reader ───────────────────────────────────────────────────────────────────
+
+class ResultsExport:
+    """Memory-mapped, read-only view of an export file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a results export")
+            if version != EXPORT_VERSION:
+                raise ValueError(f"unsupported results export version: {version}")
+            schema = json.loads(f.read(length))
+        self.rows = schema["rows"]
+        self.schema = schema["columns"]
+        self.categories = schema["categories"]
+        self.meta = schema["meta"]
+        start = _HEADER.size + length
+        self._start = start + _padding(start)
+        self._buf = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return self.rows
+
+    def _raw(self, name):
+        spec = self.schema[name]
+        begin = self._start + spec["offset"]
+        return self._buf[begin:begin + spec["nbytes"]].view(np.dtype(spec["dtype"]))
+
+    def names(self):
+        """Numeric columns (excluding tier and the string blobs)."""
+        return [n for n in self.schema
+                if n != "tier" and n.split(".")[0] not in STRING_COLUMNS]
+
+    def column(self, name):
+        """Zero-copy view of one numeric column (or the tier codes)."""
+        if name not in self.schema or name.split(".")[0] in STRING_COLUMNS:
+            raise KeyError(name)
+        return self._raw(name)
+
+    def strings(self, name):
+        """All values of a string column (id or title), decoded."""
+        offsets = self._raw(f"{name}.offsets").tolist()
+        blob = self._raw(f"{name}.utf8").tobytes()
+        return [blob[a:b].decode() for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def string(self, name, i):
+        """One value of a string column."""
+        a, b = self._raw(f"{name}.offsets")[i:i + 2].tolist()
+        return self._raw(f"{name}.utf8")[a:b].tobytes().decode()
+
+    def labels(self, name):
+        """Category names for each row of a code column (tier, quadrant)."""
+        names = self.categories[name]
+        return [names[c] for c in self.column(name).tolist()]
+
+    def to_table(self):
+        """ResultTable over the mapped columns (only ids and titles are decoded)."""
+        from .result_table import ResultTable
+
+        return ResultTable(self.strings("id"), self.strings("title"),
+                           {name: self.column(name) for name in self.names()},
+                           tier_codes=self.column("tier"), tiers=self.categories["tier"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("export", help="export file written by register_shimmer_analysis.py")
+    parser.add_argument("--head", type=int, default=5, metavar="N", help="rows to print")
+    args = parser.parse_args(argv)
+
+    export = ResultsExport(args.export)
+    print(f"{args.export}: {len(export)} rows, {os.path.getsize(args.export) / 1e6:.1f} MB")
+    for key, value in export.meta.items():
+        print(f"  {key}: {value}")
+    print(f"\n  {'Column':<22} {'dtype':<6} {'Categories'}")
+    for name in ["tier"] + export.names():
+        names = export.categories.get(name)
+        print(f"  {name:<22} {export.schema[name]['dtype']:<6} "
+              f"{', '.join(names) if names else ''}")
+    head = min(args.head, len(export))
+    if head:
+        print()
+        s5, composite = export.column("s5"), export.column("composite")
+        for i in range(head):
+            print(f"  {export.string('id', i)[:24]:<24} S5={s5[i]:.3f} Comp={composite[i]:.3f} "
+                  f"| {export.string('title', i)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
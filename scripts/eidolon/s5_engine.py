@@ -0,0 +1,293 @@
+"""
+Local S5 Shimmer Engine
+=======================
+Recomputes S5 from a local embedding matrix, so newly synthesized proteins
+get a shimmer score without waiting for the global connectome rebuild.
+
+  S5 = coherence x (1 - tag_overlap with the k=20 amplitude-space neighbours)
+  tag_overlap(i) = mean over neighbours j of |T_i & T_j| / |T_i|
+
+where T is the protein's semantic tag set (tags_sem: YAML tags minus the
+system/provenance tags). This reproduces the upstream spore metrics: with
+k=20, 1 - s5/coh is always a multiple of 1 / (20 x |T_i|).
+
+Neighbours come from an exact kNN index built with blocked matrix products
+(no per-pair Python), and tag overlap is a popcount over the frequent-tag
+bitset plus a merge of the sparse tag tails (tag_bitset.TagTable). The index is saved as .npz and new proteins can be
+inserted incrementally: their neighbours are found against the whole index
+and existing rows only re-rank against the new points.
+
+Embeddings are an .npz with "ids" and "embeddings" (or "amplitudes")
+arrays, or an .npy matrix with a sidecar <name>.ids.txt (one id per row).
+"""
+
+import os
+
+import numpy as np
+
+from .tag_bitset import TagTable
+
+DEFAULT_K = 20
+# Working-set budget for one block of the distance matrix
+DEFAULT_MEMORY = 256 << 20
+# Bytes held per distance cell while a block is live: the float32 distance
+# and a float32 copy, an int64 candidate index and its argpartition index
+_CELL_BYTES = 24
+
+# Tags that describe provenance/system state, not semantics (excluded from tags_sem)
+SYSTEM_TAGS = {"#public", "#calibration", "#calibration_anchor"}
+SYSTEM_TAG_PREFIXES = ("#embed:", "#dna:", "#synthesis:", "#source:", "#calibration:")
+
+
+def semantic_tags(tags):
+    """YAML tags -> tags_sem (same filtering as the global connectome)."""
+    return [t for t in tags or [] if t not in SYSTEM_TAGS and not t.startswith(SYSTEM_TAG_PREFIXES)]
+
+
+def load_embeddings(path):
+    """Read (ids, float32 matrix) from an .npz or an .npy plus <name>.ids.txt."""
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as data:
+            key = "embeddings" if "embeddings" in data.files else "amplitudes"
+            return [str(i) for i in data["ids"].tolist()], np.asarray(data[key], dtype=np.float32)
+    vectors = np.load(path, mmap_mode="r")
+    with open(os.path.splitext(path)[0] + ".ids.txt") as f:
+        ids = [line.strip() for line in f if line.strip()]
+    if len(ids) != len(vectors):
+        raise ValueError(f"{path}: {len(vectors)} rows but {len(ids)} ids")
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+# ─── kNN Index ────────────────────────────────────────────────────────────────
+
+def _prepare(vectors, metric):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1)
+    return vectors
+
+
+def _distances(queries, base, metric, base_sq=None):
+    """Pairwise distances (queries x base); smaller is closer."""
+    if metric == "cosine":
+        return 1.0 - queries @ base.T
+    q_sq = np.einsum("ij,ij->i", queries, queries)[:, None]
+    b_sq = np.einsum("ij,ij->i", base, base)[None, :] if base_sq is None else base_sq[None, :]
+    return np.maximum(q_sq + b_sq - 2.0 * (queries @ base.T), 0.0)
+
+
+def _block_rows(n_cols, memory):
+    """Rows per block so a rows x n_cols distance block stays within memory."""
+    return max(1, memory // (_CELL_BYTES * max(n_cols, 1)))
+
+
+def _top_k(dist, cand_idx, k):
+    """Row-wise k smallest of dist (sorted) and the matching cand_idx entries."""
+    if k == 0:
+        empty = np.zeros((len(dist), 0))
+        return empty.astype(dist.dtype), empty.astype(np.int64)
+    if k < dist.shape[1]:
+        part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(dist.shape[1]), dist.shape)
+    part_dist = np.take_along_axis(dist, part, axis=1)
+    order = np.argsort(part_dist, axis=1, kind="stable")
+    part = np.take_along_axis(part, order, axis=1)
+    return np.take_along_axis(part_dist, order, axis=1), np.take_along_axis(cand_idx, part, axis=1)
+
+
+class KnnIndex:
+    """Exact k-nearest-neighbour table over an embedding matrix."""
+
+    def __init__(self, ids, vectors, k=DEFAULT_K, metric="cosine",
+                 nbr_idx=None, nbr_dist=None):
+        if metric not in ("cosine", "euclidean"):
+            raise ValueError(f"unknown metric: {metric}")
+        self.ids = list(ids)
+        self.vectors = vectors
+        self.k = k
+        self.metric = metric
+        self.nbr_idx = nbr_idx
+        self.nbr_dist = nbr_dist
+
+    @classmethod
+    def build(cls, ids, vectors, k=DEFAULT_K, metric="cosine", memory=DEFAULT_MEMORY):
+        index = cls([], np.zeros((0, np.shape(vectors)[1]), dtype=np.float32), k, metric,
+                    np.zeros((0, k), dtype=np.int64), np.zeros((0, k), dtype=np.float32))
+        index.add(ids, vectors, memory=memory)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _self_knn(self, queries, q_offset, base, memory):
+        """
+        kNN of queries (rows q_offset.. of base) against base, excluding self.
+        Queries go in blocks sized from memory; each block is cut to its
+        top-k before the next one is computed.
+        """
+        block = _block_rows(len(base), memory)
+        base_sq = np.einsum("ij,ij->i", base, base) if self.metric == "euclidean" else None
+        all_idx = np.arange(len(base))
+        out_idx = np.empty((len(queries), min(self.k, len(base) - 1)), dtype=np.int64)
+        out_dist = np.empty(out_idx.shape, dtype=np.float32)
+        for start in range(0, len(queries), block):
+            q = queries[start:start + block]
+            dist = _distances(q, base, self.metric, base_sq)
+            rows = np.arange(len(q))
+            dist[rows, q_offset + start + rows] = np.inf
+            d, i = _top_k(dist, np.broadcast_to(all_idx, dist.shape), out_idx.shape[1])
+            out_idx[start:start + len(q)] = i
+            out_dist[start:start + len(q)] = d
+            del dist
+        return out_idx, out_dist
+
+    def add(self, ids, vectors, memory=DEFAULT_MEMORY):
+        """
+        Insert new rows. New rows get exact neighbours over the whole index;
+        existing rows merge the new points into their current top-k.
+        Returns the row indices whose neighbour lists changed.
+        """
+        new = _prepare(vectors, self.metric)
+        if not len(new):
+            return np.zeros(0, dtype=np.int64)
+        n_old = len(self.ids)
+        base = np.vstack([self.vectors, new]) if n_old else new
+        k_eff = min(self.k, len(base) - 1)
+
+        new_idx, new_dist = self._self_knn(new, n_old, base, memory)
+
+        changed = [np.arange(n_old, len(base))]
+        merged_idx = np.empty((n_old, k_eff), dtype=np.int64)
+        merged_dist = np.empty((n_old, k_eff), dtype=np.float32)
+        new_cols = np.arange(n_old, len(base))
+        new_sq = np.einsum("ij,ij->i", new, new) if self.metric == "euclidean" else None
+        block = _block_rows(self.nbr_idx.shape[1] + len(new), memory)
+        for start in range(0, n_old, block):
+            old = self.vectors[start:start + block]
+            dist_new = _distances(old, new, self.metric, new_sq).astype(np.float32)
+            cand_dist = np.hstack([self.nbr_dist[start:start + block], dist_new])
+            cand_idx = np.hstack([self.nbr_idx[start:start + block],
+                                  np.broadcast_to(new_cols, dist_new.shape)])
+            d, i = _top_k(cand_dist, cand_idx, k_eff)
+            merged_idx[start:start + len(old)] = i
+            merged_dist[start:start + len(old)] = d
+            if self.nbr_idx.shape[1] == k_eff:
+                moved = np.any(i != self.nbr_idx[start:start + block], axis=1)
+            else:
+                moved = np.ones(len(old), dtype=bool)
+            changed.append(start + np.flatnonzero(moved))
+
+        self.ids.extend(ids)
+        self.vectors = base
+        self.nbr_idx = np.vstack([merged_idx, new_idx])
+        self.nbr_dist = np.vstack([merged_dist, new_dist])
+        return np.concatenate(changed)
+
+    def save(self, path):
+        """Persist the index (atomic replace)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.array(self.ids, dtype=str), vectors=self.vectors,
+                     nbr_idx=self.nbr_idx, nbr_dist=self.nbr_dist,
+                     k=np.int64(self.k), metric=np.array(self.metric))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"].tolist(), data["vectors"], int(data["k"]), str(data["metric"]),
+                       data["nbr_idx"], data["nbr_dist"])
+
+
+def sync_index(index_path, ids, vectors, k=DEFAULT_K, metric="cosine"):
+    """
+    Load the index at index_path and insert any ids it does not have yet;
+    rebuild from scratch if it is missing, built with other settings, or
+    its rows are not a prefix of ids and vectors (an existing protein's
+    embedding changed). Returns (index, n_inserted, rebuilt).
+    """
+    index = None
+    if index_path and os.path.exists(index_path):
+        try:
+            index = KnnIndex.load(index_path)
+        except (OSError, ValueError, KeyError):
+            index = None
+    if (index is None or index.k != k or index.metric != metric
+            or index.ids != list(ids[:len(index.ids)])
+            or not np.array_equal(index.vectors, _prepare(vectors[:len(index)], metric))):
+        index = KnnIndex.build(ids, vectors, k, metric)
+        inserted, rebuilt = len(ids), True
+    else:
+        inserted, rebuilt = len(ids) - len(index), False
+        if inserted:
+            index.add(list(ids[len(index):]), vectors[len(index):])
+    if index_path and (rebuilt or inserted):
+        index.save(index_path)
+    return index, inserted, rebuilt
+
+
+# ─── S5 ───────────────────────────────────────────────────────────────────────
+
+def tag_overlap(index, tag_sets):
+    """Mean over each row's neighbours of |T_i & T_j| / |T_i| (0 for untagged rows)."""
+    table = tag_sets if isinstance(tag_sets, TagTable) else TagTable.from_lists(tag_sets)
+    own = table.sizes().astype(np.float64)
+    shared = table.neighbour_overlap(index.nbr_idx)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overlap = shared.mean(axis=1) / own
+    return np.where(own > 0, overlap, 0.0)
+
+
+def compute_s5(index, tag_sets, coherence, ndigits=4):
+    """S5 for every row of index; tag_sets (lists or a TagTable) and coherence are row-aligned."""
+    overlap = tag_overlap(index, tag_sets)
+    return np.round(np.asarray(coherence, dtype=np.float64) * (1.0 - overlap), ndigits)
+
+
+def local_metrics(proteins, embeddings_path, index_path=None, upstream=None,
+                  k=DEFAULT_K, metric="cosine"):
+    """
+    Spore-metrics records computed locally for every protein that has an
+    embedding row. Rows without a local protein (e.g. the rest of the
+    global connectome) still take part as neighbours, using upstream
+    tags_sem/coh when available.
+
+    Returns ({id: {s5, coh, energy, pc1, tier, tags_sem}}, stats).
+    """
+    ids, vectors = load_embeddings(embeddings_path)
+    if index_path is None:
+        index_path = os.path.splitext(embeddings_path)[0] + ".knn.npz"
+    index, inserted, rebuilt = sync_index(index_path, ids, vectors, k, metric)
+
+    upstream = upstream or {}
+    tag_sets, coherence = [], []
+    for pid in ids:
+        protein = proteins.get(pid)
+        if protein is not None:
+            tag_sets.append(semantic_tags(protein.get("tags")))
+            coherence.append(protein.get("coherence_score") or 0.0)
+        else:
+            up = upstream.get(pid, {})
+            tag_sets.append(up.get("tags_sem", []))
+            coherence.append(up.get("coh", 0.0))
+    s5 = compute_s5(index, tag_sets, coherence).tolist()
+    pc1 = np.asarray(vectors[:, 0], dtype=np.float64).tolist()
+
+    records = {}
+    for row, pid in enumerate(ids):
+        protein = proteins.get(pid)
+        if protein is None:
+            continue
+        records[pid] = {
+            "s5": s5[row],
+            "coh": coherence[row],
+            "energy": float("nan"),   # not derivable from the amplitudes alone
+            "pc1": pc1[row],
+            "tier": protein.get("tier") or "",
+            "tags_sem": tag_sets[row],
+        }
+    stats = {"embedded": len(ids), "inserted": inserted, "rebuilt": rebuilt,
+             "index_path": index_path}
+    return records, stats
@@ -0,0 +1,96 @@
+"""
+Persistent Register Score Store
+===============================
+Per-protein register scores kept between runs, so a run only rescores
+proteins that are new or whose scored text changed.
+
+Each entry is keyed by protein id plus a hash of the scored text
+(extract_text(): title + summary + insights). The lexicon version (the
+matcher digest) is part of the file name, so changing a vocabulary starts
+a fresh store instead of reusing stale counts. Scores are stored as one
+column per metric in an .npz file and expanded back into rows on demand.
+"""
+
+import hashlib
+import os
+import zipfile
+
+import numpy as np
+
+from .paths import SCRIPTS_DIR
+
+STORE_VERSION = 1
+
+DEFAULT_STORE_DIR = os.path.join(SCRIPTS_DIR, ".score-cache")
+
+
+def text_hash(text):
+    """Short content hash of a protein's scored text."""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def store_path_for(lexicon_version, store_dir=DEFAULT_STORE_DIR):
+    return os.path.join(store_dir, f"scores-v{STORE_VERSION}-{lexicon_version}.npz")
+
+
+class ScoreStore:
+    """Columns of stored scores, indexed by protein id."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}   # id -> (text hash, score row or None)
+        self._load()
+
+    def _load(self):
+        """Read the store; a missing, truncated or corrupt file is an empty store."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                columns = {k: data[k] for k in data.files}
+            ids = columns.pop("ids").tolist()
+            hashes = columns.pop("hashes").tolist()
+            valid = columns.pop("valid").tolist()
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return
+        keys = list(columns)
+        lists = {k: columns[k].tolist() for k in keys}
+        for i, pid in enumerate(ids):
+            row = {k: lists[k][i] for k in keys} if valid[i] else None
+            self.entries[pid] = (hashes[i], row)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, pid, digest):
+        """(True, row) if pid is stored with this text hash, else (False, None)."""
+        entry = self.entries.get(pid)
+        if entry is None or entry[0] != digest:
+            return False, None
+        return True, entry[1]
+
+    def put(self, pid, digest, row):
+        self.entries[pid] = (digest, row)
+
+    def save(self):
+        """Write every entry back as columns (atomic replace)."""
+        ids = list(self.entries)
+        rows = [self.entries[pid][1] for pid in ids]
+        keys = []
+        for row in rows:
+            if row is not None:
+                keys = list(row)
+                break
+        columns = {
+            "ids": np.array(ids, dtype=str),
+            "hashes": np.array([self.entries[pid][0] for pid in ids], dtype=str),
+            "valid": np.array([row is not None for row in rows], dtype=bool),
+        }
+        for k in keys:
+            values = [row[k] if row is not None else 0 for row in rows]
+            dtype = np.int64 if all(isinstance(v, int) for v in values) else np.float64
+            columns[k] = np.array(values, dtype=dtype)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, self.path)
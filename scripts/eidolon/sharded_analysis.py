@@ -0,0 +1,633 @@
+"""
+Out-of-Core Sharded Analysis
+============================
+Streaming version of the register-shimmer analysis for corpora that do
+not fit in memory as result rows.
+
+Protein files are processed in shards. Each shard is parsed, scored and
+joined to the (memory-mapped) spore metrics, reduced to a compact column
+spill file on disk, and summarized into mergeable statistics:
+
+  Moments         count / mean / co-moment matrix (Pearson, std, Cohen's d)
+  QuantileSketch  KLL-style compactor sketch (quintiles, medians, ranks)
+  TopK            bounded heaps (quadrant examples, top-10 lists, and the
+                  P-series table, capped at the P_SERIES_LIMIT lowest P-numbers)
+
+Two passes are needed because several sections condition on global
+quantiles. Pass 1 builds moments and sketches; pass 2 reads the spill
+files back and accumulates everything conditioned on the pass-1 quantiles
+(quintile means, bridge region, quadrants, top lists, approximate
+Spearman via sketch mid-ranks). Every summary has merge(), so shards can
+run on a process pool or on other machines and be combined in any order.
+Memory is bounded by the shard size plus the sketch and heap sizes.
+
+Sketch error: a sketch holds at most ~3k items for the default k. While
+a sketch has seen no more than k values it is exact, and every result
+matches the in-memory analysis. Beyond that, quantile and rank estimates
+carry a rank error of about 1/k of n (k=512: <0.5% of n in practice), so
+quintile edges, medians, PC1 percentiles and Spearman ρ are approximate
+within that error; Pearson statistics, counts and means of unconditioned
+columns are exact. Mann-Whitney U has no mergeable form and is only
+reported by the in-memory path. Protein ids are assumed unique across
+directories (the in-memory path keeps the last duplicate).
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from .metrics_store import SporeMetrics, default_store_path
+from .protein_snapshot import parse_protein_file
+from .register_batch import round_like_python, score_texts
+from .register_scoring import ABSTRACT_SUFFIXES, extract_text
+from .significance import SignificanceEngine, parametric_p
+from .tag_bitset import TagTable
+from .temporal_drift import local_peaks
+
+DEFAULT_SHARD_SIZE = 5000
+DEFAULT_SKETCH_K = 512
+TOP_N = 10
+# Section 7 lists every P-series protein; beyond this many only the lowest P-numbers are kept
+P_SERIES_LIMIT = 10000
+
+REGISTER_COLUMNS = ("composite", "metaphor_density", "analytical_density",
+                    "register_ratio", "ttr")
+
+
+# ─── Mergeable Summaries ──────────────────────────────────────────────────────
+
+class Moments:
+    """Count, means and co-moments of named columns (Chan et al. merge)."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        d = len(self.names)
+        self.n = 0
+        self.mean = np.zeros(d)
+        self.comoment = np.zeros((d, d))
+        self.min = np.full(d, np.inf)
+        self.max = np.full(d, -np.inf)
+
+    def _combine(self, n, mean, comoment, lo, hi):
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * self.n * n / total
+        self.mean = self.mean + delta * n / total
+        self.n = total
+        self.min = np.minimum(self.min, lo)
+        self.max = np.maximum(self.max, hi)
+
+    def update(self, columns):
+        """Add rows given as {name: array}."""
+        data = np.column_stack([np.asarray(columns[k], dtype=np.float64) for k in self.names])
+        if not len(data):
+            return
+        mean = data.mean(axis=0)
+        centred = data - mean
+        self._combine(len(data), mean, centred.T @ centred, data.min(axis=0), data.max(axis=0))
+
+    def merge(self, other):
+        self._combine(other.n, other.mean, other.comoment, other.min, other.max)
+        return self
+
+    def _i(self, name):
+        return self.names.index(name)
+
+    def get_mean(self, name):
+        return float(self.mean[self._i(name)]) if self.n else float("nan")
+
+    def std(self, name):
+        """Population standard deviation (as np.std)."""
+        i = self._i(name)
+        return float(np.sqrt(self.comoment[i, i] / self.n)) if self.n else float("nan")
+
+    def pearson(self, a, b):
+        """(r, two-sided p) between two columns."""
+        i, j = self._i(a), self._i(b)
+        denom = np.sqrt(self.comoment[i, i] * self.comoment[j, j])
+        if self.n < 2 or denom == 0:
+            return float("nan"), float("nan")
+        r = float(np.clip(self.comoment[i, j] / denom, -1.0, 1.0))
+        return r, float(parametric_p(r, self.n))
+
+
+class QuantileSketch:
+    """
+    KLL-style mergeable quantile sketch. Level h holds items of weight 2**h;
+    a level over capacity is sorted and every other item is promoted.
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_K):
+        self.k = k
+        self.n = 0
+        self.min, self.max = np.inf, -np.inf   # exact, so the 0/100 percentiles are too
+        self.levels = [np.zeros(0)]
+        self._parity = 0   # alternates the compaction offset (deterministic)
+
+    def _capacity(self, h):
+        return max(int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h))), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            buf = self.levels[h]
+            if len(buf) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.zeros(0))
+                buf = np.sort(buf)
+                odd = len(buf) % 2
+                promoted = buf[odd + self._parity::2]
+                self._parity ^= 1
+                self.levels[h] = buf[:odd]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min, self.max = min(self.min, values.min()), max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, buf in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], buf])
+        self.n += other.n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress()
+        return self
+
+    @property
+    def exact(self):
+        return all(len(buf) == 0 for buf in self.levels[1:])
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(buf), 2 ** h, dtype=np.int64)
+                                  for h, buf in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Value at percentile q (0-100, scalar or array), as np.percentile when exact."""
+        if self.exact:
+            return np.percentile(self.levels[0], q)
+        values, cum = self._weighted()
+        q = np.asarray(q, dtype=np.float64)
+        out = values[np.minimum(np.searchsorted(cum, q / 100 * (cum[-1] - 1) + 1), len(values) - 1)]
+        return np.where(q <= 0, self.min, np.where(q >= 100, self.max, out))
+
+    def rank(self, x):
+        """(# items < x, # items <= x) for each x, scaled to the true count n."""
+        values, cum = self._weighted()
+        cum = np.concatenate([[0], cum]) * (self.n / cum[-1] if len(cum) else 1.0)
+        x = np.asarray(x, dtype=np.float64)
+        return (cum[np.searchsorted(values, x, side="left")],
+                cum[np.searchsorted(values, x, side="right")])
+
+    def mid_rank(self, x):
+        """Average 1-based rank of x among all items (ties averaged, as rankdata)."""
+        lt, le = self.rank(x)
+        return (lt + le + 1) / 2
+
+
+class TopK:
+    """Bounded heap keeping the k smallest (key, order) items with a payload."""
+
+    def __init__(self, k):
+        self.k = k
+        self.items = []   # max-heap via negated keys: (-key, -order, payload)
+
+    def push_many(self, keys, orders, payloads):
+        for key, order, payload in zip(keys, orders, payloads):
+            item = (-key, -order, payload)
+            if len(self.items) < self.k:
+                heapq.heappush(self.items, item)
+            elif item > self.items[0]:
+                heapq.heapreplace(self.items, item)
+
+    def merge(self, other):
+        keys = [-key for key, _, _ in other.items]
+        orders = [-order for _, order, _ in other.items]
+        self.push_many(keys, orders, [payload for _, _, payload in other.items])
+        return self
+
+    def sorted(self):
+        return [payload for _, _, payload in sorted(self.items, reverse=True)]
+
+
+# ─── Shard Processing ─────────────────────────────────────────────────────────
+
+def plan_shards(proteins_dirs, shard_size=DEFAULT_SHARD_SIZE):
+    """[(shard index, [yaml paths])] over all directories in file order."""
+    paths = [
+        os.path.join(d, fname)
+        for d in proteins_dirs
+        for fname in sorted(os.listdir(d)) if fname.endswith(".yaml")
+    ]
+    return [(i, paths[start:start + shard_size])
+            for i, start in enumerate(range(0, len(paths), shard_size))]
+
+
+def _spill_path(spill_dir, shard):
+    return os.path.join(spill_dir, f"shard-{shard:06d}.npz")
+
+
+def _load_spill(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {k: data[k] for k in data.files}
+
+
+def _pass1(task, matcher, store_path, spill_dir, sketch_k, tags=()):
+    """Parse, join, --tag filter and score one shard; spill its columns and summarize."""
+    t0 = time.perf_counter()
+    shard, paths = task
+    proteins = [p for p in (parse_protein_file(path) for path in paths) if p]
+    metrics = SporeMetrics.open(store_path)
+    rows = metrics.lookup([p["id"] for p in proteins])
+    matched = rows >= 0
+    proteins = [p for p, ok in zip(proteins, matched.tolist()) if ok]
+    rows = rows[matched]
+    n_joined = len(proteins)
+    if tags:
+        tagged = TagTable.from_lists([p.get("tags") for p in proteins]).has_all(tags)
+        proteins = [p for p, ok in zip(proteins, tagged.tolist()) if ok]
+        rows = rows[tagged]
+
+    columns = score_texts([extract_text(p) for p in proteins], matcher, ABSTRACT_SUFFIXES)
+    valid = columns["valid"]
+    keep = np.flatnonzero(valid)
+    spill = {
+        "order": shard * (1 << 32) + keep,
+        "s5": metrics.column("s5", rows[keep]).astype(np.float64),
+        "pc1": metrics.column("pc1", rows[keep]).astype(np.float64),
+        "title": np.array([str(proteins[i].get("title", ""))[:80] for i in keep.tolist()], dtype=str),
+        "id": np.array([str(proteins[i]["id"]) for i in keep.tolist()], dtype=str),
+    }
+    for col in REGISTER_COLUMNS + ("metaphor_hits", "analytical_hits"):
+        spill[col] = np.asarray(columns[col])[keep]
+    tags = TagTable.from_lists([proteins[i].get("tags") for i in keep.tolist()])
+    spill["p_number"] = tags.p_numbers([proteins[i].get("title", "") for i in keep.tolist()])
+    np.savez(_spill_path(spill_dir, shard), **spill)
+
+    summary = {
+        "joined": n_joined,
+        "matched": len(proteins),
+        "moments": Moments(("s5",) + REGISTER_COLUMNS),
+        "sketches": {name: QuantileSketch(sketch_k) for name in ("s5", "pc1") + REGISTER_COLUMNS},
+    }
+    summary["moments"].update(spill)
+    for name, sketch in summary["sketches"].items():
+        sketch.update(spill[name])
+    return summary, time.perf_counter() - t0
+
+
+def merge_pass1(summaries):
+    total = summaries[0]
+    for other in summaries[1:]:
+        total["joined"] += other["joined"]
+        total["matched"] += other["matched"]
+        total["moments"].merge(other["moments"])
+        for name, sketch in total["sketches"].items():
+            sketch.merge(other["sketches"][name])
+    return total
+
+
+def make_plan(pass1):
+    """Global thresholds every pass-2 shard conditions on."""
+    s5, composite = pass1["sketches"]["s5"], pass1["sketches"]["composite"]
+    return {
+        "n": pass1["moments"].n,
+        "quintile_edges": s5.quantile([0, 20, 40, 60, 80, 100]),
+        "s5_median": float(s5.quantile(50)),
+        "s5_q25": float(s5.quantile(25)),
+        "s5_q75": float(s5.quantile(75)),
+        "comp_median": float(composite.quantile(50)),
+        "sketches": pass1["sketches"],
+    }
+
+
+QUADRANTS = (
+    "High S5 / High Register (poetic boundary)",
+    "High S5 / Low Register (analytical boundary)",
+    "Low S5 / High Register (poetic cluster)",
+    "Low S5 / Low Register (analytical cluster)",
+)
+
+
+def _pass2(shard, plan, spill_dir):
+    """Accumulate quantile-conditioned statistics for one spilled shard."""
+    t0 = time.perf_counter()
+    c = _load_spill(_spill_path(spill_dir, shard))
+    s5, comp, order = c["s5"], c["composite"], c["order"]
+    n = len(s5)
+    payload = list(zip(s5.tolist(), comp.tolist(), c["metaphor_hits"].tolist(),
+                       c["analytical_hits"].tolist(), c["title"].tolist()))
+
+    summary = {"quintiles": [], "bridge": Moments(("s5",) + REGISTER_COLUMNS),
+               "non_bridge": Moments(("s5",) + REGISTER_COLUMNS)}
+
+    edges = plan["quintile_edges"]
+    for i in range(5):
+        mask = (s5 >= edges[i]) & ((s5 < edges[i + 1]) if i < 4 else (s5 <= edges[i + 1]))
+        moments = Moments(REGISTER_COLUMNS)
+        moments.update({k: c[k][mask] for k in REGISTER_COLUMNS})
+        summary["quintiles"].append(moments)
+
+    # PC1 percentile from the pass-1 sketch: % of all proteins with lower PC1
+    lt, _ = plan["sketches"]["pc1"].rank(c["pc1"])
+    pc1_pct = round_like_python(100 * lt / plan["n"], 1)
+    bridge = (pc1_pct >= 30) & (pc1_pct <= 55)
+    summary["bridge"].update({k: c[k][bridge] for k in ("s5",) + REGISTER_COLUMNS})
+    summary["non_bridge"].update({k: c[k][~bridge] for k in ("s5",) + REGISTER_COLUMNS})
+
+    # Spearman via sketch mid-ranks
+    ranks = {name: plan["sketches"][name].mid_rank(c[name]) for name in ("s5",) + REGISTER_COLUMNS}
+    summary["rank_moments"] = Moments(("s5",) + REGISTER_COLUMNS)
+    summary["rank_moments"].update(ranks)
+
+    hi_s5 = s5 >= plan["s5_median"]
+    hi_reg = comp >= plan["comp_median"]
+    summary["quadrants"] = {}
+    for name, mask in zip(QUADRANTS, (hi_s5 & hi_reg, hi_s5 & ~hi_reg,
+                                      ~hi_s5 & hi_reg, ~hi_s5 & ~hi_reg)):
+        heap = TopK(3)
+        idx = np.flatnonzero(mask).tolist()
+        key = -s5 if name.startswith("High") else s5
+        heap.push_many(key[idx].tolist(), order[idx].tolist(), [payload[i] for i in idx])
+        summary["quadrants"][name] = (int(mask.sum()), heap)
+
+    poetic, analytical = TopK(TOP_N), TopK(TOP_N)
+    idx = np.flatnonzero(s5 >= plan["s5_q75"]).tolist()
+    poetic.push_many((-comp[idx]).tolist(), order[idx].tolist(), [payload[i] for i in idx])
+    idx = np.flatnonzero(s5 <= plan["s5_q25"]).tolist()
+    analytical.push_many(comp[idx].tolist(), order[idx].tolist(), [payload[i] for i in idx])
+    summary["top_poetic"], summary["top_analytical"] = poetic, analytical
+
+    summary["top_q"] = Moments(("composite",))
+    summary["top_q"].update({"composite": comp[s5 >= plan["s5_q75"]]})
+    summary["bot_q"] = Moments(("composite",))
+    summary["bot_q"].update({"composite": comp[s5 <= plan["s5_q25"]]})
+
+    p = c["p_number"] >= 0
+    p_series = TopK(P_SERIES_LIMIT)
+    p_series.push_many(c["p_number"][p].tolist(), order[p].tolist(),
+                       zip(c["p_number"][p].tolist(), order[p].tolist(),
+                           s5[p].tolist(), comp[p].tolist(),
+                           c["metaphor_density"][p].tolist(),
+                           c["analytical_density"][p].tolist(), c["title"][p].tolist(),
+                           c["id"][p].tolist()))
+    summary["p_series"] = (int(p.sum()), p_series)
+    summary["n"] = n
+    return summary, time.perf_counter() - t0
+
+
+def merge_pass2(summaries):
+    total = summaries[0]
+    for other in summaries[1:]:
+        total["n"] += other["n"]
+        for mine, theirs in zip(total["quintiles"], other["quintiles"]):
+            mine.merge(theirs)
+        for key in ("bridge", "non_bridge", "rank_moments", "top_poetic", "top_analytical",
+                    "top_q", "bot_q"):
+            total[key].merge(other[key])
+        for name in QUADRANTS:
+            count, heap = total["quadrants"][name]
+            other_count, other_heap = other["quadrants"][name]
+            total["quadrants"][name] = (count + other_count, heap.merge(other_heap))
+        count, heap = total["p_series"]
+        other_count, other_heap = other["p_series"]
+        total["p_series"] = (count + other_count, heap.merge(other_heap))
+    return total
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+
+def _map(pool, fn, items):
+    t0 = time.perf_counter()
+    if pool is None or len(items) <= 1:
+        outputs = [fn(item) for item in items]
+    else:
+        outputs = list(pool.map(fn, items))
+    busy = sum(seconds for _, seconds in outputs)
+    return [out for out, _ in outputs], busy, time.perf_counter() - t0
+
+
+def run_sharded(proteins_dirs, metrics_path, matcher, shard_size=DEFAULT_SHARD_SIZE,
+                workers=1, sketch_k=DEFAULT_SKETCH_K, spill_dir=None, tags=()):
+    """
+    Two-pass sharded analysis of the proteins carrying every tag in tags
+    (default: all). The metrics store for metrics_path must already exist
+    (open_metrics builds it). Returns (pass1, pass2, stats).
+    """
+    shards = plan_shards(proteins_dirs, shard_size)
+    if not shards:
+        raise ValueError("no protein files found")
+    store_path = default_store_path(metrics_path)
+    own_spill = spill_dir is None
+    spill_dir = spill_dir or tempfile.mkdtemp(prefix="shimmer-shards-")
+    os.makedirs(spill_dir, exist_ok=True)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        p1, busy1, wall1 = _map(pool, partial(_pass1, matcher=matcher, store_path=store_path,
+                                              spill_dir=spill_dir, sketch_k=sketch_k,
+                                              tags=tuple(tags)), shards)
+        pass1 = merge_pass1(p1)
+        plan = make_plan(pass1)
+        p2, busy2, wall2 = _map(pool, partial(_pass2, plan=plan, spill_dir=spill_dir),
+                                [shard for shard, _ in shards])
+        pass2 = merge_pass2(p2)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if own_spill:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    stats = {
+        "shards": len(shards),
+        "shard_size": shard_size,
+        "workers": workers,
+        "sketch_k": sketch_k,
+        "tags": list(tags),
+        "sketch_exact": all(s.exact for s in pass1["sketches"].values()),
+        "pass1_seconds": round(wall1, 3),
+        "pass2_seconds": round(wall2, 3),
+        "worker_seconds": round(busy1 + busy2, 3),
+    }
+    return pass1, plan, pass2, stats
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+
+def print_report(pass1, plan, pass2, stats):
+    """Print sections 1-8 from merged summaries. Returns the JSON output dict."""
+    moments = pass1["moments"]
+    n = moments.n
+    print(f"Streamed {stats['shards']} shard(s) of up to {stats['shard_size']} files "
+          f"({stats['workers']} worker(s)): pass 1 {stats['pass1_seconds']:.2f}s, "
+          f"pass 2 {stats['pass2_seconds']:.2f}s")
+    print(f"Quantile sketch k={stats['sketch_k']} "
+          f"({'exact' if stats['sketch_exact'] else 'approximate, rank error ~1/k'})")
+    if stats["tags"]:
+        print(f"Tag filter {' & '.join(stats['tags'])}: {pass1['matched']} of {pass1['joined']} "
+              f"matched proteins")
+    print(f"Matched {pass1['matched']} proteins to spore metrics")
+    print(f"Scored {n} proteins (excluded {pass1['matched'] - n} too-short)")
+
+    print("\n" + "=" * 70)
+    print("1. OVERALL CORRELATIONS (S5 vs Register)")
+    print("=" * 70)
+    correlations = {}
+    for name, key in [
+        ("Composite register", "composite"),
+        ("Metaphor density", "metaphor_density"),
+        ("Analytical density", "analytical_density"),
+        ("Register ratio (M/(M+A))", "register_ratio"),
+        ("Type-token ratio", "ttr"),
+    ]:
+        rp, pp = moments.pearson("s5", key)
+        rs, ps = pass2["rank_moments"].pearson("s5", key)
+        print(f"\n  {name}:")
+        print(f"    Pearson  r = {rp:+.4f}  (p = {pp:.2e})")
+        print(f"    Spearman ρ = {rs:+.4f}  (p = {ps:.2e})")
+        correlations[key] = {"pearson_r": round(rp, 4), "pearson_p": pp,
+                             "spearman_rho": round(rs, 4), "spearman_p": ps}
+
+    print("\n" + "=" * 70)
+    print("2. S5 QUINTILE MEANS")
+    print("=" * 70)
+    edges = plan["quintile_edges"]
+    print(f"\n  {'Quintile':<12} {'S5 range':<18} {'N':>5} {'Metaphor':>10} {'Analytical':>12} {'Ratio':>8} {'Composite':>10}")
+    print(f"  {'-'*12} {'-'*18} {'-'*5} {'-'*10} {'-'*12} {'-'*8} {'-'*10}")
+    for i, q in enumerate(pass2["quintiles"]):
+        label = f"Q{i+1} ({edges[i]:.2f}-{edges[i+1]:.2f})"
+        if q.n > 0:
+            print(f"  {label:<18} {q.n:>5} {q.get_mean('metaphor_density'):>10.4f} "
+                  f"{q.get_mean('analytical_density'):>12.4f} "
+                  f"{q.get_mean('register_ratio'):>8.4f} "
+                  f"{q.get_mean('composite'):>10.4f}")
+
+    print("\n" + "=" * 70)
+    print("3. BRIDGE REGION ANALYSIS (PC1 percentile 30-55%)")
+    print("=" * 70)
+    bridge, non_bridge = pass2["bridge"], pass2["non_bridge"]
+    print(f"\n  Bridge proteins: {bridge.n}")
+    print(f"  Non-bridge proteins: {non_bridge.n}")
+    if bridge.n > 10:
+        for name, key in [("Composite register", "composite"),
+                          ("Metaphor density", "metaphor_density"),
+                          ("Register ratio", "register_ratio")]:
+            rb, pb = bridge.pearson("s5", key)
+            rn, pn = non_bridge.pearson("s5", key)
+            print(f"\n  {name}:")
+            print(f"    Bridge:     Pearson r = {rb:+.4f}  (p = {pb:.2e})")
+            print(f"    Non-bridge: Pearson r = {rn:+.4f}  (p = {pn:.2e})")
+
+    print("\n" + "=" * 70)
+    print("4. QUADRANT EXAMPLES")
+    print("=" * 70)
+    for qname in QUADRANTS:
+        count, heap = pass2["quadrants"][qname]
+        print(f"\n  {qname} (n={count}):")
+        for s5, comp, _, _, title in heap.sorted():
+            print(f"    S5={s5:.3f} Comp={comp:.3f} | {title}")
+
+    for section, label, key in [
+        ("5", "TOP 10 MOST 'POETIC' HIGH-S5 PROTEINS", "top_poetic"),
+        ("6", "TOP 10 MOST 'ANALYTICAL' LOW-S5 PROTEINS", "top_analytical"),
+    ]:
+        print("\n" + "=" * 70)
+        print(f"{section}. {label}")
+        print("=" * 70)
+        for i, (s5, comp, m_hits, a_hits, title) in enumerate(pass2[key].sorted(), 1):
+            print(f"  {i:2}. S5={s5:.3f} Comp={comp:.3f} M={m_hits:2d} A={a_hits:2d} | {title}")
+
+    print("\n" + "=" * 70)
+    print("7. P-SERIES REGISTER OSCILLATION")
+    print("=" * 70)
+    # Several proteins can share a P-number: ties go by title, then id
+    p_count, p_heap = pass2["p_series"]
+    p_series = sorted(p_heap.sorted(), key=lambda r: (r[0], r[6], r[7]))
+    if p_series:
+        print(f"\n  Found {p_count} P-series proteins"
+              + (f" (showing the {len(p_series)} lowest P-numbers)" if p_count > len(p_series)
+                 else ""))
+        print(f"\n  {'P-Number':>8} {'S5':>6} {'Composite':>10} {'Metaphor':>9} {'Analytical':>11} {'Title'}")
+        print(f"  {'-'*8} {'-'*6} {'-'*10} {'-'*9} {'-'*11} {'-'*40}")
+        for p_num, _, s5, comp, m_dens, a_dens, title, _ in p_series:
+            print(f"  P{p_num:<7} {s5:>6.3f} {comp:>10.4f} {m_dens:>9.4f} {a_dens:>11.4f} "
+                  f"{title[:40]}")
+
+        if len(p_series) >= 5:
+            p_nums = np.array([r[0] for r in p_series])
+            p_s5 = np.array([r[2] for r in p_series])
+            p_comp = np.array([r[3] for r in p_series])
+            p_corr = SignificanceEngine({"s5": p_s5, "composite": p_comp},
+                                        n_resamples=0).correlate("s5", ["composite"])["composite"]
+            print(f"\n  P-series S5 vs Composite:")
+            print(f"    Pearson  r = {p_corr['pearson_r']:+.4f}  (p = {p_corr['pearson_p']:.2e})")
+            print(f"    Spearman ρ = {p_corr['spearman_rho']:+.4f}  (p = {p_corr['spearman_p']:.2e})")
+            s5_peaks = p_nums[local_peaks(p_s5)].tolist()
+            comp_peaks = p_nums[local_peaks(p_comp)].tolist()
+            print(f"\n  S5 local peaks at: {s5_peaks}")
+            print(f"  Register local peaks at: {comp_peaks}")
+            overlap = set(s5_peaks) & set(comp_peaks)
+            print(f"  Coincident peaks: {sorted(overlap) if overlap else 'none'}")
+    else:
+        print("\n  No P-series proteins found with tag-based detection.")
+
+    print("\n" + "=" * 70)
+    print("8. SUMMARY STATISTICS")
+    print("=" * 70)
+    i_s5, i_comp = moments.names.index("s5"), moments.names.index("composite")
+    print(f"\n  Total proteins analyzed: {n}")
+    print(f"  S5 range: [{moments.min[i_s5]:.3f}, {moments.max[i_s5]:.3f}], "
+          f"mean={moments.mean[i_s5]:.3f}, median={plan['s5_median']:.3f}")
+    print(f"  Composite range: [{moments.min[i_comp]:.3f}, {moments.max[i_comp]:.3f}], "
+          f"mean={moments.mean[i_comp]:.3f}")
+    for label, key in [("Metaphor density", "metaphor_density"),
+                       ("Analytical density", "analytical_density"),
+                       ("Register ratio", "register_ratio")]:
+        i = moments.names.index(key)
+        print(f"  {label} range: [{moments.min[i]:.4f}, {moments.max[i]:.4f}], "
+              f"mean={moments.mean[i]:.4f}")
+    print(f"  S5 median (quadrant split): {plan['s5_median']:.3f}")
+    print(f"  Composite median (quadrant split): {plan['comp_median']:.3f}")
+
+    top_q, bot_q = pass2["top_q"], pass2["bot_q"]
+    pooled_std = np.sqrt((top_q.std("composite") ** 2 + bot_q.std("composite") ** 2) / 2)
+    cohens_d = ((top_q.get_mean("composite") - bot_q.get_mean("composite")) / pooled_std
+                if pooled_std > 0 else 0)
+    print(f"\n  Cohen's d (top vs bottom S5 quartile on composite): {cohens_d:+.4f}")
+    print(f"    Top quartile mean composite: {top_q.get_mean('composite'):.4f}")
+    print(f"    Bottom quartile mean composite: {bot_q.get_mean('composite'):.4f}")
+    print("    Mann-Whitney U: not available in streaming mode")
+
+    return {
+        "n_proteins": n,
+        "n_matched": pass1["matched"],
+        "s5_stats": {
+            "min": round(float(moments.min[i_s5]), 4),
+            "max": round(float(moments.max[i_s5]), 4),
+            "mean": round(float(moments.mean[i_s5]), 4),
+            "median": round(plan["s5_median"], 4),
+        },
+        "correlations": correlations,
+        "quadrant_counts": {k: pass2["quadrants"][k][0] for k in QUADRANTS},
+        "cohens_d": round(float(cohens_d), 4),
+        "streaming": stats,
+    }
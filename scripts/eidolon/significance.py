@@ -0,0 +1,253 @@
+"""
+Significance Engine
+===================
+Pearson and Spearman correlations with bootstrap confidence intervals and
+permutation p-values, computed in batches of resamples at a time.
+
+Each column is ranked once (average ranks, as scipy.stats.spearmanr), so a
+Spearman coefficient is a Pearson coefficient over the cached ranks.
+Resampling never loops over draws in Python:
+
+  bootstrap    a batch of B draws is a (B x n) matrix of resample counts W;
+               every Pearson sum is one product W @ column. Spearman
+               re-ranks each resample: with the column's tie groups in
+               sorted order, a row's average rank within draw b is the
+               count of drawn rows below its group plus (group count + 1)/2,
+               one cumulative sum of W down the column's sort order
+  permutation  a (B x n) matrix of row permutations of x; the null
+               correlations are x_z[perm] @ Y_z for unit-norm centred columns
+               (a permutation keeps the ranks, so the cached ones are exact)
+
+Permutation p-values are (1 + #{|r*| >= |r|}) / (1 + B). correlate(...,
+spearman=False) skips the Spearman half, which is most of the cost, for
+callers that only report Pearson.
+
+Draws are split into batches of at most `batch` draws, capped so a B x n
+batch matrix fits in `memory`, and seeded from one SeedSequence; results
+depend only on the seed and those sizes, never on the number of workers.
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_SEED = 0
+DEFAULT_BATCH = 500
+# Working-set budget for one batch of resamples
+DEFAULT_MEMORY = 256 << 20
+# Bytes held per (draw, row) cell while a batch is live: draw indices,
+# counts W, the re-ranked x and y columns and the permuted column
+_CELL_BYTES = 64
+
+
+def _centred(a):
+    return a - a.mean(axis=0)
+
+
+def _unit(a):
+    """Centred columns scaled to unit norm (NaN for constant columns)."""
+    c = _centred(a)
+    norm = np.sqrt(np.einsum("i...,i...->...", c, c))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return c / np.where(norm > 0, norm, np.nan)
+
+
+def parametric_p(r, n):
+    """Two-sided p-value of a correlation under the t approximation (as scipy)."""
+    from scipy import stats
+
+    r = np.clip(np.asarray(r, dtype=np.float64), -1.0, 1.0)
+    if n < 3:
+        return np.full(r.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt((n - 2) / ((1.0 - r) * (1.0 + r)))
+    return 2 * stats.t.sf(np.abs(t), n - 2)
+
+
+# ─── Batched Resampling ───────────────────────────────────────────────────────
+
+def _bootstrap_r(W, x, Y):
+    """Weighted Pearson r for each row of counts W (B x n) and column of Y."""
+    n = W.shape[1]
+    sx, sy = W @ x, W @ Y
+    sxx = W @ (x * x)
+    syy = W @ (Y * Y)
+    sxy = W @ (x[:, None] * Y)
+    cov = sxy - sx[:, None] * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cov / np.sqrt(var_x[:, None] * var_y)
+
+
+def _tie_groups(col):
+    """(sort order, start of each tie group in it, tie group of each row)."""
+    order = np.argsort(col, kind="stable")
+    ordered = col[order]
+    new_group = np.r_[True, ordered[1:] != ordered[:-1]]
+    group = np.empty(len(col), dtype=np.int64)
+    group[order] = np.cumsum(new_group) - 1
+    return order, np.flatnonzero(new_group), group
+
+
+def _group_ranks(WT, groups):
+    """
+    Average rank of each tie group within each resample, centred on
+    (n + 1) / 2, and the number of draws in the group (both g x B; WT is
+    the transposed counts, n x B, so every step runs down whole rows).
+    """
+    order, starts, _ = groups
+    n = WT.shape[0]
+    drawn = WT[order]
+    upto = np.cumsum(drawn, axis=0, out=drawn)[np.r_[starts[1:], n] - 1]
+    counts = np.diff(upto, axis=0, prepend=0)
+    ranks = upto - counts   # drawn rows below the group
+    ranks += (counts - n) / 2
+    return ranks, counts
+
+
+def _spearman_r(W, x, Y):
+    """
+    Bootstrap Spearman rho for each row of counts W (B x n) and column of Y.
+    The centred ranks sum to zero in every draw, so the weighted covariance
+    is one dot product per draw and the variances stay in tie-group space.
+    """
+    WT = np.ascontiguousarray(W.T)
+    x_groups = _tie_groups(x)
+    rx, cx = _group_ranks(WT, x_groups)
+    var_x = np.einsum("ij,ij,ij->j", cx, rx, rx)
+    weighted_x = WT * rx[x_groups[2]]
+    del rx, cx
+    out = np.empty((W.shape[0], Y.shape[1]))
+    for j in range(Y.shape[1]):
+        y_groups = _tie_groups(Y[:, j])
+        ry, cy = _group_ranks(WT, y_groups)
+        cov = np.einsum("ij,ij->j", weighted_x, ry[y_groups[2]])
+        var_y = np.einsum("ij,ij,ij->j", cy, ry, ry)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, j] = cov / np.sqrt(var_x * var_y)
+    return out
+
+
+def _resample_batch(task):
+    """
+    One batch of draws for x against the columns of Y.
+    Returns (bootstrap r: B x 2 x m, permutation exceedances: 2 x m); the
+    Spearman half is NaN / 0 unless spearman is set.
+    """
+    x, Y, rx, RY, observed, n_draws, seed, spearman = task
+    rng = np.random.default_rng(seed)
+    n = len(x)
+
+    idx = rng.integers(0, n, size=(n_draws, n))
+    W = np.bincount((idx + n * np.arange(n_draws)[:, None]).ravel(),
+                    minlength=n_draws * n).reshape(n_draws, n).astype(np.float64)
+    del idx
+    boot = np.full((n_draws, 2, Y.shape[1]), np.nan)
+    boot[:, 0] = _bootstrap_r(W, _centred(x), _centred(Y))
+    if spearman:
+        boot[:, 1] = _spearman_r(W, x, Y)
+
+    perm = rng.permuted(np.broadcast_to(np.arange(n), (n_draws, n)), axis=1)
+    exceed = np.zeros((2, Y.shape[1]), dtype=np.int64)
+    for k, (a, B) in enumerate(((x, Y), (rx, RY))[:2 if spearman else 1]):
+        null = _unit(a)[perm] @ _unit(B)
+        exceed[k] = np.sum(np.abs(null) >= np.abs(observed[k]) - 1e-12, axis=0)
+    return boot, exceed
+
+
+# ─── Engine ───────────────────────────────────────────────────────────────────
+
+class SignificanceEngine:
+    """Correlations between named, row-aligned columns (ranked once)."""
+
+    def __init__(self, columns, n_resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED,
+                 workers=1, confidence=0.95, batch=DEFAULT_BATCH, memory=DEFAULT_MEMORY,
+                 _pool=None):
+        from scipy import stats
+
+        self.columns = {name: np.asarray(col, dtype=np.float64) for name, col in columns.items()}
+        self.ranks = {name: stats.rankdata(col) for name, col in self.columns.items()}
+        self.n_resamples = n_resamples
+        self.seed = seed
+        self.confidence = confidence
+        self.batch = batch
+        self.memory = memory
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self._owns_pool = _pool is None and workers > 1 and n_resamples > batch
+        self._pool = ProcessPoolExecutor(max_workers=workers) if self._owns_pool else _pool
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def subset(self, mask):
+        """Engine over the rows selected by mask (re-ranked once, same pool and seed)."""
+        return SignificanceEngine({name: col[mask] for name, col in self.columns.items()},
+                                  self.n_resamples, self.seed, self.workers, self.confidence,
+                                  self.batch, self.memory, _pool=self._pool)
+
+    def close(self):
+        if self._owns_pool:
+            self._pool.shutdown()
+            self._owns_pool = False
+
+    def correlate(self, x_name, y_names, spearman=True):
+        """
+        Correlate column x_name with each of y_names.
+        Returns {y: {n, pearson_r, pearson_p, spearman_rho, spearman_p} plus,
+        when resampling, pearson_ci/pearson_perm_p and, unless spearman is
+        False, spearman_ci/spearman_perm_p}. The Spearman re-rank bootstrap
+        is most of the resampling cost; the Pearson draws do not depend on it.
+        """
+        n = len(self)
+        x, rx = self.columns[x_name], self.ranks[x_name]
+        Y = np.column_stack([self.columns[y] for y in y_names])
+        RY = np.column_stack([self.ranks[y] for y in y_names])
+        observed = np.stack([_unit(x) @ _unit(Y), _unit(rx) @ _unit(RY)])
+        p_values = parametric_p(observed, n)
+
+        out = {}
+        for j, y in enumerate(y_names):
+            out[y] = {
+                "n": n,
+                "pearson_r": float(observed[0, j]),
+                "pearson_p": float(p_values[0, j]),
+                "spearman_rho": float(observed[1, j]),
+                "spearman_p": float(p_values[1, j]),
+            }
+        if self.n_resamples <= 0 or n < 3:
+            return out
+
+        batch = max(1, min(self.batch, self.memory // (_CELL_BYTES * n)))
+        sizes = [min(batch, self.n_resamples - s) for s in range(0, self.n_resamples, batch)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        tasks = [(x, Y, rx, RY, observed, size, seed, spearman)
+                 for size, seed in zip(sizes, seeds)]
+        if self._pool is None or len(tasks) <= 1:
+            outputs = [_resample_batch(t) for t in tasks]
+        else:
+            outputs = list(self._pool.map(_resample_batch, tasks))
+
+        boot = np.concatenate([b for b, _ in outputs])
+        exceed = sum(e for _, e in outputs)
+        tail = 100 * (1 - self.confidence) / 2
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN (constant) columns
+            lo, hi = np.nanpercentile(boot, [tail, 100 - tail], axis=0)
+        perm_p = np.where(np.isnan(observed), np.nan, (1 + exceed) / (1 + self.n_resamples))
+        for j, y in enumerate(y_names):
+            out[y].update({
+                "pearson_ci": [float(lo[0, j]), float(hi[0, j])],
+                "pearson_perm_p": float(perm_p[0, j]),
+            })
+            if spearman:
+                out[y].update({
+                    "spearman_ci": [float(lo[1, j]), float(hi[1, j])],
+                    "spearman_perm_p": float(perm_p[1, j]),
+                })
+        return out
@@ -0,0 +1,145 @@
+"""
+Stage Clock
+===========
+Instrumentation spans for long functions that run their stages inline
+rather than as separate calls.
+
+mark(name) closes the span that began at the previous mark and charges it
+to name, so code between marks needs no re-indentation. Each span records
+
+  wall_seconds   elapsed time
+  cpu_seconds    CPU time of this process plus any worker processes that
+                 exited during the span (pool workers are counted on shutdown)
+  peak_rss_mb    peak resident set size of this process so far
+  items          what the caller says the span processed (optional)
+
+plus any other counts the caller passes (e.g. parsed=, for a load span
+whose items are the proteins loaded).
+
+A name may be dotted ("statistics.pc1_pct"); timings sums spans by the part
+before the first dot, so stages stay comparable while spans get finer.
+A mark costs two getrusage() calls and a perf_counter(), so the clock can
+stay on in production runs; profile=True adds a cProfile per stage.
+"""
+
+import cProfile
+import json
+import os
+import resource
+import sys
+import time
+
+# ru_maxrss is in kilobytes on Linux, bytes on macOS
+_RSS_UNIT = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / _RSS_UNIT
+
+
+class StageClock:
+    """Spans and per-stage seconds, accumulated between mark() calls."""
+
+    def __init__(self, profile=False):
+        self.spans = []
+        self.timings = {}
+        self.profiles = {} if profile else None
+        self._start = self._last = time.perf_counter()
+        self._last_cpu = _cpu_seconds()
+        self._profiler = None
+        self._profile_next()
+
+    def _profile_next(self):
+        if self.profiles is not None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def mark(self, name, items=None, **counts):
+        """Close the current span as name; items is its work count, if any."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        now, cpu = time.perf_counter(), _cpu_seconds()
+        self._record(name, now - self._last, cpu - self._last_cpu, items, counts)
+        if self._profiler is not None:
+            # One profile per stage: later spans of a stage are added to it
+            stage = name.split(".")[0]
+            if stage in self.profiles:
+                self.profiles[stage].append(self._profiler)
+            else:
+                self.profiles[stage] = [self._profiler]
+        self._last, self._last_cpu = now, cpu
+        self._profile_next()
+
+    def add(self, name, wall_seconds, cpu_seconds=0.0, items=None, **counts):
+        """
+        Record a span measured elsewhere (e.g. a sub-step inside a library
+        call) and take its time back out of the span it was part of.
+        """
+        if self.spans:
+            span = self.spans[-1]
+            span["wall_seconds"] -= wall_seconds
+            span["cpu_seconds"] = max(0.0, span["cpu_seconds"] - cpu_seconds)
+            self.timings[span["name"].split(".")[0]] -= wall_seconds
+        self._record(name, wall_seconds, cpu_seconds, items, counts)
+
+    def _record(self, name, wall, cpu, items, counts):
+        span = {
+            "name": name,
+            "wall_seconds": wall,
+            "cpu_seconds": float(cpu),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if items is not None:
+            span["items"] = int(items)
+        span.update({key: int(value) for key, value in counts.items()})
+        self.spans.append(span)
+        stage = name.split(".")[0]
+        self.timings[stage] = self.timings.get(stage, 0.0) + wall
+
+    def hottest(self):
+        """Stage with the most wall time."""
+        return max(self.timings, key=self.timings.get) if self.timings else None
+
+    def trace(self):
+        return {
+            "spans": [{**s, "wall_seconds": round(s["wall_seconds"], 6),
+                       "cpu_seconds": round(s["cpu_seconds"], 6)} for s in self.spans],
+            "stages": {k: round(v, 6) for k, v in self.timings.items()},
+            "wall_seconds": round(time.perf_counter() - self._start, 6),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+    def write_trace(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.trace(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def dump_profile(self, path, stage=None):
+        """
+        Write the cProfile stats of stage (default: the hottest profiled
+        one) for pstats/snakeviz. Stages recorded only through add() have
+        no profile of their own; their calls are in the enclosing stage's.
+        """
+        import pstats
+
+        if self.profiles is None:
+            raise ValueError("clock was created without profile=True")
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        stage = stage or max(self.profiles, key=lambda s: self.timings.get(s, 0.0))
+        if stage not in self.profiles:
+            raise ValueError(f"no profile for stage {stage!r}")
+        profilers = self.profiles[stage]
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        return stage
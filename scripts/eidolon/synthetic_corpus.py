@@ -0,0 +1,228 @@
+"""
+Synthetic Protein Corpus
+========================
+Generates protein YAML files in the connectomes-v1/meshseed-primary schema
+plus a matching spore-metrics JSON, for benchmarks at any scale.
+
+Every protein has a latent "poetic" level that drives how often its text
+draws from the metaphor vs analytical lexicons, and S5/PC1 are derived from
+the same latent, so the analysis finds real (negative) correlations rather
+than noise. About 5% of proteins carry a #P<n> tag, about 2% a P<n> title,
+and about 1% have no spore metrics (they exercise the join).
+
+Output is a pure function of (n, seed): chunks are seeded from one
+SeedSequence, so --workers only changes the speed.
+
+Layout:
+  OUT_DIR/proteins/<date>_<slug>_<id8>.yaml
+  OUT_DIR/spore-metrics.json
+
+Usage: python -m eidolon.synthetic_corpus OUT_DIR [--n N] [--seed S] [--workers W]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import numpy as np
+
+from .register_scoring import ANALYTICAL_TERMS, METAPHOR_TERMS
+
+CHUNK_SIZE = 2000
+
+FILLER_WORDS = (
+    "the a an of to in and or for with on by from that this these those is are was be "
+    "it its their our we they which as at into through across between within without "
+    "new each every more most many some other such only also both then than when where "
+    "protein mesh agent spore pattern memory layer signal context model state seed "
+    "human collaboration continuity synthesis insight concept question field space "
+    "shared local global early later first second core open stable deep clear strong "
+    "creates enables provides supports reveals shows maintains builds connects holds "
+    "maps tracks links forms shapes guides frames carries keeps allows brings makes"
+).split()
+
+ABSTRACT_WORDS = (
+    "awareness coherence integration alignment presence continuity emergence resilience "
+    "consciousness identity complexity divergence convergence recognition intention "
+    "attention transformation development movement relationship experience governance "
+    "stability capacity possibility uncertainty understanding agreement balance"
+).split()
+
+SEMANTIC_TAGS = [f"#{w}" for w in (
+    "ai cognition collaboration architecture inheritance mesh consciousness emergence "
+    "resonance identity attunement patternrecognition selfcorrection recursion geometry "
+    "network memory ethics governance epistemic_humility shimmer phaseboundary gauge "
+    "entanglement metacognition language embodiment trust continuity synthesis ecology "
+    "music mathematics physics biology evolution learning teaching design protocol "
+    "security privacy coordination economics care grief joy play ritual myth story"
+).split()] + [f"#topic{i}" for i in range(400)]
+
+SYSTEM_TAGS = ["#public", "#embed:gemini", "#embed:nomic-v1.5", "#synthesis:v4.5"]
+TIERS = ("core", "convergence", "reference")
+TIER_WEIGHTS = (0.15, 0.16, 0.69)
+SOURCES = ("synthesis", "conversation", "research", "seed")
+GRADIENT_STEPS = ("curiosity", "insight", "understanding", "tension", "clarity",
+                  "wonder", "doubt", "resolution", "recognition", "calm")
+START_DATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+SPAN_SECONDS = 270 * 24 * 3600
+
+
+# ─── Text ─────────────────────────────────────────────────────────────────────
+
+# One word pool; each kind (metaphor, analytical, abstract, filler) is a slice of it
+_KIND_POOLS = (sorted(METAPHOR_TERMS), sorted(ANALYTICAL_TERMS), ABSTRACT_WORDS, FILLER_WORDS)
+_POOL = np.array([w for pool in _KIND_POOLS for w in pool], dtype=object)
+_KIND_SIZE = np.array([len(pool) for pool in _KIND_POOLS])
+_KIND_OFFSET = np.concatenate([[0], np.cumsum(_KIND_SIZE)[:-1]])
+_TITLE_POOL = FILLER_WORDS + ABSTRACT_WORDS
+
+
+def _sentences(rng, poetic, lengths):
+    """Sentences of the given word counts whose lexicon mix follows the poetic level."""
+    total = int(sum(lengths))
+    kinds = rng.choice(4, size=total, p=[0.07 * poetic, 0.07 * (1 - poetic), 0.05, 0.88])
+    picks = _KIND_OFFSET[kinds] + (rng.random(total) * _KIND_SIZE[kinds]).astype(np.int64)
+    words = _POOL[picks].tolist()
+    out, start = [], 0
+    for length in lengths:
+        out.append(" ".join(words[start:start + length]).capitalize() + ".")
+        start += length
+    return out
+
+
+def _q(text):
+    """Double-quoted YAML scalar (JSON string syntax is valid YAML)."""
+    return json.dumps(text)
+
+
+def _protein(rng):
+    """(yaml text, file stem, metrics record or None) for one protein."""
+    pid = str(uuid.UUID(bytes=rng.bytes(16), version=4))
+    poetic = float(rng.beta(2, 2))
+
+    n_title = rng.integers(4, 9)
+    title_words = [_TITLE_POOL[i] for i in rng.integers(len(_TITLE_POOL), size=n_title).tolist()]
+    title = " ".join(w.capitalize() for w in title_words)
+    p_number = int(rng.integers(1, 10000))
+    p_roll = rng.random()
+    if p_roll < 0.02:
+        title = f"P{p_number}: {title}"
+
+    # Summary: 3 sentences; insights: 3-6 sentences
+    lengths = (rng.integers(12, 26, size=3).tolist()
+               + rng.integers(10, 21, size=rng.integers(3, 7)).tolist())
+    sentences = _sentences(rng, poetic, lengths)
+    summary = " ".join(sentences[:3])
+    insights = sentences[3:]
+
+    n_sem = int(rng.integers(3, 8))
+    # Zipf-ish: low tag indices are far more common, as in the real corpus
+    tag_idx = np.unique(np.minimum((rng.pareto(1.2, size=n_sem) * 8).astype(int),
+                                   len(SEMANTIC_TAGS) - 1))
+    sem_tags = [SEMANTIC_TAGS[i] for i in tag_idx.tolist()]
+    tags = list(sem_tags)
+    if 0.02 <= p_roll < 0.07:
+        tags.insert(0, f"#P{p_number}")
+        sem_tags.insert(0, f"#P{p_number}")
+    tags += SYSTEM_TAGS[:int(rng.integers(1, len(SYSTEM_TAGS) + 1))]
+
+    tier = TIERS[rng.choice(3, p=TIER_WEIGHTS)]
+    coherence = round(float(rng.uniform(0.8, 1.0)), 2)
+    created = START_DATE + timedelta(seconds=float(rng.uniform(0, SPAN_SECONDS)))
+    created_at = created.strftime("%Y-%m-%dT%H:%M:%S.") + f"{created.microsecond // 1000:03d}Z"
+    steps = rng.choice(len(GRADIENT_STEPS), 3, replace=False)
+    gradient = " → ".join(GRADIENT_STEPS[i] for i in steps)
+
+    lines = [f"id: {pid}", f"title: {_q(title)}", f"summary: {_q(summary)}", "insights:"]
+    lines += [f"  - {_q(s)}" for s in insights]
+    lines.append("tags:")
+    lines += [f"  - {_q(t)}" for t in tags]
+    lines += [
+        f"tier: {tier}",
+        f"coherence_score: {coherence}",
+        f"created_at: '{created_at}'",
+        f"source: {SOURCES[rng.integers(len(SOURCES))]}",
+        f"emotional_gradient: {_q(gradient)}",
+    ]
+    slug = "-".join(title_words)[:40].lower()
+    stem = f"{created.strftime('%Y-%m-%d')}_{slug}_{pid[:8]}"
+
+    metrics = None
+    if rng.random() >= 0.01:
+        s5 = float(np.clip(0.72 - 0.25 * (poetic - 0.5) + rng.normal(0, 0.08), 0.3, 1.0))
+        metrics = (pid, {
+            "s5": round(s5, 4),
+            "coh": coherence,
+            "energy": float(rng.uniform(0.2, 0.8)),
+            "tier": tier,
+            "pc1": float(rng.normal(0.1 * poetic, 0.15)),
+            "tags_sem": sem_tags,
+        })
+    return "\n".join(lines) + "\n", stem, metrics
+
+
+# ─── Generation ───────────────────────────────────────────────────────────────
+
+def _write_chunk(task, proteins_dir):
+    """Write one chunk of proteins; returns its metrics records."""
+    count, seed = task
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(count):
+        text, stem, metrics = _protein(rng)
+        with open(os.path.join(proteins_dir, stem + ".yaml"), "w") as f:
+            f.write(text)
+        if metrics:
+            records.append(metrics)
+    return records
+
+
+def generate_corpus(out_dir, n, seed=0, workers=1):
+    """
+    Write n synthetic proteins and their spore metrics under out_dir.
+    Returns (proteins_dir, metrics_path).
+    """
+    proteins_dir = os.path.join(out_dir, "proteins")
+    os.makedirs(proteins_dir, exist_ok=True)
+    sizes = [min(CHUNK_SIZE, n - start) for start in range(0, n, CHUNK_SIZE)]
+    tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    fn = partial(_write_chunk, proteins_dir=proteins_dir)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(fn, tasks))
+    else:
+        chunks = [fn(task) for task in tasks]
+
+    metrics = {pid: record for chunk in chunks for pid, record in chunk}
+    metrics_path = os.path.join(out_dir, "spore-metrics.json")
+    tmp_path = metrics_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metrics, f)
+    os.replace(tmp_path, metrics_path)
+    return proteins_dir, metrics_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--n", type=int, default=1000, help="number of proteins")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="0 = one per CPU")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    proteins_dir, metrics_path = generate_corpus(args.out_dir, args.n, args.seed, args.workers)
+    print(f"Wrote {args.n} proteins to {proteins_dir} and metrics to {metrics_path} "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Bitset Tag Sets
+===============
+Interned protein tag sets: a one-word bitset for the most frequent tags,
+sorted sparse ids for the rest.
+
+Tags are interned to integer ids by a TagDictionary. A TagTable keeps:
+
+  offsets/ids           CSR of int32 tag ids in original order (for
+                        order-dependent rules such as "first #P tag wins")
+  head                  one uint64 per row with a bit for each of the
+                        HEAD_BITS most frequent tags of this table
+  tail_offsets/tail_ids CSR of the remaining tag ids, sorted per row
+
+Memory is O(rows + tags carried), not O(rows x dictionary size): a dense
+bitset over a 2869-tag dictionary needs 45 words per row, more than the
+tag lists it replaces. Overlap between two proteins is popcount(head_a &
+head_b) plus a merge of their (short) sorted tails, so neighbour overlap,
+Jaccard and block overlap stay whole-array operations instead of Python
+set intersections.
+"""
+
+import re
+
+import numpy as np
+
+_P_TAG_RE = re.compile(r'#P(\d+)')
+_P_TITLE_RE = re.compile(r'P(\d+)')
+
+# Tags kept in the per-row bitset word; everything rarer lives in the sparse tail
+HEAD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words):
+        """Set bits per element of an unsigned integer array."""
+        return np.bitwise_count(words)
+else:  # NumPy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Set bits per element of an unsigned integer array."""
+        words = np.ascontiguousarray(words)
+        per_byte = _POP8[words.view(np.uint8)].reshape(words.shape + (words.itemsize,))
+        return per_byte.sum(axis=-1, dtype=np.uint8)
+
+
+class TagDictionary:
+    """Tag string <-> integer id."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, tag):
+        tag_id = self.ids.get(tag)
+        if tag_id is None:
+            tag_id = self.ids[tag] = len(self.names)
+            self.names.append(tag)
+        return tag_id
+
+
+def _row_of(offsets):
+    """Row index of every CSR entry."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _gather(offsets, values, rows):
+    """
+    Concatenated CSR slices of the given rows, with the position (into
+    rows) each entry came from.
+    """
+    lengths = np.diff(offsets)[rows]
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    starts = np.repeat(offsets[rows] - (np.cumsum(lengths) - lengths), lengths)
+    return values[starts + np.arange(len(owner))], owner
+
+
+class TagTable:
+    """Row-aligned tag sets for a corpus."""
+
+    def __init__(self, dictionary, offsets, ids):
+        self.dictionary = dictionary
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        n_rows = len(self)
+        # Head: the HEAD_BITS most frequent tags (ties by id), one bit each
+        freq = np.bincount(self.ids, minlength=len(dictionary))
+        order = np.argsort(-freq, kind="stable")[:HEAD_BITS]
+        order = order[freq[order] > 0]
+        self.head_slot = np.full(len(freq), -1, dtype=np.int64)
+        self.head_slot[order] = np.arange(len(order))
+        rows = _row_of(self.offsets)
+        slot = self.head_slot[self.ids]
+        in_head = slot >= 0
+        self.head = np.zeros(n_rows, dtype=np.uint64)
+        np.bitwise_or.at(self.head, rows[in_head],
+                         np.left_shift(np.uint64(1), slot[in_head].astype(np.uint64)))
+        # Tail: the rest, sorted per row (row-major key sort)
+        keys = np.sort(rows[~in_head] * max(len(freq), 1) + self.ids[~in_head])
+        self.tail_ids = (keys % max(len(freq), 1)).astype(np.int32)
+        self.tail_offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // max(len(freq), 1), minlength=n_rows),
+                  out=self.tail_offsets[1:])
+
+    @classmethod
+    def from_lists(cls, tag_lists, dictionary=None):
+        """Intern a list of tag lists (one per row)."""
+        dictionary = dictionary or TagDictionary()
+        offsets = [0]
+        ids = []
+        for tags in tag_lists:
+            seen = set()
+            for tag in tags or []:
+                tag_id = dictionary.intern(tag)
+                if tag_id not in seen:
+                    seen.add(tag_id)
+                    ids.append(tag_id)
+            offsets.append(len(ids))
+        return cls(dictionary, offsets, ids)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return (self.offsets.nbytes + self.ids.nbytes + self.head.nbytes
+                + self.tail_offsets.nbytes + self.tail_ids.nbytes)
+
+    def tags(self, row):
+        """Tag strings of one row, in original order."""
+        names = self.dictionary.names
+        return [names[t] for t in self.ids[self.offsets[row]:self.offsets[row + 1]].tolist()]
+
+    def sizes(self):
+        """|T| per row."""
+        return np.diff(self.offsets)
+
+    # ─── Overlap ──────────────────────────────────────────────────────────
+
+    def _tail_overlap(self, rows_a, rows_b):
+        """Merge-count of shared tail ids for flat aligned row arrays."""
+        n_tags = max(len(self.head_slot), 1)
+        ids_a, pair_a = _gather(self.tail_offsets, self.tail_ids, rows_a)
+        ids_b, pair_b = _gather(self.tail_offsets, self.tail_ids, rows_b)
+        # (pair, tag) keys are unique on each side, so a shared key is a shared tag
+        keys_a = pair_a * n_tags + ids_a
+        keys_b = pair_b * n_tags + ids_b
+        shared = np.isin(keys_a, keys_b, assume_unique=True)
+        return np.bincount(pair_a[shared], minlength=len(rows_a))
+
+    def overlap(self, rows_a, rows_b):
+        """|T_a & T_b| for aligned arrays of row indices (any matching shape)."""
+        rows_a, rows_b = np.broadcast_arrays(np.asarray(rows_a), np.asarray(rows_b))
+        flat_a, flat_b = rows_a.ravel(), rows_b.ravel()
+        shared = popcount(self.head[flat_a] & self.head[flat_b]).astype(np.int64)
+        shared += self._tail_overlap(flat_a, flat_b)
+        return shared.reshape(rows_a.shape)
+
+    def jaccard(self, rows_a, rows_b):
+        """|T_a & T_b| / |T_a | T_b| for aligned row indices (0 when both empty)."""
+        inter = self.overlap(rows_a, rows_b)
+        sizes = self.sizes()
+        union = sizes[rows_a] + sizes[rows_b] - inter
+        return np.where(union > 0, inter / np.maximum(union, 1), 0.0)
+
+    def neighbour_overlap(self, nbr_idx):
+        """|T_i & T_j| for every row i and each neighbour j in nbr_idx (n x k)."""
+        rows = np.arange(len(nbr_idx))[:, None]
+        return self.overlap(np.broadcast_to(rows, nbr_idx.shape), nbr_idx)
+
+    def pairwise_overlap(self, rows, block=256):
+        """All-pairs |T_i & T_j| within rows, as a len(rows) x len(rows) array."""
+        rows = np.asarray(rows)
+        out = np.empty((len(rows), len(rows)), dtype=np.int32)
+        for start in range(0, len(rows), block):
+            a = rows[start:start + block, None]
+            out[start:start + block] = self.overlap(a, rows[None, :])
+        return out
+
+    # ─── Filtering ────────────────────────────────────────────────────────
+
+    def _carrying(self, tag_id):
+        """Rows that carry one known tag id."""
+        slot = self.head_slot[tag_id] if tag_id < len(self.head_slot) else -1
+        if slot >= 0:
+            return (self.head & (np.uint64(1) << np.uint64(slot))) != 0
+        hit = np.zeros(len(self), dtype=bool)
+        hit[_row_of(self.tail_offsets)[self.tail_ids == tag_id]] = True
+        return hit
+
+    def has_all(self, tags):
+        """Rows carrying every tag in tags (unknown tags match nothing)."""
+        known = self.dictionary.ids
+        if any(t not in known for t in tags):
+            return np.zeros(len(self), dtype=bool)
+        keep = np.ones(len(self), dtype=bool)
+        for tag in tags:
+            keep &= self._carrying(known[tag])
+        return keep
+
+    def has_any(self, tags):
+        """Rows carrying at least one tag in tags."""
+        known = self.dictionary.ids
+        keep = np.zeros(len(self), dtype=bool)
+        for tag in tags:
+            if tag in known:
+                keep |= self._carrying(known[tag])
+        return keep
+
+    # ─── P-series ─────────────────────────────────────────────────────────
+
+    def p_numbers(self, titles=None):
+        """
+        Vectorized extract_p_number(): the first #P<n> tag in each row's
+        original order, else a leading P<n> in the title; -1 when absent.
+        """
+        per_tag = np.array([int(m.group(1)) if (m := _P_TAG_RE.match(name)) else -1
+                            for name in self.dictionary.names] or [-1], dtype=np.int64)
+        values = per_tag[self.ids] if len(self.ids) else np.zeros(0, dtype=np.int64)
+        hit_pos = np.where(values >= 0, np.arange(len(values)), len(values))
+        # First matching position per row (empty rows keep the sentinel)
+        first = np.full(len(self), len(values), dtype=np.int64)
+        nonempty = np.diff(self.offsets) > 0
+        if nonempty.any():
+            first[nonempty] = np.minimum.reduceat(hit_pos, self.offsets[:-1][nonempty])
+        found = first < self.offsets[1:]
+        result = np.full(len(self), -1, dtype=np.int64)
+        result[found] = values[first[found]]
+        if titles is not None:
+            for row in np.flatnonzero(~found).tolist():
+                m = _P_TITLE_RE.match(titles[row] or "")
+                if m:
+                    result[row] = int(m.group(1))
+        return result
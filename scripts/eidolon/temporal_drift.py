@@ -0,0 +1,352 @@
+"""
+Temporal Register Drift
+=======================
+Register and S5 over created_at, as rolling windows that update
+incrementally when new proteins arrive.
+
+A DriftTracker keeps six running sums per time bin (count, S5, composite,
+their squares and cross product). Proteins are streamed in created_at
+order and added to their bins with one np.add.at, so adding new proteins
+touches only those proteins and never recomputes the old ones. Everything
+else comes from the bin sums:
+
+  rolling windows   sums over the last `window` bins via cumulative sums
+                    (n, mean S5, mean composite, within-window correlation)
+  lagged xcorr      corr(S5 window mean at t, composite window mean at t+lag)
+                    for every lag in [-max_lag, max_lag]
+  peaks             strict local maxima of each series, found with array
+                    comparisons; coincident = within one bin of each other
+
+A tracker saved with save() remembers which protein ids it has seen, so
+update() on the next run adds only the new ones. Edited or removed
+proteins are not subtracted; rebuild the state when the corpus is rewritten.
+The state also records the lexicon version its composites were scored
+with; open_tracker() starts a new state rather than mixing composites
+from different lexicons (or bin widths) in the same bins.
+
+Usage: python -m eidolon.temporal_drift --state drift.npz   (adds new proteins, prints drift)
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+STATE_VERSION = 2
+DAY = 86400
+DEFAULT_BIN_DAYS = 1
+DEFAULT_WINDOW = 7
+DEFAULT_MAX_LAG = 14
+STREAM_CHUNK = 1000
+
+_SUMS = ("n", "s5", "comp", "s5_sq", "comp_sq", "s5_comp")
+
+
+def option_error(bin_days, window, max_lag):
+    """Why --bin-days / --window / --max-lag values are unusable (None if they are fine)."""
+    if not bin_days * DAY >= 1:
+        return f"--bin-days must be at least one second ({1 / DAY:.2g} days), got {bin_days}"
+    if window < 1:
+        return f"--window must be at least 1 bin, got {window}"
+    if max_lag < 0:
+        return f"--max-lag must be 0 or more bins, got {max_lag}"
+    return None
+
+
+def parse_timestamps(values):
+    """Seconds since the epoch for ISO strings or datetimes (NaN where missing)."""
+    texts = [str(v)[:19].replace(" ", "T") if v else "NaT" for v in values]
+    try:
+        stamps = np.array(texts, dtype="datetime64[s]")
+    except ValueError:
+        stamps = np.array([_one_timestamp(t) for t in texts], dtype="datetime64[s]")
+    out = stamps.astype(np.int64).astype(np.float64)
+    out[np.isnat(stamps)] = np.nan
+    return out
+
+
+def _one_timestamp(text):
+    try:
+        return np.datetime64(text, "s")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def local_peaks(values):
+    """Indices of strict local maxima (greater than both neighbours; NaN never peaks)."""
+    v = np.asarray(values, dtype=np.float64)
+    if len(v) < 3:
+        return np.zeros(0, dtype=np.int64)
+    mid = v[1:-1]
+    return np.flatnonzero((mid > v[:-2]) & (mid > v[2:])) + 1
+
+
+def lagged_xcorr(x, y, max_lag):
+    """
+    Pearson r of x[t] against y[t + lag] for lag in -max_lag..max_lag, over
+    the t where both are finite; lags are capped below the series length.
+    Returns (lags, r).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    max_lag = max(0, min(max_lag, len(x) - 1))
+    lags = np.arange(-max_lag, max_lag + 1)
+    r = np.full(len(lags), np.nan)
+    for k, lag in enumerate(lags.tolist()):
+        if lag >= 0:
+            a, b = x[:len(x) - lag], y[lag:]
+        else:
+            a, b = x[-lag:], y[:len(y) + lag]
+        ok = np.isfinite(a) & np.isfinite(b)
+        if ok.sum() >= 3:
+            a, b = a[ok] - a[ok].mean(), b[ok] - b[ok].mean()
+            denom = np.sqrt((a * a).sum() * (b * b).sum())
+            if denom > 0:
+                r[k] = (a * b).sum() / denom
+    return lags, r
+
+
+# ─── Tracker ──────────────────────────────────────────────────────────────────
+
+class DriftTracker:
+    """Per-bin running sums of S5 and composite over created_at."""
+
+    def __init__(self, bin_seconds=DEFAULT_BIN_DAYS * DAY, lexicon_version=""):
+        if int(bin_seconds) < 1:
+            raise ValueError(f"bin width must be at least one second, got {bin_seconds}")
+        self.bin_seconds = int(bin_seconds)
+        self.lexicon_version = lexicon_version
+        self.origin = None                        # start of bin 0, epoch seconds
+        self.sums = np.zeros((len(_SUMS), 0))
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.seen)
+
+    @property
+    def n_bins(self):
+        return self.sums.shape[1]
+
+    def _grow(self, lo, hi):
+        """Make bins lo..hi (relative to the current origin) addressable; returns the shift."""
+        shift = max(0, -lo)
+        size = max(self.n_bins + shift, hi + shift + 1)
+        if shift or size > self.n_bins:
+            grown = np.zeros((len(_SUMS), size))
+            grown[:, shift:shift + self.n_bins] = self.sums
+            self.sums = grown
+            self.origin -= shift * self.bin_seconds
+        return shift
+
+    def update(self, ids, timestamps, s5, composite):
+        """
+        Add proteins not seen before, in created_at order, one STREAM_CHUNK
+        at a time. Proteins without a timestamp are skipped. Returns the
+        number added.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        s5 = np.asarray(s5, dtype=np.float64)
+        composite = np.asarray(composite, dtype=np.float64)
+        new = np.array([pid not in self.seen for pid in ids], dtype=bool)
+        new &= np.isfinite(timestamps) & np.isfinite(s5) & np.isfinite(composite)
+        rows = np.flatnonzero(new)
+        rows = rows[np.argsort(timestamps[rows], kind="stable")]
+        if not len(rows):
+            return 0
+        if self.origin is None:
+            first = int(timestamps[rows[0]])
+            self.origin = first - first % self.bin_seconds
+
+        for start in range(0, len(rows), STREAM_CHUNK):
+            chunk = rows[start:start + STREAM_CHUNK]
+            bins = np.floor((timestamps[chunk] - self.origin) / self.bin_seconds).astype(np.int64)
+            bins += self._grow(int(bins.min()), int(bins.max()))
+            x, y = s5[chunk], composite[chunk]
+            for k, values in enumerate((np.ones(len(chunk)), x, y, x * x, y * y, x * y)):
+                np.add.at(self.sums[k], bins, values)
+            self.seen.update(ids[i] for i in chunk.tolist())
+        return len(rows)
+
+    def bin_starts(self):
+        """datetime64 start of each bin."""
+        return (np.datetime64(int(self.origin), "s")
+                + np.arange(self.n_bins) * np.timedelta64(self.bin_seconds, "s"))
+
+    def rolling(self, window=DEFAULT_WINDOW):
+        """
+        Trailing-window aggregates per bin: n, s5_mean, comp_mean and r
+        (S5 vs composite inside the window). Means are NaN where the bin
+        itself is empty (the window would repeat the previous one) and r
+        where the window holds fewer than three proteins.
+        """
+        c = np.concatenate([np.zeros((len(_SUMS), 1)), np.cumsum(self.sums, axis=1)], axis=1)
+        hi = np.arange(1, self.n_bins + 1)
+        lo = np.maximum(hi - window, 0)
+        n, sx, sy, sxx, syy, sxy = c[:, hi] - c[:, lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fresh = self.sums[0] > 0
+            s5_mean = np.where(fresh, sx / n, np.nan)
+            comp_mean = np.where(fresh, sy / n, np.nan)
+            cov = sxy - sx * sy / n
+            var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+            r = np.where((n >= 3) & (var > 0), cov / np.sqrt(var), np.nan)
+        return {"n": n.astype(np.int64), "s5_mean": s5_mean, "comp_mean": comp_mean, "r": r}
+
+    # ─── Persistence ──────────────────────────────────────────────────────
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=np.int64(STATE_VERSION), bin_seconds=np.int64(self.bin_seconds),
+                     origin=np.int64(self.origin if self.origin is not None else -1),
+                     lexicon_version=np.array(self.lexicon_version),
+                     sums=self.sums, seen=np.array(sorted(self.seen), dtype=str))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != STATE_VERSION:
+                raise ValueError(f"unsupported drift state version: {int(data['version'])}")
+            tracker = cls(int(data["bin_seconds"]), str(data["lexicon_version"]))
+            origin = int(data["origin"])
+            tracker.origin = None if origin < 0 else origin
+            tracker.sums = data["sums"]
+            tracker.seen = set(data["seen"].tolist())
+        return tracker
+
+
+def open_tracker(path, bin_seconds, lexicon_version="", rebuild=False):
+    """
+    Saved tracker at path when it has the same bin width and lexicon
+    version, else a new one (saying why an existing state was not reused).
+    """
+    if path and not rebuild and os.path.exists(path):
+        try:
+            tracker = DriftTracker.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  Drift state {path} not reused ({e}); rebuilding")
+        else:
+            if tracker.lexicon_version != lexicon_version:
+                print(f"  Drift state {path} was scored with lexicons "
+                      f"[version {tracker.lexicon_version or 'unknown'}], not "
+                      f"[version {lexicon_version}]; rebuilding")
+            elif tracker.bin_seconds != bin_seconds:
+                print(f"  Drift state {path} has {tracker.bin_seconds}s bins, not "
+                      f"{bin_seconds}s; rebuilding")
+            else:
+                return tracker
+    return DriftTracker(bin_seconds, lexicon_version)
+
+
+# ─── Report ───────────────────────────────────────────────────────────────────
+
+def drift_report(tracker, window=DEFAULT_WINDOW, max_lag=DEFAULT_MAX_LAG, show=10):
+    """Print the drift section; returns its JSON summary."""
+    print("\n" + "=" * 70)
+    print("9. TEMPORAL DRIFT (created_at)")
+    print("=" * 70)
+    if tracker.n_bins == 0:
+        print("\n  No proteins with created_at.")
+        return {"proteins": 0}
+
+    roll = tracker.rolling(window)
+    starts = tracker.bin_starts()
+    days = tracker.bin_seconds / DAY
+    print(f"\n  {len(tracker)} proteins in {tracker.n_bins} bins of {days:g} day(s), "
+          f"{starts[0].astype('datetime64[D]')} .. {starts[-1].astype('datetime64[D]')}; "
+          f"trailing window {window} bins")
+
+    occupied = np.flatnonzero(tracker.sums[0] > 0)
+    print(f"\n  {'Window end':<12} {'N':>6} {'S5':>7} {'Composite':>10} {'r(S5,Comp)':>11}")
+    print(f"  {'-'*12} {'-'*6} {'-'*7} {'-'*10} {'-'*11}")
+    for i in occupied[-show:].tolist():
+        r = roll["r"][i]
+        print(f"  {str(starts[i].astype('datetime64[D]')):<12} {roll['n'][i]:>6} "
+              f"{roll['s5_mean'][i]:>7.3f} {roll['comp_mean'][i]:>10.4f} "
+              f"{'' if np.isnan(r) else f'{r:+.4f}':>11}")
+
+    lags, xcorr = lagged_xcorr(roll["s5_mean"], roll["comp_mean"], max_lag)
+    summary = {
+        "proteins": len(tracker),
+        "bins": tracker.n_bins,
+        "bin_days": days,
+        "window": window,
+        "xcorr": {int(lag): (None if np.isnan(r) else round(float(r), 4))
+                  for lag, r in zip(lags, xcorr)},
+    }
+    if not np.isfinite(xcorr).any():
+        print("\n  Lagged cross-correlation: fewer than 3 overlapping windows at every lag")
+    else:
+        best = int(np.nanargmax(np.abs(xcorr)))
+        zero = xcorr[lags == 0][0]
+        print(f"\n  Lagged cross-correlation (S5 window mean vs composite, {len(lags)} lags):")
+        print(f"    lag 0: r = {zero:+.4f}")
+        print(f"    strongest: lag {lags[best]:+d} bins, r = {xcorr[best]:+.4f}"
+              + ("  (composite follows S5)" if lags[best] > 0
+                 else "  (composite leads S5)" if lags[best] < 0 else ""))
+        summary["best_lag"] = int(lags[best])
+
+    s5_peaks = local_peaks(roll["s5_mean"])
+    comp_peaks = local_peaks(roll["comp_mean"])
+    gap = np.abs(s5_peaks[:, None] - comp_peaks[None, :]) if len(s5_peaks) and len(comp_peaks) else None
+    coincident = s5_peaks[(gap <= 1).any(axis=1)] if gap is not None else s5_peaks[:0]
+    print(f"\n  S5 window peaks: {len(s5_peaks)}   Composite window peaks: {len(comp_peaks)}   "
+          f"coincident (±1 bin): {len(coincident)}")
+    if len(coincident):
+        dates = [str(d) for d in starts[coincident[-show:]].astype("datetime64[D]")]
+        print(f"    latest coincident: {', '.join(dates)}")
+    summary.update({"s5_peaks": len(s5_peaks), "composite_peaks": len(comp_peaks),
+                    "coincident_peaks": len(coincident)})
+    return summary
+
+
+def main(argv=None):
+    from .lexicon_matcher import DEFAULT_CACHE_DIR, load_matcher, parse_lexicon_specs
+    from .metrics_store import open_metrics
+    from .parallel_ingest import ingest_corpora
+    from .paths import add_path_arguments, resolve_paths
+    from .register_scoring import DEFAULT_LEXICONS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--state", metavar="PATH", help="drift state to update incrementally")
+    parser.add_argument("--rebuild", action="store_true", help="ignore an existing --state")
+    add_path_arguments(parser)
+    parser.add_argument("--all-corpora", action="store_true", help="every corpus directory")
+    parser.add_argument("--lexicon", action="append", default=[], metavar="NAME=PATH",
+                        help="load a lexicon file (as in register_shimmer_analysis.py)")
+    parser.add_argument("--bin-days", type=float, default=DEFAULT_BIN_DAYS)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="bins per window")
+    parser.add_argument("--max-lag", type=int, default=DEFAULT_MAX_LAG, help="bins")
+    args = parser.parse_args(argv)
+    error = option_error(args.bin_days, args.window, args.max_lag)
+    if error:
+        parser.error(error)
+
+    proteins_dirs, metrics_path, _ = resolve_paths(args)
+    lexicons = dict(DEFAULT_LEXICONS)
+    lexicons.update(parse_lexicon_specs(args.lexicon))
+    matcher = load_matcher(lexicons, cache_dir=DEFAULT_CACHE_DIR)
+    tracker = open_tracker(args.state, int(args.bin_days * DAY), matcher.digest, args.rebuild)
+    before = len(tracker)
+    proteins, scores, _ = ingest_corpora(proteins_dirs, matcher=matcher)
+    metrics = open_metrics(metrics_path)
+    ids = [pid for pid in proteins if scores[pid] is not None and pid not in tracker.seen]
+    rows = metrics.lookup(ids)
+    keep = rows >= 0
+    ids = [pid for pid, ok in zip(ids, keep.tolist()) if ok]
+    added = tracker.update(
+        ids,
+        parse_timestamps([proteins[pid].get("created_at") for pid in ids]),
+        metrics.column("s5", rows[keep]),
+        [scores[pid]["composite"] for pid in ids],
+    )
+    print(f"Drift state: {before} proteins, {added} added")
+    drift_report(tracker, args.window, args.max_lag)
+    if args.state:
+        tracker.save(args.state)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
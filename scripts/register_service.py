@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Register Scoring Service
+========================
+Scores draft protein text against the corpus without rerunning the
+analysis, for use inside a synthesis iteration loop.
+
+A RegisterService keeps the compiled lexicons and the corpus reference
+distributions in memory:
+
+  composite       sorted composite scores of every analysed protein
+  s5_edges        S5 quintile edges (same bins as section 2 of the analysis)
+  quintile means  mean composite per S5 quintile
+
+Each draft gets compute_register_scores() plus its composite percentile
+(% of corpus proteins with a lower composite, like pc1_pct) and, when the
+caller supplies an S5 (e.g. from s5_engine or an embedding target), its S5
+quintile and that quintile's mean composite. A reference saved with
+--reference is reused only while the lexicons, the protein files and the
+metrics JSON are unchanged.
+
+Library:
+    service = RegisterService.from_corpus()
+    service.score("draft text", s5=0.96)
+    service.score_many([{"id": "a", "text": "..."}, ...])
+
+Service (one JSON request per line, one JSON response per line):
+    python register_service.py                    # stdin -> stdout
+    python register_service.py --socket PATH      # local Unix socket
+
+A request is {"id": ..., "text": ..., "s5": optional} or a list of them
+(answered with a list). Start-up messages go to stderr, so stdout carries
+JSON only.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import sys
+import time
+
+import numpy as np
+
+from eidolon.lexicon_matcher import DEFAULT_CACHE_DIR, load_matcher, parse_lexicon_specs
+from eidolon.paths import add_path_arguments, resolve_paths
+from eidolon.register_scoring import DEFAULT_LEXICONS, compute_register_scores
+
+REFERENCE_VERSION = 2
+
+
+# ─── Reference Distributions ──────────────────────────────────────────────────
+
+class Reference:
+    """Corpus-level distributions a draft is ranked against."""
+
+    def __init__(self, composite, s5_edges, quintile_means, lexicon_version="", source=""):
+        self.composite = np.sort(np.asarray(composite, dtype=np.float64))
+        self.s5_edges = np.asarray(s5_edges, dtype=np.float64)
+        self.quintile_means = np.asarray(quintile_means, dtype=np.float64)
+        self.lexicon_version = lexicon_version
+        self.source = source   # corpus_fingerprint() of the corpus it was built from
+
+    @classmethod
+    def from_arrays(cls, s5, composite, lexicon_version="", source=""):
+        """Reference from row-aligned S5 and composite arrays of the analysed corpus."""
+        s5 = np.asarray(s5, dtype=np.float64)
+        composite = np.asarray(composite, dtype=np.float64)
+        edges = np.percentile(s5, [0, 20, 40, 60, 80, 100])
+        quintile = _quintile_index(edges, s5)
+        means = [composite[quintile == i].mean() if np.any(quintile == i) else np.nan
+                 for i in range(5)]
+        return cls(composite, edges, means, lexicon_version, source)
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=np.int64(REFERENCE_VERSION), composite=self.composite,
+                     s5_edges=self.s5_edges, quintile_means=self.quintile_means,
+                     lexicon_version=np.array(self.lexicon_version),
+                     source=np.array(self.source))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != REFERENCE_VERSION:
+                raise ValueError(f"unsupported reference version: {int(data['version'])}")
+            return cls(data["composite"], data["s5_edges"], data["quintile_means"],
+                       str(data["lexicon_version"]), str(data["source"]))
+
+    def composite_pct(self, composite):
+        """% of corpus proteins with a lower composite score."""
+        below = np.searchsorted(self.composite, composite, side="left")
+        return round(100 * float(below) / len(self.composite), 1)
+
+    def s5_quintile(self, s5):
+        """1-5, with the analysis's bins (lower edge inclusive, last bin closed)."""
+        return int(_quintile_index(self.s5_edges, s5)) + 1
+
+
+def _quintile_index(edges, s5):
+    return np.searchsorted(edges[1:5], s5, side="right")
+
+
+def corpus_fingerprint(proteins_dirs, metrics_path):
+    """Hash of the protein files (name, mtime, size) and the metrics JSON's mtime and size."""
+    from eidolon.protein_index import directory_fingerprint
+
+    st = os.stat(metrics_path)
+    key = f"{directory_fingerprint(proteins_dirs)}\0{os.path.abspath(metrics_path)}\0" \
+          f"{st.st_mtime_ns}\0{st.st_size}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def corpus_reference(matcher, proteins_dirs=None, metrics_path=None, workers=1):
+    """Score the corpus (snapshot + score store make this cheap) and build a Reference."""
+    from eidolon.metrics_store import open_metrics
+    from eidolon.parallel_ingest import ingest_corpora
+    from eidolon.paths import METRICS_PATH, PROTEINS_DIR
+
+    proteins_dirs = proteins_dirs or [PROTEINS_DIR]
+    metrics_path = metrics_path or METRICS_PATH
+    # Taken before reading, so an edit made during the build is seen next time
+    source = corpus_fingerprint(proteins_dirs, metrics_path)
+    metrics = open_metrics(metrics_path)
+    proteins, scores, _ = ingest_corpora(proteins_dirs, matcher=matcher, workers=workers)
+    ids = [pid for pid in proteins if scores[pid] is not None]
+    rows = metrics.lookup(ids)
+    keep = rows >= 0
+    composite = [scores[pid]["composite"] for pid, ok in zip(ids, keep.tolist()) if ok]
+    return Reference.from_arrays(metrics.column("s5", rows[keep]), composite, matcher.digest,
+                                 source)
+
+
+# ─── Service ──────────────────────────────────────────────────────────────────
+
+class RegisterService:
+    """Warm lexicons + reference distributions; scores drafts in-process."""
+
+    def __init__(self, matcher, reference):
+        self.matcher = matcher
+        self.reference = reference
+
+    @classmethod
+    def from_corpus(cls, lexicons=None, reference_path=None, rebuild=False,
+                    lexicon_cache_dir=None, **corpus_kwargs):
+        """
+        Compile lexicons ({name: entries}, default the built-in ones) and load
+        the reference from reference_path, building (and saving) it from the
+        corpus when missing, stale for these lexicons or this corpus (a
+        protein file or the metrics JSON changed), or rebuild=True. Compiled
+        lexicons are cached in lexicon_cache_dir when one is given.
+        """
+        from eidolon.paths import METRICS_PATH, PROTEINS_DIR
+
+        matcher = load_matcher(lexicons or DEFAULT_LEXICONS, cache_dir=lexicon_cache_dir)
+        corpus_kwargs["proteins_dirs"] = corpus_kwargs.get("proteins_dirs") or [PROTEINS_DIR]
+        corpus_kwargs["metrics_path"] = corpus_kwargs.get("metrics_path") or METRICS_PATH
+        reference = None
+        if reference_path and not rebuild:
+            try:
+                reference = Reference.load(reference_path)
+            except (OSError, ValueError, KeyError):
+                reference = None
+            if reference is not None and (
+                    reference.lexicon_version != matcher.digest
+                    or reference.source != corpus_fingerprint(corpus_kwargs["proteins_dirs"],
+                                                              corpus_kwargs["metrics_path"])):
+                reference = None
+        if reference is None:
+            reference = corpus_reference(matcher, **corpus_kwargs)
+            if reference_path:
+                reference.save(reference_path)
+        return cls(matcher, reference)
+
+    def score(self, text, s5=None, draft_id=None):
+        """Scores and corpus placement for one draft."""
+        scores = compute_register_scores(text or "", self.matcher)
+        result = {"id": draft_id, "scores": scores}
+        if scores is None:
+            result["error"] = "too short to score"
+            return result
+        result["composite_pct"] = self.reference.composite_pct(scores["composite"])
+        if s5 is not None:
+            quintile = self.reference.s5_quintile(float(s5))
+            result["s5_quintile"] = quintile
+            result["quintile_composite_mean"] = round(
+                float(self.reference.quintile_means[quintile - 1]), 4)
+        return result
+
+    def score_many(self, drafts):
+        """Score a batch of {"id", "text", "s5"} dicts (or plain strings)."""
+        out = []
+        for draft in drafts:
+            if isinstance(draft, str):
+                draft = {"text": draft}
+            out.append(self.score(draft.get("text"), draft.get("s5"), draft.get("id")))
+        return out
+
+    def handle_line(self, line):
+        """One JSON request line -> one JSON response line."""
+        try:
+            request = json.loads(line)
+            if isinstance(request, list):
+                response = self.score_many(request)
+            elif isinstance(request, dict):
+                response = self.score(request.get("text"), request.get("s5"), request.get("id"))
+            else:
+                response = {"error": "request must be an object or a list of objects"}
+        except (ValueError, TypeError, AttributeError) as e:
+            response = {"error": f"bad request: {e}"}
+        return json.dumps(response)
+
+
+def serve_stdio(service, infile=sys.stdin, outfile=sys.stdout):
+    for line in infile:
+        if line.strip():
+            outfile.write(service.handle_line(line) + "\n")
+            outfile.flush()
+
+
+def serve_socket(service, path):
+    """Serve JSON lines on a local Unix socket until interrupted."""
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write(service.handle_line(line).encode() + b"\n")
+                    self.wfile.flush()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", metavar="PATH",
+                        help="serve on a local Unix socket instead of stdin/stdout")
+    parser.add_argument("--reference", metavar="PATH",
+                        help="load/save the corpus reference distributions here (.npz)")
+    parser.add_argument("--rebuild-reference", action="store_true",
+                        help="rebuild the reference from the corpus even if --reference exists")
+    parser.add_argument("--lexicon", action="append", default=[], metavar="NAME=PATH",
+                        help="load a lexicon file (as in register_shimmer_analysis.py)")
+    add_path_arguments(parser)
+    parser.add_argument("--all-corpora", action="store_true",
+                        help="build the reference from every corpus directory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    proteins_dirs, metrics_path, _ = resolve_paths(args)
+    t0 = time.perf_counter()
+    lexicons = dict(DEFAULT_LEXICONS)
+    lexicons.update(parse_lexicon_specs(args.lexicon))
+    service = RegisterService.from_corpus(
+        lexicons, reference_path=args.reference, rebuild=args.rebuild_reference,
+        lexicon_cache_dir=DEFAULT_CACHE_DIR, proteins_dirs=proteins_dirs, metrics_path=metrics_path,
+    )
+    print(f"Ready in {time.perf_counter() - t0:.2f}s: {len(service.reference.composite)} "
+          f"reference proteins, lexicons [version {service.matcher.digest}]", file=sys.stderr)
+    if args.socket:
+        serve_socket(service, args.socket)
+    else:
+        serve_stdio(service)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,270 +9,512 @@ Hypothesis: High S5 → more metaphorical/poetic/bridging language
             Low S5  → more precise/analytical/domain-specific language
 """
 
-import os
+import argparse
 import json
-import re
-import yaml
-import numpy as np
-from scipy import stats
-from collections import Counter
-
-# ─── Configuration ─────────────────────────────────────────────────────────────
-
-PROTEINS_DIR = "/home/user/eidolon-proteins/connectomes/meshseed-primary/proteins/"
-METRICS_PATH = "/home/user/eidolon-proteins/Docs/data/spore-metrics-for-proteins.json"
-
-# Metaphorical / bridging / poetic vocabulary
-METAPHOR_TERMS = {
-    # Nature / organic
-    "wave", "ocean", "river", "flow", "stream", "tide", "current", "ripple",
-    "garden", "seed", "root", "bloom", "blossom", "flower", "grow", "growth",
-    "soil", "compost", "fertile", "harvest", "prune", "branch", "leaf", "tree",
-    "forest", "ecosystem", "ecology", "organic", "organism", "living", "alive",
-    "breathe", "breath", "inhale", "exhale",
-    # Fabric / weaving
-    "weave", "thread", "fabric", "tapestry", "knit", "loom", "strand",
-    "braid", "interweave", "interwoven",
-    # Light / perception
-    "shimmer", "glow", "radiance", "luminous", "illuminate", "light", "shadow",
-    "mirror", "reflection", "lens", "prism", "spectrum",
-    # Movement / dance
-    "dance", "spiral", "orbit", "pulse", "rhythm", "vibration", "oscillation",
-    "resonate", "resonance", "resonant", "harmonize", "harmony", "harmonic",
-    "attune", "attunement", "attuned",
-    # Spatial / landscape
-    "landscape", "terrain", "horizon", "bridge", "threshold", "boundary",
-    "edge", "frontier", "shore", "depth", "deep", "abyss",
-    # Figurative connectors
-    "like", "as if", "metaphor", "analogy", "echo", "whisper", "murmur",
-    # Consciousness / experiential
-    "feel", "felt", "sense", "intuition", "awareness", "awaken", "dream",
-    "vision", "imagine", "wonder", "mystery", "sacred", "soul", "spirit",
-    # Transformation
-    "emerge", "emergence", "emergent", "unfold", "unfolding", "evolve",
-    "transform", "metamorphosis", "chrysalis", "cocoon", "gestate",
-    "birth", "midwife", "genesis",
-    # Unity / wholeness
-    "unity", "oneness", "wholeness", "holistic", "integrate", "communion",
-    "symbiosis", "entangle", "entanglement",
-}
-
-# Analytical / technical / domain-specific vocabulary
-ANALYTICAL_TERMS = {
-    # Computing / engineering
-    "system", "process", "function", "parameter", "variable", "compute",
-    "algorithm", "protocol", "implement", "implementation", "architecture",
-    "framework", "module", "component", "interface", "pipeline", "stack",
-    "configure", "configuration", "optimize", "optimization", "efficiency",
-    "debug", "deploy", "execute", "runtime", "instance",
-    # Data / math
-    "data", "dataset", "metric", "measure", "quantify", "calculate",
-    "equation", "formula", "coefficient", "vector", "matrix", "dimension",
-    "linear", "nonlinear", "gradient", "derivative", "integral",
-    "statistic", "statistical", "correlation", "distribution", "variance",
-    "probability", "deterministic", "stochastic",
-    # Structure / formal
-    "structure", "structural", "schema", "taxonomy", "hierarchy",
-    "classify", "classification", "categorize", "enumerate",
-    "specification", "constraint", "requirement", "validate", "validation",
-    "mechanism", "methodology", "procedure", "criterion",
-    # Technical nouns
-    "network", "node", "graph", "edge", "vertex", "cluster",
-    "embedding", "encode", "decode", "compress", "decompress",
-    "index", "query", "retrieve", "store", "database",
-    "api", "endpoint", "server", "client", "request", "response",
-}
-
-# ─── Text Processing ──────────────────────────────────────────────────────────
-
-def extract_text(protein):
-    """Combine title + summary + insights into one text block."""
-    parts = []
-    if protein.get("title"):
-        parts.append(str(protein["title"]))
-    if protein.get("summary"):
-        parts.append(str(protein["summary"]))
-    for insight in protein.get("insights", []):
-        if insight:
-            parts.append(str(insight))
-    return " ".join(parts)
-
-
-def tokenize(text):
-    """Simple whitespace + punctuation tokenizer, lowercase."""
-    return re.findall(r'[a-z]+', text.lower())
-
-
-def compute_register_scores(text):
+
+# Deployment layout (root, primary corpus, metrics, results) is shared with the
+# service and the eidolon CLIs; the constants are re-exported for existing callers.
+from eidolon.paths import (  # noqa: F401
+    CORPUS_DIRS, CORPUS_ROOT, CORPUS_SUBDIRS, METRICS_PATH, PROTEINS_DIR, RESULTS_PATH,
+    add_path_arguments, resolve_paths,
+)
+# The scoring API lives in eidolon.register_scoring; re-exported here for existing callers.
+# Heavier analysis modules (NumPy, SciPy, YAML) are imported when main() runs.
+from eidolon.register_scoring import (  # noqa: F401
+    ABSTRACT_SUFFIXES, ANALYTICAL_TERMS, DEFAULT_LEXICONS, METAPHOR_TERMS,
+    compute_register_scores, default_matcher, extract_p_number, extract_text, tokenize,
+)
+
+
+def print_resampled(c, indent=4):
+    """Bootstrap CI and permutation p lines for one correlate() result."""
+    if "pearson_ci" not in c:
+        return
+    pad = " " * indent
+    lo, hi = c["pearson_ci"]
+    print(f"{pad}  r 95% CI [{lo:+.4f}, {hi:+.4f}]  perm p = {c['pearson_perm_p']:.2e}")
+    if "spearman_ci" in c:
+        lo, hi = c["spearman_ci"]
+        print(f"{pad}  ρ 95% CI [{lo:+.4f}, {hi:+.4f}]  perm p = {c['spearman_perm_p']:.2e}")
+
+
+# ─── Main Analysis ─────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    from eidolon.near_duplicates import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+    from eidolon.parallel_ingest import DEFAULT_CHUNK_SIZE
+    from eidolon.s5_engine import DEFAULT_K
+    from eidolon.sharded_analysis import DEFAULT_SHARD_SIZE, DEFAULT_SKETCH_K
+    from eidolon.significance import DEFAULT_RESAMPLES, DEFAULT_SEED
+    from eidolon.temporal_drift import (
+        DEFAULT_BIN_DAYS, DEFAULT_MAX_LAG, DEFAULT_WINDOW, option_error as temporal_option_error,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_path_arguments(parser, output=True)
+    parser.add_argument("--rebuild-snapshot", action="store_true",
+                        help="ignore the corpus snapshot and rebuild it from YAML")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="parse every YAML file directly (no snapshot read or written)")
+    parser.add_argument("--no-metrics-store", action="store_true",
+                        help="read the metrics JSON directly instead of the columnar store")
+    parser.add_argument("--embeddings", metavar="PATH",
+                        help="local amplitude matrix (.npz with ids, or .npy + .ids.txt) "
+                             "used to recompute S5 with a kNN index")
+    parser.add_argument("--knn-index", metavar="PATH",
+                        help="kNN index file (default: <embeddings>.knn.npz)")
+    parser.add_argument("--knn-k", type=int, default=DEFAULT_K,
+                        help="neighbours per protein for local S5")
+    parser.add_argument("--knn-metric", choices=("cosine", "euclidean"), default="cosine",
+                        help="amplitude-space distance for local S5")
+    parser.add_argument("--local-s5", choices=("fill", "replace"), default="fill",
+                        help="fill: local S5 only for proteins missing upstream; "
+                             "replace: local S5 for every embedded protein")
+    parser.add_argument("--all-corpora", action="store_true",
+                        help="ingest every corpus directory under the root, not just the primary one")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for parsing and scoring (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="files/proteins per work unit")
+    parser.add_argument("--lexicon", action="append", default=[], metavar="NAME=PATH",
+                        help="load a lexicon file (one entry per line); replaces a built-in "
+                             "lexicon of the same name (metaphor, analytical) or adds a new one")
+    parser.add_argument("--rescore", action="store_true",
+                        help="rescore every protein and refresh the score store")
+    parser.add_argument("--no-score-store", action="store_true",
+                        help="score every protein without reading or writing the score store")
+    parser.add_argument("--score-store-dir", metavar="DIR",
+                        help="keep the score store here instead of the default cache directory")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES,
+                        help="bootstrap/permutation resamples per correlation (0 = parametric only)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help="RNG seed for resampling")
+    parser.add_argument("--streaming", action="store_true",
+                        help="out-of-core mode: process proteins in shards and merge summaries "
+                             "(quantiles approximate within sketch error; no per-protein "
+                             "export is written)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="protein files per shard in --streaming mode")
+    parser.add_argument("--sketch-k", type=int, default=DEFAULT_SKETCH_K,
+                        help="quantile sketch size in --streaming mode (larger = more accurate)")
+    parser.add_argument("--spill-dir", metavar="DIR",
+                        help="keep --streaming shard column files here (default: temp dir, removed)")
+    parser.add_argument("--tag", action="append", default=[], metavar="TAG",
+                        help="only analyse proteins carrying this YAML tag (repeatable; all must match)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write per-stage spans (wall, CPU, peak RSS, items) as JSON")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="cProfile every stage and dump the slowest one's stats here")
+    parser.add_argument("--query", metavar="EXPR",
+                        help="analyse the subset matching a boolean query over the inverted index, "
+                             "e.g. \"#mesh AND tier:core\" (see eidolon/protein_index.py)")
+    parser.add_argument("--index", metavar="PATH",
+                        help="inverted index file for --query (default: .index-cache/)")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="rebuild the --query index even if it is up to date")
+    parser.add_argument("--dedup", action="store_true",
+                        help="drop near-duplicate proteins (MinHash/LSH), keeping the first of each "
+                             "cluster in directory order")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_DEDUP_THRESHOLD,
+                        help="minimum estimated Jaccard of word 3-grams for --dedup")
+    parser.add_argument("--dedup-report", metavar="PATH",
+                        help="write the --dedup clusters as JSON")
+    parser.add_argument("--temporal", action="store_true",
+                        help="add rolling-window S5/register drift over created_at, with lagged "
+                             "cross-correlation and peak detection (section 9)")
+    parser.add_argument("--temporal-state", metavar="PATH",
+                        help="drift state (.npz) to update incrementally: only proteins it has "
+                             "not seen are added")
+    parser.add_argument("--rebuild-temporal", action="store_true",
+                        help="ignore an existing --temporal-state and rebuild it")
+    parser.add_argument("--bin-days", type=float, default=DEFAULT_BIN_DAYS,
+                        help="time bin width for --temporal, in days")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="trailing window for --temporal, in bins")
+    parser.add_argument("--max-lag", type=int, default=DEFAULT_MAX_LAG,
+                        help="largest cross-correlation lag for --temporal, in bins")
+    parser.add_argument("--export", metavar="PATH",
+                        help="columnar per-protein results export (default: next to --output, "
+                             "<name>.table; see eidolon/results_export.py)")
+    parser.add_argument("--no-export", action="store_true",
+                        help="write only the summary JSON, not the per-protein export")
+    parser.add_argument("--from-export", metavar="PATH",
+                        help="regenerate the report from an export, without reading YAML, "
+                             "lexicons or the metrics JSON")
+    parser.add_argument("--check-serial", action="store_true",
+                        help="verify results against the serial per-file path and report speedup")
+    args = parser.parse_args(argv)
+    if args.query and (args.streaming or args.embeddings or args.check_serial or args.dedup):
+        parser.error("--query reads the inverted index and cannot be combined with "
+                     "--streaming, --embeddings, --check-serial or --dedup")
+    if args.streaming and args.dedup:
+        parser.error("--dedup needs every protein in memory; it cannot be combined with --streaming")
+    if args.streaming and args.temporal:
+        parser.error("--temporal needs the per-protein table; it cannot be combined with --streaming")
+    if args.streaming and (args.embeddings or args.check_serial or args.export):
+        parser.error("--streaming keeps no per-protein table in memory; it cannot be combined "
+                     "with --embeddings, --check-serial or --export")
+    if args.from_export and (args.streaming or args.query or args.tag or args.dedup
+                             or args.embeddings or args.check_serial):
+        parser.error("--from-export reads a finished results table and cannot be combined with "
+                     "--streaming, --query, --tag, --dedup, --embeddings or --check-serial")
+    if (args.temporal_state or args.rebuild_temporal) and not args.temporal:
+        parser.error("--temporal-state and --rebuild-temporal need --temporal")
+    if args.temporal:
+        error = temporal_option_error(args.bin_days, args.window, args.max_lag)
+        if error:
+            parser.error(error)
+    return args
+
+
+def finish_instrumentation(clock, args):
+    """Write the --trace / --profile outputs, if requested."""
+    if args.trace:
+        clock.write_trace(args.trace)
+        print(f"Trace saved to {args.trace}")
+    if args.profile:
+        stage = clock.dump_profile(args.profile)
+        print(f"Profile of slowest profiled stage ({stage}, {clock.timings[stage]:.2f}s) "
+              f"saved to {args.profile}")
+
+
+def save_empty_results(results_path, run_meta, clock, args, reason):
+    """Nothing to correlate (e.g. an empty --query): say why and save a stub results JSON."""
+    print(f"\n  {reason[0].upper()}{reason[1:]}; nothing to analyse")
+    output = {"n_proteins": 0, "n_matched": run_meta["n_matched"], "reason": reason}
+    output.update({key: run_meta[key] for key in ("query", "tags") if run_meta.get(key)})
+    with open(results_path, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n\nResults saved to {results_path}")
+    print("=" * 70)
+    clock.mark("output")
+    finish_instrumentation(clock, args)
+    return clock.timings
+
+
+def ingest_results(args, proteins_dirs, metrics, matcher, clock):
     """
-    Compute multiple register metrics for a protein's text.
-    Returns dict of individual scores and a composite score.
+    Ingest (parse + score) the corpus, join it to the metrics and apply --tag.
+    Returns (ResultTable, number of proteins matched to metrics).
     """
-    tokens = tokenize(text)
-    if len(tokens) < 5:
-        return None  # Too short to score
-
-    token_set = set(tokens)
-    n_tokens = len(tokens)
-    n_types = len(token_set)
-
-    # 1. Metaphor density: fraction of tokens that are metaphorical
-    metaphor_hits = sum(1 for t in tokens if t in METAPHOR_TERMS)
-    metaphor_density = metaphor_hits / n_tokens
-
-    # 2. Analytical density: fraction of tokens that are analytical
-    analytical_hits = sum(1 for t in tokens if t in ANALYTICAL_TERMS)
-    analytical_density = analytical_hits / n_tokens
-
-    # 3. Register ratio: metaphor / (metaphor + analytical), centered at 0.5
-    total_register = metaphor_hits + analytical_hits
-    if total_register > 0:
-        register_ratio = metaphor_hits / total_register
-    else:
-        register_ratio = 0.5  # neutral
-
-    # 4. Type-token ratio (lexical diversity)
-    ttr = n_types / n_tokens if n_tokens > 0 else 0
+    import numpy as np
+
+    from eidolon.metrics_store import SporeMetrics
+    from eidolon.near_duplicates import dedup_view, find_duplicates
+    from eidolon.parallel_ingest import check_against_serial, ingest_corpora
+    from eidolon.result_table import ResultTable
+    from eidolon.s5_engine import local_metrics
+    from eidolon.score_store import DEFAULT_STORE_DIR
+    from eidolon.tag_bitset import TagTable
+    from eidolon.temporal_drift import parse_timestamps
+
+    proteins, all_scores, ingest_stats = ingest_corpora(
+        proteins_dirs,
+        matcher=matcher,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        rebuild=args.rebuild_snapshot,
+        use_snapshot=not args.no_snapshot,
+        use_score_store=not args.no_score_store,
+        rescore=args.rescore,
+        score_store_dir=args.score_store_dir or DEFAULT_STORE_DIR,
+    )
+    clock.mark("load.proteins", items=len(proteins), parsed=ingest_stats["parse"]["items"])
+    # Scoring runs inside ingest; charge it to its own stage
+    clock.add("score", ingest_stats["score"]["wall_seconds"],
+              ingest_stats["score"]["cpu_seconds"], items=ingest_stats["score"]["items"])
+    for d, dir_stats in ingest_stats["directories"].items():
+        if dir_stats["proteins"] is not None:
+            print(f"Loaded {dir_stats['proteins']} proteins from {d} "
+                  f"({dir_stats['reused']} from snapshot, {dir_stats['parsed']} parsed)")
+    print(f"Loaded {len(proteins)} proteins from {len(proteins_dirs)} director"
+          f"{'y' if len(proteins_dirs) == 1 else 'ies'} ({ingest_stats['workers']} worker(s))")
+    for stage in ("parse", "score"):
+        st = ingest_stats[stage]
+        print(f"  {stage:<6} {st['items']:>6} items  {st['worker_seconds']:.2f}s worker "
+              f"/ {st['wall_seconds']:.2f}s wall  ({st['speedup']:.2f}x)")
+    if ingest_stats["score_store"] is not None:
+        reused = ingest_stats["score_store"]["reused"]
+        rescored = ingest_stats["score_store"]["rescored"]
+        hit_rate = 100 * reused / (reused + rescored) if reused + rescored else 0.0
+        print(f"  score store: {reused} reused, {rescored} rescored ({hit_rate:.1f}% hit rate)")
+    if args.check_serial:
+        ok, serial_seconds = check_against_serial(proteins_dirs, proteins, all_scores, matcher)
+        print(f"  serial check: {'identical' if ok else 'MISMATCH'}")
+        for stage, seconds in serial_seconds.items():
+            wall = ingest_stats[stage]["wall_seconds"]
+            if ingest_stats[stage]["items"] and wall > 0:
+                print(f"  {stage:<6} serial per-file {seconds:.2f}s vs {wall:.2f}s "
+                      f"({seconds / wall:.2f}x)")
+            else:
+                print(f"  {stage:<6} serial per-file {seconds:.2f}s vs nothing to do (cached)")
+
+    # Near-duplicates (MinHash/LSH): keep one protein per cluster
+    if args.dedup:
+        clusters, dup_stats = find_duplicates(proteins, args.dedup_threshold)
+        proteins = dedup_view(proteins, clusters)
+        print(f"Near-duplicates: {dup_stats['clusters']} clusters at Jaccard >= "
+              f"{args.dedup_threshold}, dropped {dup_stats['dropped']} of {dup_stats['proteins']} "
+              f"proteins ({dup_stats['hashed']} hashed, {dup_stats['seconds']:.2f}s)")
+        if args.dedup_report:
+            with open(args.dedup_report, "w") as f:
+                json.dump({"threshold": args.dedup_threshold, "stats": dup_stats,
+                           "clusters": clusters}, f, indent=2)
+            print(f"  clusters saved to {args.dedup_report}")
+        clock.mark("load.dedup", items=dup_stats["proteins"])
+
+    # Local S5 from embeddings (fills or replaces upstream metrics)
+    if args.embeddings:
+        upstream = metrics.to_dict()
+        local, s5_stats = local_metrics(
+            proteins, args.embeddings, index_path=args.knn_index, upstream=upstream,
+            k=args.knn_k, metric=args.knn_metric,
+        )
+        print(f"Local S5: {len(local)} proteins from {s5_stats['embedded']} embeddings "
+              f"({'rebuilt' if s5_stats['rebuilt'] else 'reused'} kNN index, "
+              f"{s5_stats['inserted']} inserted)")
+        both = [pid for pid in local if pid in upstream]
+        if both:
+            diff = np.abs(np.array([local[pid]["s5"] - upstream[pid]["s5"] for pid in both]))
+            print(f"  vs upstream S5 on {len(both)} shared ids: "
+                  f"mean |diff| = {diff.mean():.4f}, exact = {np.mean(diff < 1e-9):.1%}")
+        if args.local_s5 == "replace":
+            upstream.update(local)
+        else:
+            for pid, record in local.items():
+                upstream.setdefault(pid, record)
+        metrics = SporeMetrics.from_dict(upstream)
+        clock.mark("load.local_s5", items=len(local))
+
+    # Match: one searchsorted over the sorted id index, then column gathers
+    protein_ids = list(proteins)
+    metric_rows = metrics.lookup(protein_ids)
+    matched = metric_rows >= 0
+    matched_ids = [pid for pid, ok in zip(protein_ids, matched.tolist()) if ok]
+    rows_idx = metric_rows[matched]
+
+    # Tag sets as bitsets: --tag filtering and P-series detection are array ops
+    tag_table = TagTable.from_lists([proteins[pid].get("tags") for pid in matched_ids])
+    p_numbers = tag_table.p_numbers([proteins[pid].get("title", "") for pid in matched_ids])
+    if args.tag:
+        keep = tag_table.has_all(args.tag)
+        print(f"Tag filter {' & '.join(args.tag)}: {int(keep.sum())} of {len(matched_ids)} "
+              f"matched proteins")
+        matched_ids = [pid for pid, ok in zip(matched_ids, keep.tolist()) if ok]
+        rows_idx = rows_idx[keep]
+        p_numbers = p_numbers[keep]
+    print(f"Matched {len(matched_ids)} proteins to spore metrics")
 
-    # 5. Mean sentence length
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    if sentences:
-        mean_sent_len = np.mean([len(tokenize(s)) for s in sentences])
-    else:
-        mean_sent_len = n_tokens
-
-    # 6. Abstract noun density (words ending in -ness, -ity, -tion, -ment, -ance, -ence)
-    abstract_suffixes = ('ness', 'ity', 'tion', 'sion', 'ment', 'ance', 'ence')
-    abstract_count = sum(1 for t in tokens if t.endswith(abstract_suffixes))
-    abstract_density = abstract_count / n_tokens
-
-    # Composite register score: higher = more poetic/metaphorical
-    # Weighted blend: register_ratio (primary), metaphor_density, -analytical_density
-    composite = (
-        0.50 * register_ratio +
-        0.25 * (metaphor_density * 10) +  # scale up (typical range 0-0.1)
-        0.15 * ttr +
-        0.10 * (abstract_density * 10)     # scale up
+    # Result table: one typed column per metric, too-short proteins dropped
+    results = ResultTable.from_scores(
+        matched_ids,
+        [proteins[pid].get("title", "") for pid in matched_ids],
+        [all_scores[pid] for pid in matched_ids],
+        {
+            "s5": metrics.column("s5", rows_idx),
+            "coh": metrics.column("coh", rows_idx),
+            "pc1": metrics.column("pc1", rows_idx),
+            "p_number": p_numbers,
+            "created_ts": parse_timestamps([proteins[pid].get("created_at") for pid in matched_ids]),
+        },
+        tier_codes=metrics.tier_codes[rows_idx], tiers=metrics.tiers,
     )
+    print(f"Scored {len(results)} proteins (excluded {len(matched_ids) - len(results)} too-short)")
+    clock.mark("join", items=len(matched_ids))
+    return results, len(matched_ids)
 
-    return {
-        "metaphor_density": round(metaphor_density, 4),
-        "analytical_density": round(analytical_density, 4),
-        "register_ratio": round(register_ratio, 4),
-        "ttr": round(ttr, 4),
-        "mean_sent_len": round(mean_sent_len, 2),
-        "abstract_density": round(abstract_density, 4),
-        "composite": round(composite, 4),
-        "n_tokens": n_tokens,
-        "metaphor_hits": metaphor_hits,
-        "analytical_hits": analytical_hits,
-    }
 
+def query_results(args, proteins_dirs, metrics, matcher, clock):
+    """
+    Select the --query (and --tag) subset from the persistent inverted index
+    and join it to the metrics; the corpus is only re-ingested when the
+    index is stale. Returns (ResultTable, number of proteins matched to metrics).
+    """
+    import numpy as np
 
-# ─── P-series Detection ───────────────────────────────────────────────────────
+    from eidolon.protein_index import open_index
+    from eidolon.result_table import ResultTable
+    from eidolon.score_store import DEFAULT_STORE_DIR
 
-def extract_p_number(protein):
-    """Extract P-series number from tags or title if present."""
-    tags = protein.get("tags", [])
-    for tag in tags:
-        m = re.match(r'#P(\d+)', tag)
-        if m:
-            return int(m.group(1))
-    # Check title
-    title = protein.get("title", "")
-    m = re.match(r'P(\d+)', title)
-    if m:
-        return int(m.group(1))
-    return None
+    index, rebuilt = open_index(
+        proteins_dirs, matcher, path=args.index, rebuild_index=args.rebuild_index,
+        workers=args.workers, chunk_size=args.chunk_size, rebuild=args.rebuild_snapshot,
+        use_snapshot=not args.no_snapshot, use_score_store=not args.no_score_store,
+        rescore=args.rescore, score_store_dir=args.score_store_dir or DEFAULT_STORE_DIR,
+    )
+    print(f"Index: {len(index)} proteins, {len(index.postings)} keys "
+          f"({'rebuilt' if rebuilt else 'loaded'})")
+    clock.mark("load.index", items=len(index))
+
+    expr = " AND ".join([f"({args.query})"] + [f"tag:{t}" for t in args.tag])
+    try:
+        rows = np.flatnonzero(index.query(expr))
+    except ValueError as e:
+        raise SystemExit(f"Bad --query: {e}")
+    print(f"Query {expr}: {len(rows)} proteins")
+
+    metric_rows = metrics.lookup([index.ids[i] for i in rows.tolist()])
+    matched = metric_rows >= 0
+    rows, rows_idx = rows[matched], metric_rows[matched]
+    print(f"Matched {len(rows)} proteins to spore metrics")
+
+    results = ResultTable.from_score_columns(
+        [index.ids[i] for i in rows.tolist()],
+        [index.titles[i] for i in rows.tolist()],
+        {name: col[rows] for name, col in index.scores.items()},
+        {
+            "s5": metrics.column("s5", rows_idx),
+            "coh": metrics.column("coh", rows_idx),
+            "pc1": metrics.column("pc1", rows_idx),
+            "p_number": index.p_numbers[rows],
+            "created_ts": index.created_ts[rows],
+        },
+        tier_codes=metrics.tier_codes[rows_idx], tiers=metrics.tiers,
+    )
+    print(f"Scored {len(results)} proteins (excluded {len(rows) - len(results)} too-short)")
+    clock.mark("join", items=len(rows))
+    return results, len(rows)
 
 
-# ─── Main Analysis ─────────────────────────────────────────────────────────────
+def export_results(args, clock):
+    """
+    Load the ResultTable from a results export (memory-mapped columns).
+    Returns (ResultTable, the run information saved with it).
+    """
+    from eidolon.results_export import ResultsExport
+
+    export = ResultsExport(args.from_export)
+    results = export.to_table()
+    print(f"\nLoaded {len(results)} proteins from export {args.from_export} "
+          f"[lexicon version {export.meta.get('lexicon_version')}]")
+    for key in ("query", "tags", "dedup_threshold"):
+        if export.meta.get(key):
+            print(f"  exported with {key}: {export.meta[key]}")
+    clock.mark("load.export", items=len(results))
+    return results, export.meta
+
+
+def main(argv=None):
+    # Imported here so that importing this module (or register_scoring) stays cheap
+    import numpy as np
+    from scipy import stats
+
+    from eidolon.lexicon_matcher import DEFAULT_CACHE_DIR, load_matcher, parse_lexicon_specs
+    from eidolon.metrics_store import open_metrics
+    from eidolon.results_export import default_export_path, write_export
+    from eidolon.sharded_analysis import print_report, run_sharded
+    from eidolon.significance import SignificanceEngine
+    from eidolon.stage_clock import StageClock
+    from eidolon.temporal_drift import drift_report, local_peaks, open_tracker
+
+    args = parse_args(argv)
+    clock = StageClock(profile=bool(args.profile))
+    proteins_dirs, metrics_path, results_path = resolve_paths(args)
 
-def main():
     print("=" * 70)
     print("REGISTER-SHIMMER CORRELATION ANALYSIS")
     print("=" * 70)
 
-    # Load metrics
-    with open(METRICS_PATH) as f:
-        metrics = json.load(f)
-    print(f"\nLoaded {len(metrics)} spore metrics")
-
-    # Load proteins
-    proteins = {}
-    protein_files = [f for f in os.listdir(PROTEINS_DIR) if f.endswith(".yaml")]
-    for fname in protein_files:
-        with open(os.path.join(PROTEINS_DIR, fname)) as f:
-            p = yaml.safe_load(f)
-        if p and p.get("id"):
-            proteins[p["id"]] = p
-    print(f"Loaded {len(proteins)} proteins from meshseed-primary")
-
-    # Match
-    matched_ids = set(proteins.keys()) & set(metrics.keys())
-    print(f"Matched {len(matched_ids)} proteins to spore metrics")
-
-    # Compute register scores
-    results = []
-    p_series_results = []
-
-    for pid in matched_ids:
-        protein = proteins[pid]
-        met = metrics[pid]
-        text = extract_text(protein)
-        scores = compute_register_scores(text)
-        if scores is None:
-            continue
-
-        row = {
-            "id": pid,
-            "title": protein.get("title", "")[:80],
-            "s5": met["s5"],
-            "coh": met["coh"],
-            "pc1": met["pc1"],
-            "tier": met["tier"],
-            **scores,
+    if args.from_export:
+        results, run_meta = export_results(args, clock)
+    else:
+        # Load metrics (memory-mapped columnar store, rebuilt when the JSON changes)
+        metrics = open_metrics(metrics_path, use_store=not args.no_metrics_store)
+        print(f"\nLoaded {len(metrics)} spore metrics")
+        clock.mark("load.metrics", items=len(metrics))
+
+        # Compile lexicons
+        lexicons = dict(DEFAULT_LEXICONS)
+        lexicons.update(parse_lexicon_specs(args.lexicon))
+        matcher = load_matcher(lexicons, cache_dir=DEFAULT_CACHE_DIR)
+        print("Lexicons: " + ", ".join(
+            f"{name} ({len(matcher.entries[name])})" for name in matcher.names)
+            + f" [version {matcher.digest}]")
+        clock.mark("load.lexicons")
+
+        # Load and score proteins
+        if args.streaming:
+            if args.no_metrics_store:
+                open_metrics(metrics_path)   # shards read the memory-mapped store
+            pass1, plan, pass2, shard_stats = run_sharded(
+                proteins_dirs, metrics_path, matcher, shard_size=args.shard_size,
+                workers=args.workers, sketch_k=args.sketch_k, spill_dir=args.spill_dir,
+                tags=args.tag,
+            )
+            clock.mark("streaming.shards", items=shard_stats["shards"])
+            output = print_report(pass1, plan, pass2, shard_stats)
+            with open(results_path, "w") as f:
+                json.dump(output, f, indent=2)
+            print(f"\n\nResults saved to {results_path}")
+            print("=" * 70)
+            clock.mark("output")
+            finish_instrumentation(clock, args)
+            return clock.timings
+        if args.query:
+            results, n_matched = query_results(args, proteins_dirs, metrics, matcher, clock)
+        else:
+            results, n_matched = ingest_results(args, proteins_dirs, metrics, matcher, clock)
+        run_meta = {
+            "n_matched": n_matched,
+            "lexicon_version": matcher.digest,
+            "proteins_dirs": proteins_dirs,
+            "query": args.query,
+            "tags": args.tag,
+            "dedup_threshold": args.dedup_threshold if args.dedup else None,
         }
-        results.append(row)
-
-        # Check P-series
-        p_num = extract_p_number(protein)
-        if p_num is not None:
-            row["p_number"] = p_num
-            p_series_results.append(row)
-
-    print(f"Scored {len(results)} proteins (excluded {len(matched_ids) - len(results)} too-short)")
+        if not len(results):
+            return save_empty_results(
+                results_path, run_meta, clock, args,
+                "no proteins match the query" if args.query
+                else "no proteins match the tag filter" if args.tag
+                else "no proteins with register scores match the spore metrics")
 
     # ─── Compute PC1 percentiles ───────────────────────────────────────────
-    all_pc1 = np.array([r["pc1"] for r in results])
-    for r in results:
-        r["pc1_pct"] = round(100 * np.sum(all_pc1 < r["pc1"]) / len(all_pc1), 1)
+    # % of proteins with a strictly lower PC1: a left searchsorted over the sorted column
+    all_pc1 = results["pc1"]
+    below = np.searchsorted(np.sort(all_pc1), all_pc1, side="left")
+    results.add_column("pc1_pct", np.round(100 * below / len(all_pc1), 1))
+    clock.mark("statistics.pc1_pct", items=len(results))
 
     # ─── Overall Correlations ──────────────────────────────────────────────
-    s5_arr = np.array([r["s5"] for r in results])
-    composite_arr = np.array([r["composite"] for r in results])
-    metaphor_arr = np.array([r["metaphor_density"] for r in results])
-    analytical_arr = np.array([r["analytical_density"] for r in results])
-    register_ratio_arr = np.array([r["register_ratio"] for r in results])
-    ttr_arr = np.array([r["ttr"] for r in results])
+    s5_arr = results["s5"]
+    composite_arr = results["composite"]
+    metaphor_arr = results["metaphor_density"]
+    analytical_arr = results["analytical_density"]
+    register_ratio_arr = results["register_ratio"]
+    ttr_arr = results["ttr"]
+
+    # Every column is ranked once; all correlations below reuse the ranks
+    significance = SignificanceEngine({
+        "s5": s5_arr,
+        "composite": composite_arr,
+        "metaphor_density": metaphor_arr,
+        "analytical_density": analytical_arr,
+        "register_ratio": register_ratio_arr,
+        "ttr": ttr_arr,
+    }, n_resamples=args.resamples, seed=args.seed, workers=args.workers)
 
     print("\n" + "=" * 70)
     print("1. OVERALL CORRELATIONS (S5 vs Register)")
     print("=" * 70)
-
-    for name, arr in [
-        ("Composite register", composite_arr),
-        ("Metaphor density", metaphor_arr),
-        ("Analytical density", analytical_arr),
-        ("Register ratio (M/(M+A))", register_ratio_arr),
-        ("Type-token ratio", ttr_arr),
+    if args.resamples > 0:
+        print(f"\n  ({args.resamples} bootstrap/permutation resamples, seed {args.seed})")
+
+    overall = significance.correlate("s5", [
+        "composite", "metaphor_density", "analytical_density", "register_ratio", "ttr"])
+    for name, key in [
+        ("Composite register", "composite"),
+        ("Metaphor density", "metaphor_density"),
+        ("Analytical density", "analytical_density"),
+        ("Register ratio (M/(M+A))", "register_ratio"),
+        ("Type-token ratio", "ttr"),
     ]:
-        r_pearson, p_pearson = stats.pearsonr(s5_arr, arr)
-        r_spearman, p_spearman = stats.spearmanr(s5_arr, arr)
+        c = overall[key]
         print(f"\n  {name}:")
-        print(f"    Pearson  r = {r_pearson:+.4f}  (p = {p_pearson:.2e})")
-        print(f"    Spearman ρ = {r_spearman:+.4f}  (p = {p_spearman:.2e})")
+        print(f"    Pearson  r = {c['pearson_r']:+.4f}  (p = {c['pearson_p']:.2e})")
+        print(f"    Spearman ρ = {c['spearman_rho']:+.4f}  (p = {c['spearman_p']:.2e})")
+        print_resampled(c)
+    clock.mark("statistics.correlations", items=len(overall))
 
     # ─── S5 quintile analysis ──────────────────────────────────────────────
     print("\n" + "=" * 70)
@@ -296,13 +538,14 @@ def main():
                   f"{analytical_arr[mask].mean():>12.4f} "
                   f"{register_ratio_arr[mask].mean():>8.4f} "
                   f"{composite_arr[mask].mean():>10.4f}")
+    clock.mark("statistics.quintiles", items=5)
 
     # ─── Bridge region analysis ────────────────────────────────────────────
     print("\n" + "=" * 70)
     print("3. BRIDGE REGION ANALYSIS (PC1 percentile 30-55%)")
     print("=" * 70)
 
-    pc1_pct_arr = np.array([r["pc1_pct"] for r in results])
+    pc1_pct_arr = results["pc1_pct"]
     bridge_mask = (pc1_pct_arr >= 30) & (pc1_pct_arr <= 55)
     non_bridge_mask = ~bridge_mask
 
@@ -312,16 +555,21 @@ def main():
     print(f"  Non-bridge proteins: {n_nonbridge}")
 
     if n_bridge > 10:
-        for name, arr in [
-            ("Composite register", composite_arr),
-            ("Metaphor density", metaphor_arr),
-            ("Register ratio", register_ratio_arr),
-        ]:
-            r_bridge, p_bridge = stats.pearsonr(s5_arr[bridge_mask], arr[bridge_mask])
-            r_nonbridge, p_nonbridge = stats.pearsonr(s5_arr[non_bridge_mask], arr[non_bridge_mask])
+        bridge_keys = ["composite", "metaphor_density", "register_ratio"]
+        # Only Pearson is reported here, so skip the Spearman resampling
+        bridge = significance.subset(bridge_mask).correlate("s5", bridge_keys, spearman=False)
+        non_bridge = significance.subset(non_bridge_mask).correlate("s5", bridge_keys,
+                                                                    spearman=False)
+        for name, key in zip(["Composite register", "Metaphor density", "Register ratio"],
+                             bridge_keys):
+            b, nb = bridge[key], non_bridge[key]
             print(f"\n  {name}:")
-            print(f"    Bridge:     Pearson r = {r_bridge:+.4f}  (p = {p_bridge:.2e})")
-            print(f"    Non-bridge: Pearson r = {r_nonbridge:+.4f}  (p = {p_nonbridge:.2e})")
+            print(f"    Bridge:     Pearson r = {b['pearson_r']:+.4f}  (p = {b['pearson_p']:.2e})")
+            print_resampled(b, indent=6)
+            print(f"    Non-bridge: Pearson r = {nb['pearson_r']:+.4f}  (p = {nb['pearson_p']:.2e})")
+            print_resampled(nb, indent=6)
+
+    clock.mark("statistics.bridge", items=n_bridge)
 
     # ─── Quadrant Examples ─────────────────────────────────────────────────
     print("\n" + "=" * 70)
@@ -331,61 +579,59 @@ def main():
     s5_median = np.median(s5_arr)
     comp_median = np.median(composite_arr)
 
+    hi_s5 = s5_arr >= s5_median
+    hi_reg = composite_arr >= comp_median
     quadrants = {
-        "High S5 / High Register (poetic boundary)": [],
-        "High S5 / Low Register (analytical boundary)": [],
-        "Low S5 / High Register (poetic cluster)": [],
-        "Low S5 / Low Register (analytical cluster)": [],
+        "High S5 / High Register (poetic boundary)": np.flatnonzero(hi_s5 & hi_reg),
+        "High S5 / Low Register (analytical boundary)": np.flatnonzero(hi_s5 & ~hi_reg),
+        "Low S5 / High Register (poetic cluster)": np.flatnonzero(~hi_s5 & hi_reg),
+        "Low S5 / Low Register (analytical cluster)": np.flatnonzero(~hi_s5 & ~hi_reg),
     }
 
-    for r in results:
-        hi_s5 = r["s5"] >= s5_median
-        hi_reg = r["composite"] >= comp_median
-        if hi_s5 and hi_reg:
-            quadrants["High S5 / High Register (poetic boundary)"].append(r)
-        elif hi_s5 and not hi_reg:
-            quadrants["High S5 / Low Register (analytical boundary)"].append(r)
-        elif not hi_s5 and hi_reg:
-            quadrants["Low S5 / High Register (poetic cluster)"].append(r)
-        else:
-            quadrants["Low S5 / Low Register (analytical cluster)"].append(r)
+    # Quadrant codes in the order above, for the export
+    results.add_column("quadrant", (2 * ~hi_s5 + ~hi_reg).astype(np.int8))
 
-    for qname, qlist in quadrants.items():
-        print(f"\n  {qname} (n={len(qlist)}):")
+    for qname, qrows in quadrants.items():
+        print(f"\n  {qname} (n={len(qrows)}):")
         # Sort by most extreme: high S5 quadrants by S5 desc, low by S5 asc
-        if "High S5" in qname:
-            qlist.sort(key=lambda x: x["s5"], reverse=True)
-        else:
-            qlist.sort(key=lambda x: x["s5"])
-        for r in qlist[:3]:
+        qrows = results.order("s5", qrows, reverse="High S5" in qname)
+        for r in results.rows(qrows[:3]):
             print(f"    S5={r['s5']:.3f} Comp={r['composite']:.3f} | {r['title']}")
+    clock.mark("quadrant_topk.quadrants", items=len(results))
 
     # ─── Top 10 Lists ─────────────────────────────────────────────────────
     print("\n" + "=" * 70)
     print("5. TOP 10 MOST 'POETIC' HIGH-S5 PROTEINS")
     print("=" * 70)
 
-    hi_s5_proteins = [r for r in results if r["s5"] >= np.percentile(s5_arr, 75)]
-    hi_s5_proteins.sort(key=lambda x: x["composite"], reverse=True)
-    for i, r in enumerate(hi_s5_proteins[:10], 1):
+    s5_p75, s5_p25 = np.percentile(s5_arr, 75), np.percentile(s5_arr, 25)
+    hi_s5_proteins = results.order("composite", np.flatnonzero(s5_arr >= s5_p75), reverse=True)
+    for i, r in enumerate(results.rows(hi_s5_proteins[:10]), 1):
         print(f"  {i:2}. S5={r['s5']:.3f} Comp={r['composite']:.3f} M={r['metaphor_hits']:2d} A={r['analytical_hits']:2d} | {r['title']}")
 
     print("\n" + "=" * 70)
     print("6. TOP 10 MOST 'ANALYTICAL' LOW-S5 PROTEINS")
     print("=" * 70)
 
-    lo_s5_proteins = [r for r in results if r["s5"] <= np.percentile(s5_arr, 25)]
-    lo_s5_proteins.sort(key=lambda x: x["composite"])
-    for i, r in enumerate(lo_s5_proteins[:10], 1):
+    lo_s5_proteins = results.order("composite", np.flatnonzero(s5_arr <= s5_p25))
+    for i, r in enumerate(results.rows(lo_s5_proteins[:10]), 1):
         print(f"  {i:2}. S5={r['s5']:.3f} Comp={r['composite']:.3f} M={r['metaphor_hits']:2d} A={r['analytical_hits']:2d} | {r['title']}")
+    clock.mark("quadrant_topk.top10", items=len(hi_s5_proteins) + len(lo_s5_proteins))
 
     # ─── P-Series Analysis ─────────────────────────────────────────────────
     print("\n" + "=" * 70)
     print("7. P-SERIES REGISTER OSCILLATION")
     print("=" * 70)
 
+    # Several proteins can share a P-number: ties go by title, then id
+    p_rows = np.flatnonzero(results["p_number"] >= 0)
+    p_series_rows = p_rows[np.lexsort((
+        np.array([results.ids[i] for i in p_rows.tolist()], dtype=str),
+        np.array([results.titles[i] for i in p_rows.tolist()], dtype=str),
+        results["p_number"][p_rows],
+    ))]
+    p_series_results = results.rows(p_series_rows)
     if p_series_results:
-        p_series_results.sort(key=lambda x: x["p_number"])
         print(f"\n  Found {len(p_series_results)} P-series proteins")
         print(f"\n  {'P-Number':>8} {'S5':>6} {'Composite':>10} {'Metaphor':>9} {'Analytical':>11} {'Title'}")
         print(f"  {'-'*8} {'-'*6} {'-'*10} {'-'*9} {'-'*11} {'-'*40}")
@@ -395,25 +641,22 @@ def main():
                   f"{r['title'][:40]}")
 
         if len(p_series_results) >= 5:
-            p_s5 = np.array([r["s5"] for r in p_series_results])
-            p_comp = np.array([r["composite"] for r in p_series_results])
-            r_p, p_p = stats.pearsonr(p_s5, p_comp)
-            rho_p, prho_p = stats.spearmanr(p_s5, p_comp)
+            p_s5 = s5_arr[p_series_rows]
+            p_comp = composite_arr[p_series_rows]
+            p_corr = SignificanceEngine(
+                {"s5": p_s5, "composite": p_comp}, n_resamples=args.resamples, seed=args.seed,
+            ).correlate("s5", ["composite"])["composite"]
             print(f"\n  P-series S5 vs Composite:")
-            print(f"    Pearson  r = {r_p:+.4f}  (p = {p_p:.2e})")
-            print(f"    Spearman ρ = {rho_p:+.4f}  (p = {prho_p:.2e})")
+            print(f"    Pearson  r = {p_corr['pearson_r']:+.4f}  (p = {p_corr['pearson_p']:.2e})")
+            print(f"    Spearman ρ = {p_corr['spearman_rho']:+.4f}  (p = {p_corr['spearman_p']:.2e})")
+            print_resampled(p_corr)
 
             # Check for co-oscillation: do peaks/troughs coincide?
             if len(p_series_results) >= 3:
-                p_nums = [r["p_number"] for r in p_series_results]
+                p_nums = results["p_number"][p_series_rows]
                 # Compute if S5 and composite local maxima coincide
-                s5_peaks = []
-                comp_peaks = []
-                for i in range(1, len(p_s5) - 1):
-                    if p_s5[i] > p_s5[i-1] and p_s5[i] > p_s5[i+1]:
-                        s5_peaks.append(p_nums[i])
-                    if p_comp[i] > p_comp[i-1] and p_comp[i] > p_comp[i+1]:
-                        comp_peaks.append(p_nums[i])
+                s5_peaks = p_nums[local_peaks(p_s5)].tolist()
+                comp_peaks = p_nums[local_peaks(p_comp)].tolist()
                 print(f"\n  S5 local peaks at: {s5_peaks}")
                 print(f"  Register local peaks at: {comp_peaks}")
                 overlap = set(s5_peaks) & set(comp_peaks)
@@ -422,6 +665,8 @@ def main():
         print("\n  No P-series proteins found with tag-based detection.")
         print("  Trying title-based detection...")
 
+    clock.mark("quadrant_topk.p_series", items=len(p_series_results))
+
     # ─── Summary Statistics ────────────────────────────────────────────────
     print("\n" + "=" * 70)
     print("8. SUMMARY STATISTICS")
@@ -437,8 +682,8 @@ def main():
     print(f"  Composite median (quadrant split): {comp_median:.3f}")
 
     # Effect size: Cohen's d between top and bottom S5 quartile
-    top_q = composite_arr[s5_arr >= np.percentile(s5_arr, 75)]
-    bot_q = composite_arr[s5_arr <= np.percentile(s5_arr, 25)]
+    top_q = composite_arr[s5_arr >= s5_p75]
+    bot_q = composite_arr[s5_arr <= s5_p25]
     pooled_std = np.sqrt((top_q.std()**2 + bot_q.std()**2) / 2)
     cohens_d = (top_q.mean() - bot_q.mean()) / pooled_std if pooled_std > 0 else 0
     print(f"\n  Cohen's d (top vs bottom S5 quartile on composite): {cohens_d:+.4f}")
@@ -452,7 +697,7 @@ def main():
     # ─── Save full results as JSON for the report ──────────────────────────
     output = {
         "n_proteins": len(results),
-        "n_matched": len(matched_ids),
+        "n_matched": run_meta["n_matched"],
         "s5_stats": {
             "min": round(float(s5_arr.min()), 4),
             "max": round(float(s5_arr.max()), 4),
@@ -463,28 +708,58 @@ def main():
         "quadrant_counts": {k: len(v) for k, v in quadrants.items()},
         "cohens_d": round(cohens_d, 4),
     }
+    if run_meta.get("dedup_threshold") is not None:
+        output["dedup_threshold"] = run_meta["dedup_threshold"]
 
-    for name, arr in [
-        ("composite", composite_arr),
-        ("metaphor_density", metaphor_arr),
-        ("analytical_density", analytical_arr),
-        ("register_ratio", register_ratio_arr),
-        ("ttr", ttr_arr),
-    ]:
-        rp, pp = stats.pearsonr(s5_arr, arr)
-        rs, ps = stats.spearmanr(s5_arr, arr)
+    for name, c in overall.items():
         output["correlations"][name] = {
-            "pearson_r": round(float(rp), 4),
-            "pearson_p": float(pp),
-            "spearman_rho": round(float(rs), 4),
-            "spearman_p": float(ps),
+            "pearson_r": round(c["pearson_r"], 4),
+            "pearson_p": c["pearson_p"],
+            "spearman_rho": round(c["spearman_rho"], 4),
+            "spearman_p": c["spearman_p"],
         }
-
-    with open("/home/user/eidolon-proteins/scripts/register_shimmer_results.json", "w") as f:
+        if "pearson_ci" in c:
+            output["correlations"][name].update({
+                "pearson_ci": [round(v, 4) for v in c["pearson_ci"]],
+                "pearson_perm_p": c["pearson_perm_p"],
+                "spearman_ci": [round(v, 4) for v in c["spearman_ci"]],
+                "spearman_perm_p": c["spearman_perm_p"],
+            })
+    if args.resamples > 0:
+        output["significance"] = {
+            "resamples": args.resamples,
+            "seed": args.seed,
+            "confidence": significance.confidence,
+        }
+    significance.close()
+    clock.mark("statistics.summary", items=len(results))
+
+    # ─── Temporal Drift ────────────────────────────────────────────────────
+    if args.temporal:
+        tracker = open_tracker(args.temporal_state, int(args.bin_days * 86400),
+                               run_meta["lexicon_version"], rebuild=args.rebuild_temporal)
+        before = len(tracker)
+        added = tracker.update(results.ids, results["created_ts"], s5_arr, composite_arr)
+        output["temporal"] = drift_report(tracker, args.window, args.max_lag)
+        if args.temporal_state:
+            tracker.save(args.temporal_state)
+            print(f"\n  Drift state: {before} proteins + {added} new, saved to {args.temporal_state}")
+        clock.mark("statistics.temporal", items=added)
+
+    with open(results_path, "w") as f:
         json.dump(output, f, indent=2)
 
-    print(f"\n\nResults saved to scripts/register_shimmer_results.json")
+    print(f"\n\nResults saved to {results_path}")
+    # A report regenerated from an export only writes a new one when asked to
+    if not args.no_export and (args.export or not args.from_export):
+        export_path = args.export or default_export_path(results_path)
+        write_export(export_path, results, categories={"quadrant": list(quadrants)},
+                     meta=run_meta)
+        print(f"Per-protein results ({len(results)} rows) exported to {export_path}")
     print("=" * 70)
+    clock.mark("output")
+    finish_instrumentation(clock, args)
+    return clock.timings
 
 
 if __name__ == "__main__":
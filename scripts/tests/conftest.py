@@ -0,0 +1,58 @@
+"""Test setup: make the eidolon package and the analysis scripts importable."""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+CORPUS_SIZE = 300
+CORPUS_SEED = 7
+
+
+@pytest.fixture(scope="session")
+def sample_corpus(tmp_path_factory):
+    """A small synthetic corpus, generated once per session (treat as read-only)."""
+    from eidolon.synthetic_corpus import generate_corpus
+
+    return generate_corpus(str(tmp_path_factory.mktemp("corpus")), CORPUS_SIZE, seed=CORPUS_SEED)
+
+
+@pytest.fixture
+def corpus(sample_corpus, tmp_path):
+    """
+    A private copy of the synthetic corpus: (proteins_dir, metrics_path).
+    Only the YAML and metrics are copied, never a snapshot or index that an
+    analysis run on the shared corpus left next to them.
+    """
+    proteins_dir, metrics_path = sample_corpus
+    out = tmp_path / "corpus"
+    shutil.copytree(proteins_dir, out / "proteins")
+    shutil.copy(metrics_path, out)
+    return str(out / "proteins"), str(out / os.path.basename(metrics_path))
+
+
+def run_analysis(proteins_dir, metrics_path, tmp_path, *argv):
+    """
+    Run register_shimmer_analysis.main() on a corpus with every cache and
+    output under tmp_path. Returns (stdout, results JSON dict).
+    """
+    import contextlib
+    import io
+    import json
+
+    import register_shimmer_analysis
+
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    output = tmp_path / "results.json"
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        register_shimmer_analysis.main([
+            "--proteins-dir", proteins_dir, "--metrics", metrics_path, "--output", str(output),
+            "--score-store-dir", str(tmp_path / "scores"), *argv])
+    with open(output) as f:
+        return out.getvalue(), json.load(f)
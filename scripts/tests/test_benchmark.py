@@ -0,0 +1,59 @@
+"""
+Tests for benchmark.py and eidolon.synthetic_corpus.
+
+generate_corpus() has to write byte-identical files for the same (n, seed)
+with any number of workers. A small benchmark run has to report every stage
+and a peak RSS in MB.
+"""
+
+import contextlib
+import io
+import json
+import os
+
+import benchmark
+from eidolon import synthetic_corpus
+from eidolon.synthetic_corpus import generate_corpus
+
+
+def _snapshot(out_dir):
+    """{relative path: bytes} for every file generate_corpus() wrote."""
+    files = {}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, out_dir)] = f.read()
+    return files
+
+
+def test_corpus_is_a_function_of_n_and_seed(tmp_path, monkeypatch):
+    monkeypatch.setattr(synthetic_corpus, "CHUNK_SIZE", 40)   # several chunks at n=150
+    generate_corpus(str(tmp_path / "serial"), 150, seed=3, workers=1)
+    generate_corpus(str(tmp_path / "pooled"), 150, seed=3, workers=2)
+    generate_corpus(str(tmp_path / "other"), 150, seed=4, workers=1)
+
+    serial = _snapshot(tmp_path / "serial")
+    assert len(serial) == 151
+    assert _snapshot(tmp_path / "pooled") == serial
+    assert _snapshot(tmp_path / "other") != serial
+
+    with open(tmp_path / "serial" / "spore-metrics.json") as f:
+        metrics = json.load(f)
+    assert 130 <= len(metrics) <= 150   # ~1% of proteins have no metrics
+
+
+def test_benchmark_reports_stages_and_rss(tmp_path):
+    out = tmp_path / "bench.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        benchmark.main(["--sizes", "80", "--resamples", "0", "--workdir", str(tmp_path / "work"),
+                        "--out", str(out)])
+    with open(out) as f:
+        report = json.load(f)
+    result = report["results"][0]
+    assert result["n"] == 80 and 0 < result["n_proteins"] <= 80
+    for run in ("cold", "warm"):
+        assert set(benchmark.STAGES) <= set(result[run]["stages"])
+        # MB, not KiB or bytes: a Python + NumPy + SciPy process is tens to hundreds of MB
+        assert 10 < result[run]["peak_rss_mb"] < 4096
+    assert not os.path.exists(tmp_path / "work" / "corpus-80-seed0")
@@ -0,0 +1,54 @@
+"""
+Import-time budget for the scoring library.
+
+Each module is imported RUNS times in a fresh interpreter, and the best time
+is compared with its budget in BUDGETS_MS. NumPy, SciPy and YAML must not
+be loaded by the import.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+
+# Milliseconds; measured ~11 ms and ~24 ms on the development machine, leaving room
+# for slow CI machines while still catching an accidental NumPy/SciPy import.
+BUDGETS_MS = {
+    "eidolon.register_scoring": 50,
+    "register_shimmer_analysis": 60,
+}
+HEAVY_MODULES = ("numpy", "scipy", "yaml")
+RUNS = 5
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, runs=RUNS):
+    """Best-of-runs import time (ms) and any heavy modules it loaded."""
+    best, heavy = float("inf"), []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout)
+        best = min(best, result["ms"])
+        heavy = result["heavy"]
+    return best, heavy
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_budget(module):
+    ms, heavy = measure(module)
+    assert not heavy, f"importing {module} loads {', '.join(heavy)}"
+    assert ms <= BUDGETS_MS[module], (
+        f"importing {module} took {ms:.1f} ms (budget {BUDGETS_MS[module]} ms)")
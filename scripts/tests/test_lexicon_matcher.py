@@ -0,0 +1,65 @@
+"""
+Tests for LexiconMatcher.
+
+Single-word lexicons are checked against per-token set lookups on the
+sample corpus. Hand-made token streams check phrase counting. Other
+tests cover the pickle cache and check that library calls write no cache.
+"""
+
+import os
+
+from eidolon.lexicon_matcher import (
+    DEFAULT_CACHE_DIR, LexiconMatcher, lexicon_digest, load_matcher, normalize_entry,
+)
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import (
+    ANALYTICAL_TERMS, METAPHOR_TERMS, default_matcher, extract_text, tokenize,
+)
+
+
+def _old_counts(tokens):
+    """The pre-matcher rule: one hit per token found in the term set."""
+    return {"metaphor": sum(1 for t in tokens if t in METAPHOR_TERMS),
+            "analytical": sum(1 for t in tokens if t in ANALYTICAL_TERMS)}
+
+
+def _phrase_occurrences(tokens, seq):
+    n = len(seq)
+    return sum(1 for i in range(len(tokens) - n + 1) if tuple(tokens[i:i + n]) == seq)
+
+
+def test_single_words_match_set_lookup(sample_corpus):
+    matcher = default_matcher()
+    texts = [extract_text(p) for p in load_proteins_direct(sample_corpus[0]).values()]
+    for text in texts:
+        tokens = tokenize(text)
+        if "as" in tokens and "if" in tokens:
+            continue   # the one built-in phrase; covered below
+        assert matcher.count(tokens) == _old_counts(tokens)
+
+
+def test_phrases_count_every_occurrence():
+    lexicons = {"a": {"as if", "river", "deep river bend"}, "b": {"river bend", "bend"}}
+    matcher = LexiconMatcher(lexicons)
+    tokens = tokenize("As if a deep river bend, as if the river bend bends; river bend.")
+    expected = {name: sum(_phrase_occurrences(tokens, normalize_entry(e)) for e in entries)
+                for name, entries in lexicons.items()}
+    assert matcher.count(tokens) == expected
+
+
+def test_cache_round_trip(tmp_path):
+    lexicons = {"metaphor": METAPHOR_TERMS, "analytical": ANALYTICAL_TERMS, "x": {"self-aware"}}
+    built = load_matcher(lexicons, cache_dir=str(tmp_path))
+    cached = load_matcher(lexicons, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    assert cached.digest == built.digest == lexicon_digest(lexicons)
+    tokens = tokenize("The self-aware river is like a system, a self aware stream.")
+    assert cached.count(tokens) == built.count(tokens)
+    assert cached.count(tokens)["x"] == 2
+
+
+def test_library_calls_write_no_cache():
+    lexicons = {"x": {"written-by-nobody"}}
+    matcher = load_matcher(lexicons)
+    assert matcher.digest == lexicon_digest(lexicons)
+    assert not os.path.exists(os.path.join(DEFAULT_CACHE_DIR, f"lexicons-{matcher.digest}.pkl"))
@@ -0,0 +1,55 @@
+"""
+Tests for the spore-metrics column store.
+
+Records read through SporeMetrics are compared field by field with
+json.load() of the same file, and again after the JSON is rewritten.
+"""
+
+import json
+import os
+
+from eidolon.metrics_store import SporeMetrics, default_store_path, open_metrics
+
+
+def _overlong_id(metrics):
+    """An id whose first id-width bytes equal a real id (must not match it)."""
+    return next(iter(metrics)) + "-suffix"
+
+
+def test_store_matches_json(corpus):
+    _, metrics_path = corpus
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+
+    store = open_metrics(metrics_path)
+    assert os.path.isdir(default_store_path(metrics_path))
+    assert store.to_dict() == metrics
+    assert SporeMetrics.from_json(metrics_path).to_dict() == metrics
+
+    ids = list(metrics)[::7] + ["missing", _overlong_id(metrics)]
+    rows = store.lookup(ids)
+    assert (rows[-2:] == -1).all()
+    for pid, row in zip(ids[:-2], rows[:-2].tolist()):
+        assert store.ids[row].decode() == pid
+        assert store.get(pid) == metrics[pid]
+        assert store.column("s5", [row])[0] == metrics[pid]["s5"]
+        assert store.tier([row]) == [metrics[pid]["tier"]]
+    assert store.get("missing") is None
+
+
+def test_store_follows_json_edits(corpus):
+    _, metrics_path = corpus
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+    open_metrics(metrics_path)
+
+    pid = sorted(metrics)[0]
+    metrics[pid]["s5"] = 0.123
+    metrics[pid]["tags_sem"] = ["#edited"]
+    metrics["added-protein"] = {"s5": 0.5, "coh": 0.9, "energy": 0.4, "tier": "core",
+                                "pc1": 0.0, "tags_sem": []}
+    with open(metrics_path, "w") as f:
+        json.dump(metrics, f, indent=1)
+
+    assert open_metrics(metrics_path).to_dict() == metrics
+    assert open_metrics(metrics_path, use_store=False).to_dict() == metrics
@@ -0,0 +1,107 @@
+"""
+Tests for MinHash signatures and LSH clustering.
+
+Signatures are compared with a min over crc32 token shingles in plain
+Python. Clusters are compared with the connected components of an all-pairs
+Jaccard scan, on synthetic proteins plus near-copies of some of them.
+"""
+
+import copy
+import zlib
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from eidolon.near_duplicates import (
+    DEFAULT_THRESHOLD, NUM_PERM, SHINGLE, _PRIME, _permutations, dedup_view, estimated_jaccard,
+    find_duplicates, minhash_signatures,
+)
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import extract_text, tokenize
+
+
+def _shingles(text):
+    """Shingle hashes as near_duplicates computes them, one integer at a time."""
+    ids = [zlib.crc32(t.encode()) for t in tokenize(text)]
+    if not ids:
+        return set()
+    ids += [0] * (SHINGLE - len(ids))
+    out = set()
+    for start in range(len(ids) - SHINGLE + 1):
+        h = 0
+        for x in ids[start:start + SHINGLE]:
+            h = (h * 1000003 + x % _PRIME) % _PRIME
+        out.add(h)
+    return out
+
+
+@pytest.fixture(scope="module")
+def proteins(sample_corpus):
+    """80 synthetic proteins plus re-synthesized near-copies of 12 of them (and one of a copy)."""
+    base = list(load_proteins_direct(sample_corpus[0]).values())[:80]
+    out = {p["id"]: p for p in base}
+    for k, p in enumerate(base[:12]):
+        twin = copy.deepcopy(p)
+        twin["id"] = f"copy-{k}"
+        twin["summary"] = twin["summary"].replace(" ", " very ", 1)
+        out[twin["id"]] = twin
+    triple = copy.deepcopy(out["copy-0"])
+    triple["id"] = "copy-of-copy"
+    triple["insights"] = triple["insights"][:-1]
+    out[triple["id"]] = triple
+    return out
+
+
+def test_signatures_match_python_minhash():
+    texts = ["", "two words", "A river of data flows through the system like a shimmer.",
+             "the the the the the"]
+    a, b = _permutations(NUM_PERM, 1)
+    sigs = minhash_signatures(texts)
+    for text, sig in zip(texts, sigs):
+        shingles = _shingles(text)
+        expected = [min((int(ai) * x + int(bi)) % _PRIME for x in shingles) if shingles else _PRIME
+                    for ai, bi in zip(a.tolist(), b.tolist())]
+        assert sig.tolist() == expected
+
+
+def test_clusters_match_brute_force(proteins, tmp_path):
+    clusters, stats = find_duplicates(proteins, cache_dir=str(tmp_path))
+    ids = list(proteins)
+    sigs = minhash_signatures([extract_text(proteins[pid]) for pid in ids])
+
+    all_pairs = np.array(list(combinations(range(len(ids)), 2)))
+    similar = all_pairs[estimated_jaccard(sigs, all_pairs) >= DEFAULT_THRESHOLD]
+    # Connected components, each kept as its first member in corpus order
+    root = list(range(len(ids)))
+    for i, j in similar.tolist():
+        ri, rj = root[i], root[j]
+        root = [min(ri, rj) if r in (ri, rj) else r for r in root]
+    expected = {}
+    for i, r in enumerate(root):
+        if r != i:
+            expected.setdefault(ids[r], []).append(ids[i])
+    assert {c["keep"]: c["drop"] for c in clusters} == expected
+    assert expected[ids[0]] == ["copy-0", "copy-of-copy"]
+    assert stats["dropped"] == 13
+
+    for cluster in clusters:   # the estimate tracks the exact shingle Jaccard
+        keep = _shingles(extract_text(proteins[cluster["keep"]]))
+        for pid, sim in zip(cluster["drop"], cluster["similarity"]):
+            other = _shingles(extract_text(proteins[pid]))
+            assert abs(sim - len(keep & other) / len(keep | other)) < 0.2
+
+    view = dedup_view(proteins, clusters)
+    assert list(view) == [pid for pid in ids if not pid.startswith("copy")]
+
+
+def test_signature_cache(proteins, tmp_path):
+    clusters, stats = find_duplicates(proteins, cache_dir=str(tmp_path))
+    assert stats["hashed"] == len(proteins)
+    again, stats = find_duplicates(proteins, cache_dir=str(tmp_path))
+    assert stats["hashed"] == 0 and again == clusters
+
+    edited = dict(proteins)
+    edited["copy-3"] = dict(edited["copy-3"], summary="Something else entirely, about gardens.")
+    _, stats = find_duplicates(edited, cache_dir=str(tmp_path))
+    assert stats["hashed"] == 1
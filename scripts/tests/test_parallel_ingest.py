@@ -0,0 +1,46 @@
+"""
+ingest_corpora() over two directories, checked against serial parsing.
+
+Runs with one and two workers, with and without the snapshot, and compares
+each with scoring every file one at a time.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from eidolon.parallel_ingest import check_against_serial, ingest_corpora
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import compute_register_scores, extract_text
+
+
+@pytest.fixture
+def two_dirs(corpus, tmp_path):
+    """Split the corpus in two directories, with one protein in both."""
+    proteins_dir, _ = corpus
+    second = tmp_path / "second" / "proteins"
+    second.mkdir(parents=True)
+    names = sorted(os.listdir(proteins_dir))
+    for name in names[len(names) // 2:]:
+        shutil.move(os.path.join(proteins_dir, name), second / name)
+    shutil.copy(second / names[-1], os.path.join(proteins_dir, names[-1]))
+    return [proteins_dir, str(second)]
+
+
+@pytest.mark.parametrize("workers,use_snapshot", [(1, True), (2, True), (2, False)])
+def test_matches_serial(two_dirs, tmp_path, workers, use_snapshot):
+    proteins, scores, stats = ingest_corpora(
+        two_dirs, workers=workers, chunk_size=16, use_snapshot=use_snapshot,
+        score_store_dir=str(tmp_path / "scores"))
+
+    serial = {}
+    for d in two_dirs:
+        serial.update(load_proteins_direct(d))
+    assert proteins == serial
+    assert list(proteins) == list(serial)
+    assert scores == {pid: compute_register_scores(extract_text(p)) for pid, p in serial.items()}
+    assert stats["workers"] == workers
+
+    ok, _ = check_against_serial(two_dirs, proteins, scores)
+    assert ok
@@ -0,0 +1,108 @@
+"""
+Tests for ProteinIndex and the --query option.
+
+Each query in QUERIES runs against the index and against a Python predicate
+over the parsed records. Other tests cover saving and loading, rebuilding
+after edits and malformed queries. A --query run must analyse the same
+proteins as the matching --tag run, and must exit cleanly when nothing
+matches.
+"""
+
+import os
+
+import pytest
+
+from conftest import run_analysis
+from eidolon.protein_index import ProteinIndex, open_index
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import compute_register_scores, default_matcher, extract_text
+
+# (query, predicate over (record, scores)) pairs
+QUERIES = [
+    ("#ai", lambda p, s: "#ai" in p["tags"]),
+    ("#ai AND tier:core", lambda p, s: "#ai" in p["tags"] and p["tier"] == "core"),
+    ("#ai tier:core", lambda p, s: "#ai" in p["tags"] and p["tier"] == "core"),
+    ("tag:#embed:* AND NOT source:synthesis",
+     lambda p, s: any(t.startswith("#embed:") for t in p["tags"]) and p["source"] != "synthesis"),
+    ("month:2025-08..2025-12 (lexicon:metaphor OR #mesh)",
+     lambda p, s: "2025-08" <= str(p["created_at"])[:7] <= "2025-12"
+     and ((s is not None and s["metaphor_hits"] > 0) or "#mesh" in p["tags"])),
+    ("NOT (#ai OR #mesh) AND lexicon:analytical",
+     lambda p, s: not ({"#ai", "#mesh"} & set(p["tags"]))
+     and s is not None and s["analytical_hits"] > 0),
+    ("tier:core OR tier:convergence OR #nope", lambda p, s: p["tier"] in ("core", "convergence")),
+    ("NOT NOT #cognition", lambda p, s: "#cognition" in p["tags"]),
+    ("", lambda p, s: True),
+]
+
+
+@pytest.fixture(scope="module")
+def indexed(sample_corpus):
+    proteins = load_proteins_direct(sample_corpus[0])
+    scores = {pid: compute_register_scores(extract_text(p)) for pid, p in proteins.items()}
+    return proteins, scores, ProteinIndex.build(proteins, scores)
+
+
+@pytest.mark.parametrize("expr,predicate", QUERIES, ids=[q for q, _ in QUERIES])
+def test_query_matches_set_logic(indexed, tmp_path, expr, predicate):
+    proteins, scores, index = indexed
+    expected = [pid for pid, p in proteins.items() if predicate(p, scores[pid])]
+    assert [index.ids[i] for i in index.query(expr).nonzero()[0]] == expected
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = ProteinIndex.load(path)
+    assert (loaded.query(expr) == index.query(expr)).all()
+
+
+def test_round_trip_keeps_columns(indexed, tmp_path):
+    _, _, index = indexed
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = ProteinIndex.load(path)
+    assert loaded.ids == index.ids and loaded.titles == index.titles
+    assert (loaded.p_numbers == index.p_numbers).all()
+    assert (loaded.created_ts == index.created_ts).all()
+    assert loaded.keys() == index.keys()
+    for name, col in index.scores.items():
+        assert (loaded.scores[name] == col).all()
+
+
+@pytest.mark.parametrize("expr", ["(#ai", "#ai)", "#ai AND", "OR #ai", "colour:red"])
+def test_bad_queries_raise(indexed, expr):
+    with pytest.raises(ValueError):
+        indexed[2].query(expr)
+
+
+def test_open_index_rebuilds_on_change(corpus, tmp_path):
+    proteins_dir, _ = corpus
+    path = str(tmp_path / "index.npz")
+    kwargs = {"path": path, "score_store_dir": str(tmp_path / "scores")}
+    _, rebuilt = open_index([proteins_dir], default_matcher(), **kwargs)
+    assert rebuilt
+    _, rebuilt = open_index([proteins_dir], default_matcher(), **kwargs)
+    assert not rebuilt
+    os.remove(os.path.join(proteins_dir, sorted(os.listdir(proteins_dir))[0]))
+    index, rebuilt = open_index([proteins_dir], default_matcher(), **kwargs)
+    assert rebuilt and len(index) == len(load_proteins_direct(proteins_dir))
+
+
+def test_query_run_matches_tag_run(sample_corpus, tmp_path):
+    proteins_dir, metrics_path = sample_corpus
+    _, tagged = run_analysis(proteins_dir, metrics_path, tmp_path / "tag",
+                             "--no-export", "--resamples", "0", "--tag", "#ai")
+    _, queried = run_analysis(proteins_dir, metrics_path, tmp_path / "query",
+                              "--resamples", "0", "--query", "#ai",
+                              "--index", str(tmp_path / "index.npz"))
+    queried.pop("query", None)
+    assert queried == tagged
+
+
+def test_empty_query_exits_cleanly(sample_corpus, tmp_path):
+    proteins_dir, metrics_path = sample_corpus
+    text, output = run_analysis(proteins_dir, metrics_path, tmp_path, "--query", "tier:nope",
+                                "--index", str(tmp_path / "index.npz"))
+    assert "No proteins match the query; nothing to analyse" in text
+    assert output == {"n_proteins": 0, "n_matched": 0, "reason": "no proteins match the query",
+                      "query": "tier:nope"}
+    assert not (tmp_path / "results.table").exists()
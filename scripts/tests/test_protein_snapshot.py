@@ -0,0 +1,64 @@
+"""
+Tests for the corpus snapshot in protein_snapshot.
+
+A cold load and a warm load must both equal reading every YAML file. The
+snapshot must notice files being edited, added and removed, and a corrupt
+snapshot must be rebuilt.
+"""
+
+import os
+
+import yaml
+
+from eidolon.protein_snapshot import default_snapshot_path, load_proteins, load_proteins_direct
+
+
+def test_cold_and_warm_match_direct(corpus):
+    proteins_dir, _ = corpus
+    direct = load_proteins_direct(proteins_dir)
+
+    cold, stats = load_proteins(proteins_dir)
+    assert cold == direct
+    assert stats == {"reused": 0, "parsed": len(direct), "removed": 0}
+    assert os.path.exists(default_snapshot_path(proteins_dir))
+
+    warm, stats = load_proteins(proteins_dir)
+    assert warm == direct
+    assert stats == {"reused": len(direct), "parsed": 0, "removed": 0}
+
+
+def test_invalidation_follows_the_directory(corpus):
+    proteins_dir, _ = corpus
+    load_proteins(proteins_dir)
+    names = sorted(f for f in os.listdir(proteins_dir) if f.endswith(".yaml"))
+
+    # Edit one file (size changes), remove one, add one
+    edited = os.path.join(proteins_dir, names[0])
+    with open(edited) as f:
+        data = yaml.safe_load(f)
+    data["title"] = "Edited " + data["title"]
+    with open(edited, "w") as f:
+        yaml.safe_dump(data, f)
+    os.remove(os.path.join(proteins_dir, names[1]))
+    with open(os.path.join(proteins_dir, "zz_new.yaml"), "w") as f:
+        f.write("id: new-protein\ntitle: New\ntags:\n  - '#fresh'\n")
+
+    proteins, stats = load_proteins(proteins_dir)
+    assert proteins == load_proteins_direct(proteins_dir)
+    assert stats == {"reused": len(names) - 2, "parsed": 2, "removed": 1}
+    assert proteins["new-protein"]["tags"] == ["#fresh"]
+    assert any(p["title"].startswith("Edited ") for p in proteins.values())
+
+
+def test_rebuild_and_corrupt_snapshot(corpus):
+    proteins_dir, _ = corpus
+    direct = load_proteins_direct(proteins_dir)
+    load_proteins(proteins_dir)
+
+    rebuilt, stats = load_proteins(proteins_dir, rebuild=True)
+    assert rebuilt == direct and stats["parsed"] == len(direct)
+
+    with open(default_snapshot_path(proteins_dir), "wb") as f:
+        f.write(b"not a pickle")
+    recovered, stats = load_proteins(proteins_dir)
+    assert recovered == direct and stats["parsed"] == len(direct)
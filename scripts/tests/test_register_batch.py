@@ -0,0 +1,61 @@
+"""
+score_texts() against compute_register_scores().
+
+Covers corpus texts and edge cases such as empty and punctuation-only text,
+with a tiny and the default batch size, and a phrase lexicon next to the
+defaults. round_like_python() is also checked against round() on halfway
+values.
+"""
+
+import numpy as np
+import pytest
+
+from eidolon.lexicon_matcher import load_matcher
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_batch import columns_to_rows, round_like_python, score_texts
+from eidolon.register_scoring import (
+    ABSTRACT_SUFFIXES, DEFAULT_LEXICONS, compute_register_scores, default_matcher, extract_text,
+)
+
+EDGE_TEXTS = [
+    "",
+    "too short to score",
+    "exactly five tokens are here",
+    "...!!! ??? ...",
+    "No sentence end at all but enough words to count as a text",
+    "Waves, waves; WAVES! The ocean-river flows as if it were a stream. As if.",
+    "Data data data. Matrix? Vector! Eigen-vector, the system's function.",
+    "Kindness, equality, nation, tension, movement, distance, presence: all abstract.",
+    "one. two. three. four. five. six.",
+    "Numbers 123 and under_scores don't split like 3.14 or e.g. this.",
+]
+
+
+def _check(texts, matcher, batch_size):
+    rows = columns_to_rows(score_texts(texts, matcher, ABSTRACT_SUFFIXES, batch_size=batch_size))
+    expected = [compute_register_scores(t, matcher) for t in texts]
+    for text, got, want in zip(texts, rows, expected):
+        assert got == want, text
+
+
+@pytest.mark.parametrize("batch_size", [3, 50_000])
+def test_matches_per_protein_scores(sample_corpus, batch_size):
+    proteins = load_proteins_direct(sample_corpus[0])
+    texts = EDGE_TEXTS + [extract_text(p) for p in proteins.values()]
+    _check(texts, default_matcher(), batch_size)
+
+
+def test_matches_with_phrases_and_extra_lexicon():
+    lexicons = dict(DEFAULT_LEXICONS, mood={"calm sea", "as if", "storm", "ocean river flows"})
+    _check(EDGE_TEXTS + ["A calm sea, a calm sea storm; ocean river flows as if."],
+           load_matcher(lexicons, cache_dir=None), 4)
+
+
+def test_round_like_python():
+    rng = np.random.default_rng(3)
+    halves = (np.arange(-2000, 2000) + 0.5) / 10 ** 4
+    values = np.concatenate([halves, rng.random(20000), rng.random(2000) * 100,
+                             [0.0, 2.675, 1.0005, 0.00005, 0.12345, -0.00015]])
+    for ndigits in (2, 4):
+        got = round_like_python(values, ndigits)
+        assert got.tolist() == [round(v, ndigits) for v in values.tolist()]
@@ -0,0 +1,74 @@
+"""
+The scoring API exported by eidolon and register_shimmer_analysis.
+
+_inline_scores() is a copy of the function the analysis script used to
+define inline. The library has to give the same scores on every corpus text,
+and every entry point has to export the same objects.
+"""
+
+import re
+
+import numpy as np
+
+import eidolon
+import register_shimmer_analysis
+from eidolon import register_scoring
+from eidolon.protein_snapshot import load_proteins_direct
+
+API = ("ABSTRACT_SUFFIXES", "ANALYTICAL_TERMS", "METAPHOR_TERMS", "compute_register_scores",
+       "extract_p_number", "extract_text", "tokenize")
+
+
+def _inline_scores(text):
+    """compute_register_scores() as register_shimmer_analysis.py defined it before the library."""
+    tokens = re.findall(r'[a-z]+', text.lower())
+    if len(tokens) < 5:
+        return None
+    n_tokens = len(tokens)
+    metaphor_hits = sum(1 for t in tokens if t in eidolon.METAPHOR_TERMS)
+    analytical_hits = sum(1 for t in tokens if t in eidolon.ANALYTICAL_TERMS)
+    metaphor_density = metaphor_hits / n_tokens
+    analytical_density = analytical_hits / n_tokens
+    total_register = metaphor_hits + analytical_hits
+    register_ratio = metaphor_hits / total_register if total_register > 0 else 0.5
+    ttr = len(set(tokens)) / n_tokens
+    sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+    if sentences:
+        mean_sent_len = np.mean([len(re.findall(r'[a-z]+', s.lower())) for s in sentences])
+    else:
+        mean_sent_len = n_tokens
+    abstract_count = sum(1 for t in tokens
+                         if t.endswith(('ness', 'ity', 'tion', 'sion', 'ment', 'ance', 'ence')))
+    abstract_density = abstract_count / n_tokens
+    composite = (0.50 * register_ratio + 0.25 * (metaphor_density * 10)
+                 + 0.15 * ttr + 0.10 * (abstract_density * 10))
+    return {
+        "metaphor_density": round(metaphor_density, 4),
+        "analytical_density": round(analytical_density, 4),
+        "register_ratio": round(register_ratio, 4),
+        "ttr": round(ttr, 4),
+        "mean_sent_len": round(mean_sent_len, 2),
+        "abstract_density": round(abstract_density, 4),
+        "composite": round(composite, 4),
+        "n_tokens": n_tokens,
+        "metaphor_hits": metaphor_hits,
+        "analytical_hits": analytical_hits,
+    }
+
+
+def test_entry_points_share_one_api():
+    for name in API:
+        assert getattr(eidolon, name) is getattr(register_scoring, name)
+        assert getattr(register_shimmer_analysis, name) is getattr(register_scoring, name)
+
+
+def test_scores_match_inline_definition(sample_corpus):
+    texts = [eidolon.extract_text(p) for p in load_proteins_direct(sample_corpus[0]).values()]
+    texts += ["", "one two three four", "Waves. Flow! Data? Matrix... kindness nation."]
+    compared = 0
+    for text in texts:
+        if re.search(r'\bas\W+if\b', text.lower()):
+            continue   # the phrase "as if" only counts since the compiled matcher
+        assert eidolon.compute_register_scores(text) == _inline_scores(text), text
+        compared += 1
+    assert compared > len(texts) // 2
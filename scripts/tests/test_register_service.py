@@ -0,0 +1,104 @@
+"""
+Tests for register_service.
+
+A draft's scores must equal compute_register_scores(). Its composite
+percentile must be the share of corpus proteins strictly below it, and its
+S5 quintile must use the section 2 bins. The cached reference must be
+rebuilt when the corpus changes.
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import compute_register_scores, default_matcher, extract_text
+import register_service
+from register_service import Reference, RegisterService, serve_stdio
+
+
+@pytest.fixture(scope="module")
+def reference():
+    rng = np.random.default_rng(6)
+    s5 = np.round(rng.uniform(0.3, 1.0, size=500), 2)   # ties on the quintile edges
+    composite = np.round(rng.uniform(0.2, 0.9, size=500), 4)
+    return s5, composite, Reference.from_arrays(s5, composite, default_matcher().digest)
+
+
+def _analysis_quintile(s5_all, s5):
+    """Section 2 binning: [lo, hi) for the first four quintiles, [lo, hi] for the last."""
+    edges = np.percentile(s5_all, [0, 20, 40, 60, 80, 100])
+    for q in range(5):
+        lo, hi = edges[q], edges[q + 1]
+        if (lo <= s5 < hi) if q < 4 else (lo <= s5 <= hi):
+            return q + 1
+    return 1 if s5 < edges[0] else 5
+
+
+def test_scores_and_placement(sample_corpus, reference):
+    s5_all, composite_all, ref = reference
+    service = RegisterService(default_matcher(), ref)
+    texts = [extract_text(p) for p in load_proteins_direct(sample_corpus[0]).values()]
+    probes = [0.0, 1.5, *ref.s5_edges.tolist(), *s5_all[:50].tolist()]
+
+    for i, text in enumerate(texts[:80]):
+        s5 = probes[i % len(probes)]
+        result = service.score(text, s5=s5, draft_id=str(i))
+        expected = compute_register_scores(text)
+        assert result["scores"] == expected
+        below = sum(1 for c in composite_all if c < expected["composite"])
+        assert result["composite_pct"] == round(100 * below / len(composite_all), 1)
+        quintile = _analysis_quintile(s5_all, s5)
+        assert result["s5_quintile"] == quintile
+        in_bin = [c for c, s in zip(composite_all, s5_all) if _analysis_quintile(s5_all, s) == quintile]
+        assert result["quintile_composite_mean"] == round(float(np.mean(in_bin)), 4)
+
+    assert service.score("too short")["error"] == "too short to score"
+
+
+def test_reference_cache_follows_the_corpus(corpus, tmp_path, monkeypatch):
+    proteins_dir, metrics_path = corpus
+    path = str(tmp_path / "reference.npz")
+    kwargs = {"reference_path": path, "proteins_dirs": [proteins_dir], "metrics_path": metrics_path}
+    built = RegisterService.from_corpus(**kwargs).reference
+    builds = []
+    monkeypatch.setattr(register_service, "corpus_reference",
+                        lambda *a, **kw: builds.append(1) or built)
+
+    # Unchanged corpus: the saved reference is used as-is (no corpus scan)
+    loaded = RegisterService.from_corpus(**kwargs).reference
+    assert not builds
+    assert np.array_equal(loaded.composite, built.composite)
+    assert np.array_equal(loaded.s5_edges, built.s5_edges)
+    assert loaded.source == built.source
+
+    # Editing a protein or touching the metrics JSON rebuilds it
+    name = sorted(f for f in os.listdir(proteins_dir) if f.endswith(".yaml"))[0]
+    with open(os.path.join(proteins_dir, name), "a") as f:
+        f.write("\n")
+    RegisterService.from_corpus(**kwargs)
+    assert len(builds) == 1
+    st = os.stat(metrics_path)
+    os.utime(metrics_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    RegisterService.from_corpus(**kwargs)
+    assert len(builds) == 2
+
+
+def test_json_lines(reference):
+    _, _, ref = reference
+    service = RegisterService(default_matcher(), ref)
+
+    text = "The river of data flows like a shimmer through the system matrix."
+    requests = [json.dumps({"id": "a", "text": text, "s5": 0.8}),
+                json.dumps([{"id": "b", "text": text}, text]),
+                "not json", "42"]
+    out = io.StringIO()
+    serve_stdio(service, io.StringIO("\n".join(requests) + "\n\n"), out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines[0] == service.score(text, 0.8, "a")
+    assert lines[1] == [service.score(text, None, "b"), service.score(text)]
+    assert lines[2]["error"].startswith("bad request")
+    assert "error" in lines[3]
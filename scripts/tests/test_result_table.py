@@ -0,0 +1,80 @@
+"""
+ResultTable against the per-protein dicts it replaced.
+
+Rows must read back as the old dicts. order() must give the same order as
+list.sort() on those dicts for each sort key, with ties and reverse=True.
+"""
+
+import numpy as np
+import pytest
+
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_batch import score_texts
+from eidolon.register_scoring import (
+    ABSTRACT_SUFFIXES, compute_register_scores, default_matcher, extract_text,
+)
+from eidolon.result_table import TITLE_LENGTH, ResultTable
+
+TIERS = ["core", "edge", "outer"]
+
+
+@pytest.fixture(scope="module")
+def corpus_rows(sample_corpus):
+    proteins = list(load_proteins_direct(sample_corpus[0]).values())
+    proteins.append({"id": "short", "title": "Too short", "tier": "edge"})
+    rng = np.random.default_rng(9)
+    s5 = np.round(rng.uniform(0.3, 1.0, size=len(proteins)), 2)   # plenty of ties
+    tier_codes = rng.integers(len(TIERS), size=len(proteins))
+    return proteins, s5, tier_codes
+
+
+def _old_results(proteins, s5, tier_codes):
+    """The list of dicts the analysis used to build."""
+    results = []
+    for p, s, code in zip(proteins, s5.tolist(), tier_codes.tolist()):
+        scores = compute_register_scores(extract_text(p))
+        if scores is None:
+            continue
+        results.append({"id": p["id"], "title": (p.get("title") or "")[:TITLE_LENGTH],
+                        "tier": TIERS[code], "s5": s, **scores})
+    return results
+
+
+def test_rows_match_result_dicts(corpus_rows):
+    proteins, s5, tier_codes = corpus_rows
+    ids = [p["id"] for p in proteins]
+    titles = [p.get("title") for p in proteins]
+    scores = [compute_register_scores(extract_text(p)) for p in proteins]
+    table = ResultTable.from_scores(ids, titles, scores, {"s5": s5}, tier_codes, TIERS)
+    expected = _old_results(proteins, s5, tier_codes)
+
+    assert len(table) == len(expected) == len(proteins) - 1
+    assert [r.to_dict() for r in table.rows()] == expected
+
+    columns = score_texts([extract_text(p) for p in proteins], default_matcher(), ABSTRACT_SUFFIXES)
+    from_columns = ResultTable.from_score_columns(ids, titles, columns, {"s5": s5},
+                                                  tier_codes, TIERS)
+    assert [r.to_dict() for r in from_columns.rows()] == expected
+
+    picked = table.take(table["s5"] >= 0.9)
+    assert [r.to_dict() for r in picked.rows()] == [r for r in expected if r["s5"] >= 0.9]
+
+
+@pytest.mark.parametrize("key", ["s5", "composite", "n_tokens"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_order_matches_list_sort(corpus_rows, key, reverse):
+    proteins, s5, tier_codes = corpus_rows
+    table = ResultTable.from_scores(
+        [p["id"] for p in proteins], [p.get("title") for p in proteins],
+        [compute_register_scores(extract_text(p)) for p in proteins], {"s5": s5},
+        tier_codes, TIERS)
+    results = _old_results(proteins, s5, tier_codes)
+
+    expected = sorted(results, key=lambda r: r[key], reverse=reverse)
+    assert [table.row(i)["id"] for i in table.order(key, reverse=reverse)] == \
+        [r["id"] for r in expected]
+
+    subset = np.flatnonzero(table["s5"] < 0.6)
+    expected = sorted((results[i] for i in subset), key=lambda r: r[key], reverse=reverse)
+    assert [table.row(i)["id"] for i in table.order(key, subset, reverse=reverse)] == \
+        [r["id"] for r in expected]
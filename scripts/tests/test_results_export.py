@@ -0,0 +1,87 @@
+"""
+Tests for the memory-mapped results export.
+
+write_export() followed by ResultsExport must give back the same table.
+Files that are not exports must be rejected. A --from-export run must print
+the same report and write the same JSON as the run that made the export.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import run_analysis
+from eidolon.result_table import ResultTable
+from eidolon.results_export import ALIGN, ResultsExport, default_export_path, write_export
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(5)
+    n = 50
+    ids = [f"protein-{i}" for i in range(n)]
+    ids[3] = "prötein-ünïcode"
+    titles = [f"Title {i} — shimmer" for i in range(n)]
+    titles[7] = ""
+    columns = {
+        "s5": rng.uniform(0.3, 1.0, n),
+        "composite": rng.uniform(0, 1, n).astype(np.float32),
+        "word_count": rng.integers(0, 5000, n).astype(np.int32),
+        "p_number": rng.integers(-1, 9999, n),
+        "quadrant": rng.integers(0, 4, n).astype(np.int8),
+    }
+    return ResultTable(ids, titles, columns, tier_codes=rng.integers(0, 3, n).astype(np.int8),
+                       tiers=["core", "convergence", "reference"])
+
+
+def test_round_trip(table, tmp_path):
+    path = str(tmp_path / "out" / "results.table")
+    quadrants = ["a", "b", "c", "d"]
+    write_export(path, table, categories={"quadrant": quadrants}, meta={"lexicon_version": "abc"})
+    assert not (tmp_path / "out" / "results.table.tmp").exists()
+
+    export = ResultsExport(path)
+    assert len(export) == len(table)
+    assert export.meta == {"lexicon_version": "abc"}
+    assert export.strings("id") == table.ids
+    assert export.strings("title") == table.titles
+    assert [export.string("id", i) for i in range(len(table))] == table.ids
+    assert sorted(export.names()) == sorted(table.columns)
+    for name, values in table.columns.items():
+        column = export.column(name)
+        assert column.dtype == values.dtype
+        assert not column.flags.writeable
+        np.testing.assert_array_equal(column, values)
+        assert export.schema[name]["offset"] % ALIGN == 0
+    assert export.labels("quadrant") == [quadrants[c] for c in table["quadrant"].tolist()]
+    assert export.labels("tier") == [table.tiers[c] for c in table.tier_codes.tolist()]
+    with pytest.raises(KeyError):
+        export.column("id.utf8")
+
+    rebuilt = export.to_table()
+    assert [r.to_dict() for r in rebuilt.rows()] == [r.to_dict() for r in table.rows()]
+    assert rebuilt.order("s5", reverse=True).tolist() == table.order("s5", reverse=True).tolist()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.table"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ResultsExport(str(path))
+
+
+def test_from_export_reproduces_run(sample_corpus, tmp_path):
+    proteins_dir, metrics_path = sample_corpus
+    text, results = run_analysis(proteins_dir, metrics_path, tmp_path / "run")
+    export_path = default_export_path(str(tmp_path / "run" / "results.json"))
+    assert f"exported to {export_path}" in text
+
+    again, again_results = run_analysis(proteins_dir, metrics_path, tmp_path / "again",
+                                        "--from-export", export_path)
+    assert f"from export {export_path}" in again
+    assert not (tmp_path / "again" / "results.table").exists()
+
+    def report(out):
+        return out[out.index("\n1. OVERALL"):out.index("Results saved")]
+
+    assert report(again) == report(text)
+    assert again_results == results
@@ -0,0 +1,99 @@
+"""
+Tests for KnnIndex, sync_index() and compute_s5().
+
+Neighbours are compared with a brute-force argsort for both metrics.
+sync_index() must add new rows in place and rebuild when rows are reordered
+or a stored vector changes. S5 is compared with the set formula written out
+per protein.
+"""
+
+import numpy as np
+import pytest
+
+from eidolon.s5_engine import KnnIndex, compute_s5, sync_index
+
+K = 5
+
+
+def _brute_force(vectors, k, metric):
+    x = vectors.astype(np.float64)
+    if metric == "cosine":
+        x = x / np.linalg.norm(x, axis=1, keepdims=True)
+        dist = 1.0 - x @ x.T
+    else:
+        dist = ((x[:, None, :] - x[None, :, :]) ** 2).sum(axis=-1)
+    np.fill_diagonal(dist, np.inf)
+    return np.argsort(dist, axis=1, kind="stable")[:, :k]
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(11).normal(size=(240, 8)).astype(np.float32)
+
+
+@pytest.mark.parametrize("metric", ["cosine", "euclidean"])
+def test_build_and_incremental_match_brute_force(vectors, metric):
+    ids = [f"p{i}" for i in range(len(vectors))]
+    expected = _brute_force(vectors, K, metric)
+
+    full = KnnIndex.build(ids, vectors, K, metric)
+    assert (full.nbr_idx == expected).all()
+
+    # A few rows per block, and inserts in uneven batches
+    tiny = 24 * len(vectors) * 3
+    index = KnnIndex.build(ids[:100], vectors[:100], K, metric, memory=tiny)
+    for start, stop in ((100, 101), (101, 170), (170, 240)):
+        changed = index.add(ids[start:stop], vectors[start:stop], memory=tiny)
+        assert set(range(start, stop)) <= set(changed.tolist())
+    assert index.ids == ids
+    assert (index.nbr_idx == expected).all()
+    assert np.allclose(index.nbr_dist, full.nbr_dist, atol=1e-6)
+
+
+def test_sync_index_inserts_then_rebuilds(vectors, tmp_path):
+    path = str(tmp_path / "knn.npz")
+    ids = [f"p{i}" for i in range(len(vectors))]
+    _, inserted, rebuilt = sync_index(path, ids[:200], vectors[:200], K)
+    assert (inserted, rebuilt) == (200, True)
+
+    index, inserted, rebuilt = sync_index(path, ids, vectors, K)
+    assert (inserted, rebuilt) == (40, False)
+    assert (index.nbr_idx == _brute_force(vectors, K, "cosine")).all()
+
+    _, inserted, rebuilt = sync_index(path, ids, vectors, K)
+    assert (inserted, rebuilt) == (0, False)
+    _, _, rebuilt = sync_index(path, ids[::-1], vectors[::-1], K)
+    assert rebuilt
+
+
+def test_s5_matches_set_formula(vectors):
+    rng = np.random.default_rng(5)
+    vocab = [f"#t{i}" for i in range(30)]
+    tag_sets = [[vocab[j] for j in rng.choice(30, size=rng.integers(0, 6), replace=False)]
+                for _ in range(len(vectors))]
+    coherence = rng.uniform(0.8, 1.0, size=len(vectors))
+    index = KnnIndex.build([str(i) for i in range(len(vectors))], vectors, K)
+
+    s5 = compute_s5(index, tag_sets, coherence)
+    for i, tags in enumerate(tag_sets):
+        own = set(tags)
+        if own:
+            shared = [len(own & set(tag_sets[j])) / len(own) for j in index.nbr_idx[i]]
+            overlap = sum(shared) / len(shared)
+        else:
+            overlap = 0.0
+        assert s5[i] == pytest.approx(round(coherence[i] * (1.0 - overlap), 4), abs=1e-12)
+
+
+def test_sync_index_rebuilds_when_a_vector_changes(vectors, tmp_path):
+    path = str(tmp_path / "knn.npz")
+    ids = [f"p{i}" for i in range(len(vectors))]
+    sync_index(path, ids, vectors, K)
+
+    moved = vectors.copy()
+    moved[5] = -vectors[5]   # same ids, one embedding replaced
+    index, inserted, rebuilt = sync_index(path, ids, moved, K)
+    assert rebuilt and inserted == len(ids)
+    assert (index.nbr_idx == _brute_force(moved, K, "cosine")).all()
+    _, _, rebuilt = sync_index(path, ids, moved, K)
+    assert not rebuilt
@@ -0,0 +1,91 @@
+"""
+Tests for the content-hash score store.
+
+A second ingest must reuse stored scores and rescore only edited proteins.
+A new lexicon must start a new store, and a corrupt store file must be
+treated as empty.
+"""
+
+import os
+
+import numpy as np
+import yaml
+
+from eidolon.lexicon_matcher import load_matcher
+from eidolon.parallel_ingest import ingest_corpora
+from eidolon.register_scoring import (
+    DEFAULT_LEXICONS, compute_register_scores, default_matcher, extract_text,
+)
+from eidolon.score_store import ScoreStore, store_path_for
+
+
+def _ingest(proteins_dir, store_dir, **kwargs):
+    return ingest_corpora([proteins_dir], score_store_dir=store_dir, **kwargs)
+
+
+def _fresh(proteins, matcher=None):
+    return {pid: compute_register_scores(extract_text(p), matcher) for pid, p in proteins.items()}
+
+
+def test_reuse_and_invalidation(corpus, tmp_path):
+    proteins_dir, _ = corpus
+    store_dir = str(tmp_path / "scores")
+
+    proteins, scores, stats = _ingest(proteins_dir, store_dir)
+    assert stats["score_store"] == {"reused": 0, "rescored": len(proteins)}
+    assert scores == _fresh(proteins)
+
+    _, again, stats = _ingest(proteins_dir, store_dir)
+    assert stats["score_store"] == {"reused": len(proteins), "rescored": 0}
+    assert again == scores
+
+    # Changing the scored text rescores that protein only
+    name = sorted(os.listdir(proteins_dir))[0]
+    path = os.path.join(proteins_dir, name)
+    with open(path) as f:
+        data = yaml.safe_load(f)
+    data["summary"] = "Ocean ocean data matrix. " + data["summary"]
+    with open(path, "w") as f:
+        yaml.safe_dump(data, f)
+    proteins, scores, stats = _ingest(proteins_dir, store_dir)
+    assert stats["score_store"] == {"reused": len(proteins) - 1, "rescored": 1}
+    assert scores == _fresh(proteins)
+
+    _, _, stats = _ingest(proteins_dir, store_dir, rescore=True)
+    assert stats["score_store"] == {"reused": 0, "rescored": len(proteins)}
+
+
+def test_lexicon_change_starts_a_new_store(corpus, tmp_path):
+    proteins_dir, _ = corpus
+    store_dir = str(tmp_path / "scores")
+    _ingest(proteins_dir, store_dir)
+
+    matcher = load_matcher(dict(DEFAULT_LEXICONS, mood={"ocean", "calm sea"}), cache_dir=None)
+    proteins, scores, stats = _ingest(proteins_dir, store_dir, matcher=matcher)
+    assert stats["score_store"] == {"reused": 0, "rescored": len(proteins)}
+    assert scores == _fresh(proteins, matcher)
+    assert len(os.listdir(store_dir)) == 2
+
+
+def test_corrupt_store_is_rebuilt(corpus, tmp_path):
+    proteins_dir, _ = corpus
+    store_dir = str(tmp_path / "scores")
+    proteins, scores, _ = _ingest(proteins_dir, store_dir)
+    path = store_path_for(default_matcher().digest, store_dir)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # Truncated archive, then a readable one that lacks the hashes column
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+    assert len(ScoreStore(path)) == 0
+    _, again, stats = _ingest(proteins_dir, store_dir)
+    assert stats["score_store"] == {"reused": 0, "rescored": len(proteins)}
+    assert again == scores
+
+    with open(path, "wb") as f:
+        np.savez(f, ids=np.array(list(proteins)))
+    _, again, stats = _ingest(proteins_dir, store_dir)
+    assert stats["score_store"] == {"reused": 0, "rescored": len(proteins)}
+    assert again == scores
+    assert len(ScoreStore(path)) == len(proteins)
@@ -0,0 +1,135 @@
+"""
+Mergeable summaries and the --streaming report.
+
+Moments, QuantileSketch and TopK are merged from random splits and compared
+with whole-array results: exact for moments and top-k, and for sketches
+that stayed below k; within 1% of n in rank above it. A --streaming run must
+print what the in-memory run prints, with or without --tag, and must cap
+its P-series table.
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from conftest import run_analysis
+from eidolon import sharded_analysis
+from eidolon.sharded_analysis import Moments, QuantileSketch, TopK
+from eidolon.synthetic_corpus import SEMANTIC_TAGS
+
+
+def _split(values, rng, parts=7):
+    cuts = np.sort(rng.choice(np.arange(1, len(values)), size=parts - 1, replace=False))
+    return np.split(values, cuts)
+
+
+def _sketch(values, k):
+    sketch = QuantileSketch(k)
+    sketch.update(values)
+    return sketch
+
+
+def test_moments_merge_is_exact():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(1000, 3)) @ rng.normal(size=(3, 3))
+    merged = Moments("abc")
+    for part in _split(data, rng):
+        shard = Moments("abc")
+        shard.update({"a": part[:, 0], "b": part[:, 1], "c": part[:, 2]})
+        merged.merge(shard)
+    assert merged.n == 1000
+    assert merged.get_mean("b") == pytest.approx(data[:, 1].mean(), abs=1e-12)
+    assert merged.std("c") == pytest.approx(data[:, 2].std(), rel=1e-12)
+    r, p = stats.pearsonr(data[:, 0], data[:, 2])
+    assert merged.pearson("a", "c") == pytest.approx((r, p), rel=1e-9)
+
+
+def test_sketch_exact_below_k_and_bounded_above():
+    rng = np.random.default_rng(1)
+    small = np.round(rng.normal(size=400), 2)
+    sketch = QuantileSketch(k=512)
+    for part in _split(small, rng):
+        sketch.merge(_sketch(part, 512))
+    assert sketch.exact
+    q = [0, 20, 37.5, 50, 80, 100]
+    assert np.array_equal(sketch.quantile(q), np.percentile(small, q))
+    assert np.array_equal(sketch.mid_rank(small), stats.rankdata(small))
+
+    large = rng.normal(size=50_000)
+    merged = QuantileSketch(k=256)
+    for part in _split(large, rng, parts=20):
+        merged.merge(_sketch(part, 256))
+    assert not merged.exact and merged.n == len(large)
+    true_rank = stats.rankdata(large)
+    probe = rng.choice(len(large), size=500, replace=False)
+    assert np.abs(merged.mid_rank(large[probe]) - true_rank[probe]).max() < 0.01 * len(large)
+    assert merged.quantile(0) == large.min() and merged.quantile(100) == large.max()
+
+
+def test_topk_merge_matches_sort():
+    rng = np.random.default_rng(2)
+    keys = np.round(rng.random(300), 2).tolist()   # ties broken by order
+    expected = sorted(range(300), key=lambda i: (keys[i], i))[:10]
+    merged = TopK(10)
+    for part in _split(np.arange(300), rng):
+        shard = TopK(10)
+        shard.push_many([keys[i] for i in part], part.tolist(), part.tolist())
+        merged.merge(shard)
+    assert merged.sorted() == expected
+
+
+def _report(text):
+    """Sections 1-8 of the printed report, without the load/timing header."""
+    return text[text.index("\nMatched "):text.index("Results saved")]
+
+
+@pytest.mark.parametrize("extra", [[], ["--tag", SEMANTIC_TAGS[0]]])
+def test_streaming_matches_in_memory(sample_corpus, tmp_path, extra):
+    proteins_dir, metrics_path = sample_corpus
+    memory_text, memory = run_analysis(proteins_dir, metrics_path, tmp_path / "mem",
+                                       "--no-export", "--resamples", "0", *extra)
+    stream_text, streamed = run_analysis(proteins_dir, metrics_path, tmp_path / "stream",
+                                         "--streaming", "--shard-size", "64", "--resamples", "0",
+                                         *extra)
+    assert "(exact)" in stream_text
+    if extra:
+        assert 0 < memory["n_proteins"] < 299   # the filter applied (compared to streamed below)
+
+    mw = [line for line in memory_text.splitlines() if "Mann-Whitney" in line]
+    expected = _report(memory_text)
+    for line in mw:   # the one statistic with no mergeable form
+        expected = expected.replace(line, "    Mann-Whitney U: not available in streaming mode")
+    assert _report(stream_text) == expected
+
+    assert streamed.pop("streaming")   # shard/sketch stats, streaming only
+    assert _close(streamed, memory)
+
+
+def _close(a, b):
+    """Nested equality with float tolerance (p-values differ in the last bits)."""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_close(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float):
+        return a == pytest.approx(b, rel=1e-9, nan_ok=True)
+    return a == b
+
+
+def test_p_series_table_is_bounded(sample_corpus, tmp_path, monkeypatch):
+    proteins_dir, metrics_path = sample_corpus
+    memory_text, _ = run_analysis(proteins_dir, metrics_path, tmp_path / "mem",
+                                  "--no-export", "--resamples", "0")
+    monkeypatch.setattr(sharded_analysis, "P_SERIES_LIMIT", 5)
+    stream_text, _ = run_analysis(proteins_dir, metrics_path, tmp_path / "stream",
+                                  "--streaming", "--shard-size", "64", "--resamples", "0")
+
+    def table(text):
+        lines = text[text.index("7. P-SERIES"):].splitlines()
+        start = next(i for i, line in enumerate(lines) if line.startswith("  --------"))
+        return lines[start + 1:lines.index("", start)]
+
+    n = int(memory_text.split("Found ")[1].split()[0])
+    assert n > 5
+    assert f"Found {n} P-series proteins (showing the 5 lowest P-numbers)" in stream_text
+    assert table(stream_text) == table(memory_text)[:5]
@@ -0,0 +1,81 @@
+"""
+SignificanceEngine against scipy.stats.
+
+Observed r and p are compared with pearsonr/spearmanr. Single bootstrap
+draws are compared with scipy on the resampled rows. Results must not depend
+on the worker count, a small memory budget must still give repeatable
+results, and spearman=False must leave the Pearson fields unchanged.
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from eidolon.significance import SignificanceEngine, _resample_batch
+
+
+@pytest.fixture(scope="module")
+def columns():
+    rng = np.random.default_rng(8)
+    x = np.round(rng.normal(size=150), 1)   # ties, as S5 has
+    return {"x": x, "near": x + rng.normal(size=150), "noise": np.round(rng.normal(size=150)),
+            "flat": np.ones(150)}
+
+
+def test_observed_matches_scipy(columns):
+    engine = SignificanceEngine(columns, n_resamples=0)
+    out = engine.correlate("x", ["near", "noise"])
+    for y in ("near", "noise"):
+        r, p = stats.pearsonr(columns["x"], columns[y])
+        rho, rho_p = stats.spearmanr(columns["x"], columns[y])
+        assert out[y]["pearson_r"] == pytest.approx(r, abs=1e-12)
+        assert out[y]["pearson_p"] == pytest.approx(p, rel=1e-9)
+        assert out[y]["spearman_rho"] == pytest.approx(rho, abs=1e-12)
+        assert out[y]["spearman_p"] == pytest.approx(rho_p, rel=1e-9)
+
+
+def test_bootstrap_draws_match_scipy(columns):
+    x = columns["x"]
+    Y = np.column_stack([columns["near"], columns["noise"]])
+    ranks = (stats.rankdata(x), np.column_stack([stats.rankdata(c) for c in Y.T]))
+    seed = np.random.SeedSequence(3)
+    boot, _ = _resample_batch((x, Y, *ranks, np.zeros((2, 2)), 20, seed, True))
+
+    draws = np.random.default_rng(seed).integers(0, len(x), size=(20, len(x)))
+    for b, idx in enumerate(draws):
+        for j in range(2):
+            assert boot[b, 0, j] == pytest.approx(stats.pearsonr(x[idx], Y[idx, j])[0], abs=1e-10)
+            assert boot[b, 1, j] == pytest.approx(stats.spearmanr(x[idx], Y[idx, j])[0], abs=1e-10)
+
+
+def test_resampling_is_deterministic_across_workers(columns):
+    kwargs = {"n_resamples": 400, "seed": 1, "batch": 100}
+    serial = SignificanceEngine(columns, workers=1, **kwargs).correlate("x", ["near", "flat"])
+    engine = SignificanceEngine(columns, workers=2, **kwargs)
+    try:
+        pooled = engine.correlate("x", ["near", "flat"])
+    finally:
+        engine.close()
+    assert repr(pooled) == repr(serial)   # repr: NaN == NaN for the constant column
+    assert serial["near"]["pearson_ci"][0] < serial["near"]["pearson_r"] < serial["near"]["pearson_ci"][1]
+    assert serial["near"]["spearman_perm_p"] == 1 / 401
+    assert np.isnan(serial["flat"]["pearson_r"]) and np.isnan(serial["flat"]["pearson_perm_p"])
+
+
+def test_memory_budget_caps_the_batch(columns):
+    # 10 draws per batch instead of 100: same statistics, different draw stream
+    tiny = SignificanceEngine(columns, n_resamples=400, batch=100, memory=64 * 150 * 10)
+    out = tiny.correlate("x", ["near"])["near"]
+    assert out["pearson_r"] == pytest.approx(stats.pearsonr(columns["x"], columns["near"])[0])
+    assert out["spearman_ci"][0] < out["spearman_rho"] < out["spearman_ci"][1]
+    assert repr(out) == repr(tiny.correlate("x", ["near"])["near"])
+
+
+def test_pearson_only_skips_spearman_resampling(columns):
+    engine = SignificanceEngine(columns, n_resamples=300, seed=2, batch=100)
+    both = engine.correlate("x", ["near", "noise"])
+    pearson = engine.correlate("x", ["near", "noise"], spearman=False)
+    for y in ("near", "noise"):
+        assert "spearman_ci" not in pearson[y] and "spearman_perm_p" not in pearson[y]
+        expected = {k: v for k, v in both[y].items() if k not in ("spearman_ci", "spearman_perm_p")}
+        assert pearson[y] == expected
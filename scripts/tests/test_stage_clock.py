@@ -0,0 +1,82 @@
+"""
+Tests for StageClock and the --trace/--profile options.
+
+Timings have to equal the sum of their dotted spans. Tracing and profiling
+must not change the report or results. A warm run must still record
+load.proteins and score spans.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from conftest import run_analysis
+from eidolon.stage_clock import StageClock
+
+
+def test_timings_roll_up_spans(tmp_path):
+    clock = StageClock(profile=True)
+    time.sleep(0.01)
+    clock.mark("load.metrics", items=3)
+    clock.mark("load.proteins")
+    sum(i * i for i in range(100_000))
+    clock.mark("statistics")
+    clock.add("score", 0.004, cpu_seconds=0.001, items=7)
+    clock.mark("load.more")
+
+    stages = {}
+    for span in clock.spans:
+        stage = span["name"].split(".")[0]
+        stages[stage] = stages.get(stage, 0.0) + span["wall_seconds"]
+    assert clock.timings == pytest.approx(stages, abs=1e-12)
+    assert list(clock.timings) == ["load", "statistics", "score"]
+    assert clock.spans[0]["wall_seconds"] >= 0.01 and clock.spans[0]["items"] == 3
+    assert clock.spans[3] == {"name": "score", "wall_seconds": 0.004, "cpu_seconds": 0.001,
+                              "peak_rss_mb": clock.spans[3]["peak_rss_mb"], "items": 7}
+    assert clock.hottest() in clock.timings
+
+    path = str(tmp_path / "trace.json")
+    clock.write_trace(path)
+    with open(path) as f:
+        trace = json.load(f)
+    assert [s["name"] for s in trace["spans"]] == [s["name"] for s in clock.spans]
+    assert trace["peak_rss_mb"] > 0
+    assert clock.dump_profile(str(tmp_path / "stats.prof"), "statistics") == "statistics"
+
+
+def test_instrumentation_does_not_change_results(sample_corpus, tmp_path):
+    proteins_dir, metrics_path = sample_corpus
+    plain_text, plain = run_analysis(proteins_dir, metrics_path, tmp_path / "plain",
+                                     "--no-export", "--resamples", "0")
+    trace = tmp_path / "trace.json"
+    traced_text, traced = run_analysis(proteins_dir, metrics_path, tmp_path / "traced",
+                                       "--no-export", "--resamples", "0",
+                                       "--trace", str(trace), "--profile", str(tmp_path / "p.prof"))
+    assert traced == plain
+    body = slice(plain_text.index("\nMatched "), plain_text.index("Results saved"))
+    assert traced_text[body] == plain_text[body]
+    with open(trace) as f:
+        stages = json.load(f)["stages"]
+    assert {"load", "score", "join", "statistics", "quadrant_topk", "output"} <= set(stages)
+
+
+def test_load_and_score_spans_on_a_warm_run(corpus, tmp_path):
+    proteins_dir, metrics_path = corpus
+    n_files = len([f for f in os.listdir(proteins_dir) if f.endswith(".yaml")])
+    spans = []
+    for run in ("cold", "warm"):
+        trace = tmp_path / f"{run}.json"
+        run_analysis(proteins_dir, metrics_path, tmp_path / run, "--no-export",
+                     "--resamples", "0", "--trace", str(trace),
+                     "--score-store-dir", str(tmp_path / "scores"))   # shared by both runs
+        with open(trace) as f:
+            spans.append({s["name"]: s for s in json.load(f)["spans"]})
+    cold, warm = spans
+    assert cold["load.proteins"]["items"] == warm["load.proteins"]["items"] == n_files
+    assert (cold["load.proteins"]["parsed"], warm["load.proteins"]["parsed"]) == (n_files, 0)
+    assert cold["score"]["items"] == n_files and warm["score"]["items"] == 0
+    for span in (cold["score"], warm["score"]):
+        assert isinstance(span["cpu_seconds"], float)
+    assert cold["score"]["cpu_seconds"] > 0
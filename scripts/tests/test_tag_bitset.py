@@ -0,0 +1,87 @@
+"""
+TagTable against Python sets over the original tag lists.
+
+Checks overlap, Jaccard, filters, tag order and P-numbers, for tags in the
+frequent-tag head word and in the sparse tail, with duplicates and missing
+tag lists. --tag with no matching protein must exit cleanly.
+"""
+
+import numpy as np
+import pytest
+
+from eidolon.protein_snapshot import load_proteins_direct
+from eidolon.register_scoring import extract_p_number
+from eidolon.tag_bitset import HEAD_BITS, TagDictionary, TagTable
+
+
+@pytest.fixture(scope="module")
+def tag_lists():
+    """Zipf-like tags plus one-off tags (a long sparse tail), with duplicates and empties."""
+    rng = np.random.default_rng(2)
+    vocab = [f"#t{i}" for i in range(HEAD_BITS * 4)]
+    lists = [[vocab[min(int(j), len(vocab) - 1)] for j in rng.pareto(0.8, size=rng.integers(0, 10)) * 6]
+             + [f"#rare{row}", f"#rare{row}b"] * (row % 3 > 0)
+             for row in range(400)]
+    return lists + [[], None, ["#t0", "#t0"]]
+
+
+def test_overlap_and_jaccard(tag_lists):
+    table = TagTable.from_lists(tag_lists)
+    sets = [set(tags or []) for tags in tag_lists]
+    rng = np.random.default_rng(4)
+    a = rng.integers(len(sets), size=3000)
+    b = rng.integers(len(sets), size=3000)
+
+    assert table.sizes().tolist() == [len(s) for s in sets]
+    assert table.overlap(a, b).tolist() == [len(sets[i] & sets[j]) for i, j in zip(a, b)]
+    jaccard = [len(sets[i] & sets[j]) / len(sets[i] | sets[j]) if sets[i] | sets[j] else 0.0
+               for i, j in zip(a, b)]
+    assert np.allclose(table.jaccard(a, b), jaccard)
+
+    nbr = rng.integers(len(sets), size=(len(sets), 6))
+    shared = table.neighbour_overlap(nbr)
+    assert shared.tolist() == [[len(sets[i] & sets[j]) for j in row] for i, row in enumerate(nbr)]
+
+    rows = np.arange(0, len(sets), 3)
+    pairwise = table.pairwise_overlap(rows, block=17)
+    assert pairwise.tolist() == [[len(sets[i] & sets[j]) for j in rows] for i in rows]
+
+
+def test_filters(tag_lists):
+    dictionary = TagDictionary(["#unused"])
+    table = TagTable.from_lists(tag_lists, dictionary)
+    sets = [set(tags or []) for tags in tag_lists]
+    for query in (["#t0"], ["#t0", "#t3"], ["#t200"], ["#t1", "#t150"],
+                  ["#unused"], ["#nope"], ["#t0", "#nope"], []):
+        assert table.has_all(query).tolist() == [
+            set(query) <= s and all(t in dictionary.ids for t in query) for s in sets], query
+        assert table.has_any(query).tolist() == [bool(set(query) & s) for s in sets], query
+
+
+def test_tags_keep_order_and_memory_is_sparse(tag_lists):
+    table = TagTable.from_lists(tag_lists)
+    for row, tags in enumerate(tag_lists):
+        assert table.tags(row) == list(dict.fromkeys(tags or []))
+    # Never more than a dense bitset over the dictionary would take
+    assert table.nbytes < len(table) * ((len(table.dictionary) + 63) // 64) * 8
+
+
+def test_p_numbers_match_extract_p_number(sample_corpus):
+    proteins = list(load_proteins_direct(sample_corpus[0]).values())
+    proteins += [{"tags": ["#x", "#P12", "#P7"], "title": "P3 title"},
+                 {"tags": [], "title": "P44: only the title"},
+                 {"tags": ["#p5", "#Pfoo"], "title": "no P here"}]
+    table = TagTable.from_lists([p.get("tags") for p in proteins])
+    got = table.p_numbers([p.get("title", "") for p in proteins]).tolist()
+    assert got == [extract_p_number(p) if extract_p_number(p) is not None else -1 for p in proteins]
+    assert got[-3:] == [12, 44, -1]
+
+
+def test_tag_filter_matching_nothing_exits_cleanly(sample_corpus, tmp_path):
+    from conftest import run_analysis
+
+    proteins_dir, metrics_path = sample_corpus
+    text, output = run_analysis(proteins_dir, metrics_path, tmp_path, "--tag", "#nope")
+    assert "Tag filter #nope: 0 of" in text
+    assert "No proteins match the tag filter; nothing to analyse" in text
+    assert output["n_proteins"] == 0 and output["tags"] == ["#nope"]
@@ -0,0 +1,151 @@
+"""
+Tests for DriftTracker and --temporal.
+
+The tracker is checked against a one-pass build, direct per-window
+statistics and np.corrcoef. local_peaks() is checked against the loop
+section 7 used before. --temporal must leave sections 1-8 unchanged.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import run_analysis
+from eidolon.temporal_drift import (
+    DAY, DriftTracker, lagged_xcorr, local_peaks, open_tracker, option_error, parse_timestamps,
+)
+
+START = 1748736000   # 2025-06-01
+
+
+def _loop_peaks(values):
+    """Strict local maxima as section 7 found them before local_peaks()."""
+    return [i for i in range(1, len(values) - 1)
+            if values[i] > values[i - 1] and values[i] > values[i + 1]]
+
+
+@pytest.fixture
+def stream():
+    rng = np.random.default_rng(3)
+    n = 500
+    ids = [f"p{i}" for i in range(n)]
+    timestamps = START + rng.uniform(0, 60 * DAY, n)
+    timestamps[rng.choice(n, 10, replace=False)] = np.nan
+    s5 = rng.uniform(0.4, 1.0, n)
+    composite = 1.2 - s5 + rng.normal(0, 0.1, n)
+    return ids, timestamps, s5, composite
+
+
+def test_local_peaks_match_loop():
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 2, 3, 10, 200):
+        values = rng.integers(0, 5, n).astype(np.float64)   # plenty of plateaus
+        if n > 4:
+            values[rng.choice(n, 3, replace=False)] = np.nan
+        assert local_peaks(values).tolist() == _loop_peaks(values)
+
+
+def test_incremental_update_matches_one_pass(stream, tmp_path):
+    ids, timestamps, s5, composite = stream
+    full = DriftTracker(DAY)
+    assert full.update(ids, timestamps, s5, composite) == 490
+
+    # Later proteins first, so the early ones have to grow the bins to the left
+    order = np.argsort(-np.nan_to_num(timestamps))
+    parts = np.array_split(order, 3)
+    path = str(tmp_path / "drift.npz")
+    incremental = DriftTracker(DAY)
+    for part in parts:
+        incremental.update([ids[i] for i in part], timestamps[part], s5[part], composite[part])
+        incremental.save(path)
+        incremental = DriftTracker.load(path)
+    assert incremental.update(ids, timestamps, s5, composite) == 0
+
+    assert incremental.seen == full.seen
+    assert incremental.origin == full.origin
+    np.testing.assert_allclose(incremental.sums, full.sums, rtol=1e-12, atol=1e-9)
+    for key, values in incremental.rolling(5).items():
+        np.testing.assert_allclose(values, full.rolling(5)[key], rtol=1e-9, equal_nan=True)
+
+
+def test_rolling_matches_direct_windows(stream):
+    ids, timestamps, s5, composite = stream
+    tracker = DriftTracker(2 * DAY)
+    tracker.update(ids, timestamps, s5, composite)
+    roll = tracker.rolling(4)
+
+    ok = np.isfinite(timestamps)
+    bins = ((timestamps[ok] - tracker.origin) // tracker.bin_seconds).astype(int)
+    x, y = s5[ok], composite[ok]
+    for i in range(tracker.n_bins):
+        inside = (bins > i - 4) & (bins <= i)
+        assert roll["n"][i] == inside.sum()
+        if not (bins == i).any():
+            assert np.isnan(roll["s5_mean"][i]) and np.isnan(roll["comp_mean"][i])
+            continue
+        assert roll["s5_mean"][i] == pytest.approx(x[inside].mean())
+        assert roll["comp_mean"][i] == pytest.approx(y[inside].mean())
+        if inside.sum() >= 3:
+            assert roll["r"][i] == pytest.approx(np.corrcoef(x[inside], y[inside])[0, 1])
+
+
+def test_lagged_xcorr_matches_corrcoef():
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(size=40), rng.normal(size=40)
+    x[[3, 17]] = np.nan
+    lags, r = lagged_xcorr(x, y, 5)
+    assert lags.tolist() == list(range(-5, 6))
+    for lag, value in zip(lags.tolist(), r):
+        a, b = (x[:40 - lag], y[lag:]) if lag >= 0 else (x[-lag:], y[:40 + lag])
+        ok = np.isfinite(a) & np.isfinite(b)
+        assert value == pytest.approx(np.corrcoef(a[ok], b[ok])[0, 1])
+
+
+def test_state_reuse_and_rebuild(stream, tmp_path, capsys):
+    ids, timestamps, s5, composite = stream
+    path = str(tmp_path / "drift.npz")
+    tracker = DriftTracker(DAY, "lex-a")
+    tracker.update(ids, timestamps, s5, composite)
+    tracker.save(path)
+
+    assert len(open_tracker(path, DAY, "lex-a")) == 490
+    assert len(open_tracker(path, DAY, "lex-a", rebuild=True)) == 0
+    assert len(open_tracker(path, DAY, "lex-b")) == 0
+    assert len(open_tracker(path, 7 * DAY, "lex-a")) == 0
+    out = capsys.readouterr().out
+    assert "[version lex-a], not [version lex-b]" in out
+    assert "86400s bins, not 604800s" in out
+
+
+def test_option_errors():
+    assert option_error(1, 7, 14) is None
+    assert "--bin-days" in option_error(0, 7, 14)
+    assert "--bin-days" in option_error(-1, 7, 14)
+    assert "--window" in option_error(1, 0, 14)
+    assert "--max-lag" in option_error(1, 7, -1)
+    with pytest.raises(ValueError):
+        DriftTracker(0)
+
+
+def test_parse_timestamps():
+    out = parse_timestamps(["2025-06-01T00:00:00.123Z", "2025-06-01 00:00:10", None, "garbage"])
+    assert out[:2].tolist() == [START, START + 10]
+    assert np.isnan(out[2:]).all()
+
+
+def test_temporal_section_leaves_report_unchanged(sample_corpus, tmp_path):
+    proteins_dir, metrics_path = sample_corpus
+    base, base_json = run_analysis(proteins_dir, metrics_path, tmp_path / "base", "--no-export")
+    state = str(tmp_path / "drift.npz")
+    args = ("--no-export", "--temporal", "--temporal-state", state, "--window", "5")
+    first, first_json = run_analysis(proteins_dir, metrics_path, tmp_path / "a", *args)
+    second, second_json = run_analysis(proteins_dir, metrics_path, tmp_path / "b", *args)
+
+    def report(text):
+        return text[text.index("\nMatched "):text.index("\n8. SUMMARY")]
+
+    assert report(first) == report(base)
+    temporal = first_json.pop("temporal")
+    assert first_json == base_json
+    assert temporal["proteins"] == base_json["n_proteins"]
+    assert second_json["temporal"] == temporal
+    assert f"{temporal['proteins']} proteins + 0 new" in second